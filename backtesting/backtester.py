@@ -1,13 +1,16 @@
-import pandas as pd
-from brokers.binance_api import BinanceAPI
+import argparse
+from backtesting import engine
+from data.kline_store import kline_store, to_frame
 from strategies.mean_reversion import MeanReversionStrategy
 from strategies.scalping import ScalpingStrategy
 from config.settings import TRADING_CONFIG, STRATEGY_CONFIG
 
 
 class Backtester:
-    def __init__(self, symbol, interval, limit=500):
-        self.api = BinanceAPI()
+    def __init__(self, symbol, interval, limit=500, offline=False):
+        self.store = kline_store(offline)
+        self.api = self.store.api
+        self.offline = offline
         self.symbol = symbol
         self.interval = interval
         self.limit = limit
@@ -27,18 +30,10 @@ class Backtester:
             raise ValueError(f"Unknown strategy: {strategy_name}")
 
     def fetch_data(self):
-        klines = self.api.get_klines(self.symbol, self.interval, limit=self.limit)
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'num_trades',
-            'taker_buy_base', 'taker_buy_quote', 'ignore'
-        ])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-        return df
-
-    def run(self):
+        columns = self.store.get(self.symbol, self.interval, limit=self.limit, offline=self.offline)
+        return to_frame(columns)
+
+    def run(self, verify=False):
         df = self.fetch_data()
         self.start_date = df.index[0].strftime("%Y-%m-%d %H:%M")
         self.end_date = df.index[-1].strftime("%Y-%m-%d %H:%M")
@@ -46,23 +41,17 @@ class Backtester:
         active_name = STRATEGY_CONFIG["name"]
         lookback = STRATEGY_CONFIG[active_name].get("lookback_period", 20)
 
-        for i in range(lookback, len(df)):
-            window = df.iloc[:i + 1]
-            signal = self.strategy.generate_signal(window)
-
-            current_price = window["close"].iloc[-1]
+        close = engine.as_array(df["close"])
+        if verify:
+            bars = self.strategy.check_consistency({"close": close})
+            print(f"✅ on_bar and signals() agree on all {bars} bars")
+        signals = engine.strategy_signals(self.strategy, close, start=lookback)
+        result = engine.simulate(close, signals, self.usdt)
 
-            if signal == "buy" and self.usdt > 0:
-                self.entry_price = current_price
-                self.holdings = round(self.usdt / current_price, 6)
-                self.usdt = 0
-                self.trade_log.append(("BUY", current_price))
-
-            elif signal == "sell" and self.holdings > 0:
-                self.usdt = round(self.holdings * current_price, 2)
-                self.trade_log.append(("SELL", current_price))
-                self.holdings = 0
-                self.entry_price = None
+        self.usdt = result["usdt"]
+        self.holdings = result["holdings"]
+        self.entry_price = result["entry_price"]
+        self.trade_log = result["trade_log"]
 
         self.summary()
 
@@ -96,9 +85,16 @@ class Backtester:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--offline", action="store_true", help="Backtest on cached candles only (no network)")
+    parser.add_argument("--limit", type=int, default=900, help="Number of candles to backtest (any size)")
+    parser.add_argument("--verify", action="store_true", help="Check the live and batch strategy paths agree first")
+    args = parser.parse_args()
+
     backtester = Backtester(
         symbol=TRADING_CONFIG["pair"],
         interval=TRADING_CONFIG["timeframe"],
-        limit=900
+        limit=args.limit,
+        offline=args.offline
     )
-    backtester.run()
+    backtester.run(verify=args.verify)
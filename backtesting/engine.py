@@ -0,0 +1,181 @@
+# Vectorized backtest engine working on contiguous NumPy arrays
+import numpy as np
+# Signal codes and array helpers live with the strategies; re-exported for engine users
+from strategies.base_strategy import BUY, HOLD, SELL, BaseStrategy, as_array, rolling_mean
+
+
+def strategy_signals(strategy, close, start=0):
+    """Signal array for a strategy instance, honouring its current thresholds"""
+    if not isinstance(strategy, BaseStrategy):
+        raise ValueError(f"Unsupported strategy: {type(strategy).__name__}")
+    return strategy.signals({"close": as_array(close)}, start)
+
+
+def simulate(close, signals, initial_balance=1000.0):
+    """Replay signals against an all-in USDT account, exactly like Backtester.run"""
+    close = as_array(close)
+    usdt = initial_balance
+    holdings = 0.0
+    entry_price = None
+    trade_log = []
+
+    for i in np.flatnonzero(signals):
+        current_price = close[i]
+
+        if signals[i] == BUY and usdt > 0:
+            entry_price = current_price
+            holdings = round(usdt / current_price, 6)
+            usdt = 0
+            trade_log.append(("BUY", current_price))
+
+        elif signals[i] == SELL and holdings > 0:
+            usdt = round(holdings * current_price, 2)
+            trade_log.append(("SELL", current_price))
+            holdings = 0
+            entry_price = None
+
+    return {
+        "usdt": usdt,
+        "holdings": holdings,
+        "entry_price": entry_price,
+        "trade_log": trade_log,
+    }
+
+
+def final_balance(result):
+    """Account value at the end of a simulation (open holdings valued at entry)"""
+    return result["usdt"] + result["holdings"] * (result["entry_price"] or 0)
+
+
+def mean_reversion_grid(close, lookback, drop_thresholds, rebound_thresholds, start=0, initial_balance=1000.0):
+    """Backtest a whole grid of (drop, rebound) thresholds in one pass over the closes.
+
+    Every grid point keeps its own strategy and account state in 1D arrays that are
+    advanced together bar by bar. The rolling mean is computed once for the lookback,
+    and bars on which no grid point can trade are skipped with two scalar checks.
+    np.round applies the same rounding that round() does on the float64 scalars in
+    simulate(), so each point matches a solo run exactly.
+    """
+    close = as_array(close)
+    drops = np.asarray(drop_thresholds, dtype=np.float64)
+    rebounds = np.asarray(rebound_thresholds, dtype=np.float64)
+    size = len(drops)
+
+    average = rolling_mean(close, lookback)
+    with np.errstate(invalid="ignore"):
+        drop_pct = (average - close) / average
+
+    in_position = np.zeros(size, dtype=bool)
+    entry = np.zeros(size)
+    usdt = np.full(size, initial_balance)
+    holdings = np.zeros(size)
+    fill_price = np.zeros(size)
+    trades = np.zeros(size, dtype=np.int64)
+
+    min_flat_drop = drops.min() if size else np.inf
+    sell_floor = np.inf
+    closes = close.tolist()
+    drop_list = drop_pct.tolist()
+
+    for i in range(max(start, lookback - 1), len(close)):
+        may_buy = drop_list[i] >= min_flat_drop
+        # The floor only prefilters bars; the exact per-point test happens below
+        may_sell = closes[i] >= sell_floor * (1 - 1e-9)
+        if not (may_buy or may_sell):
+            continue
+
+        current_price = close[i]
+        if may_sell:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sells = in_position & ((current_price - entry) / entry >= rebounds)
+        else:
+            sells = None
+        buys = ~in_position & (drop_list[i] >= drops) if may_buy else None
+
+        if buys is not None and buys.any():
+            in_position |= buys
+            entry[buys] = current_price
+            fills = buys & (usdt > 0)
+            fill_price[fills] = current_price
+            holdings[fills] = np.round(usdt[fills] / current_price, 6)
+            usdt[fills] = 0
+            trades[fills] += 1
+
+        if sells is not None and sells.any():
+            in_position &= ~sells
+            fills = sells & (holdings > 0)
+            usdt[fills] = np.round(holdings[fills] * current_price, 2)
+            holdings[fills] = 0
+            fill_price[fills] = 0
+            trades[fills] += 1
+
+        flat = ~in_position
+        min_flat_drop = drops[flat].min() if flat.any() else np.inf
+        sell_floor = (entry[in_position] * (1 + rebounds[in_position])).min() if in_position.any() else np.inf
+
+    return {
+        "usdt": usdt,
+        "holdings": holdings,
+        "entry_price": fill_price,
+        "trades": trades,
+    }
+
+
+def simulate_paths(close, signals, initial_balance=1000.0, fee_rate=0.0, slippage=0.0):
+    """Replay a signal matrix on many price paths at once (one row per path).
+
+    `signals` is what a strategy's signals() returns for the 2D close array; each
+    row is traded like simulate() and every row advances together bar by bar,
+    so the mark-to-market drawdown is tracked on every bar. Fills pay `slippage`
+    on the price and `fee_rate` on the notional; both may be per-row arrays. With
+    both at zero each row matches simulate() exactly.
+    Returns per-row final balance (open holdings at entry), max mark-to-market
+    drawdown as a fraction, trades and winning round trips.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    size, bars = close.shape
+    buy_cost = (1 + np.broadcast_to(np.asarray(slippage, dtype=np.float64), size)) / \
+        (1 - np.broadcast_to(np.asarray(fee_rate, dtype=np.float64), size))
+    sell_keep = (1 - np.broadcast_to(np.asarray(slippage, dtype=np.float64), size)) * \
+        (1 - np.broadcast_to(np.asarray(fee_rate, dtype=np.float64), size))
+
+    usdt = np.full(size, initial_balance)
+    holdings = np.zeros(size)
+    fill_price = np.zeros(size)
+    spent = np.zeros(size)
+    trades = np.zeros(size, dtype=np.int64)
+    wins = np.zeros(size, dtype=np.int64)
+    peak = np.full(size, initial_balance)
+    drawdown = np.zeros(size)
+
+    for i in range(bars):
+        current = close[:, i]
+        buys = signals[:, i] == BUY
+        sells = signals[:, i] == SELL
+
+        if buys.any():
+            fills = buys & (usdt > 0)
+            fill_price[fills] = current[fills] * buy_cost[fills]
+            holdings[fills] = np.round(usdt[fills] / fill_price[fills], 6)
+            spent[fills] = usdt[fills]
+            usdt[fills] = 0
+            trades[fills] += 1
+
+        if sells.any():
+            fills = sells & (holdings > 0)
+            usdt[fills] = np.round(holdings[fills] * current[fills] * sell_keep[fills], 2)
+            wins[fills & (usdt > spent)] += 1
+            holdings[fills] = 0
+            fill_price[fills] = 0
+            trades[fills] += 1
+
+        equity = usdt + holdings * current
+        np.maximum(peak, equity, out=peak)
+        np.maximum(drawdown, 1 - equity / peak, out=drawdown)
+
+    return {
+        "final_balance": usdt + holdings * fill_price,
+        "max_drawdown": drawdown,
+        "trades": trades,
+        "wins": wins,
+    }
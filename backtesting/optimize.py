@@ -1,84 +1,139 @@
 # python -m backtesting.optimize --symbol XRPUSDT --interval 1h --drop_start 1.0 --drop_end 3.0 --rebound_start 1.0 --rebound_end 3.0 --step 0.5
+# python -m backtesting.optimize --symbol XRPUSDT --interval 1m --step 0.1 --workers 32
 
 
-import pandas as pd
-from brokers.binance_api import BinanceAPI
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backtesting import engine, shared
+from config.settings import STRATEGY_CONFIG
+from data.kline_store import kline_store, to_frame
 from strategies.mean_reversion import MeanReversionStrategy
 import argparse
 
 class Optimizer:
-    def __init__(self, symbol, interval, limit=1000):
+    def __init__(self, symbol, interval, limit=1000, offline=False, lookback=None):
         self.symbol = symbol.upper()
         self.interval = interval
         self.limit = limit
-        self.api = BinanceAPI()
+        self.offline = offline
+        self.lookback = lookback or configured_lookback()
+        self.store = kline_store(offline)
+        self.api = self.store.api
         self.initial_balance = 1000.0
 
     def fetch_data(self):
-        klines = self.api.get_klines(self.symbol, self.interval, limit=self.limit)
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'num_trades',
-            'taker_buy_base', 'taker_buy_quote', 'ignore'
-        ])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-        return df
+        columns = self.store.get(self.symbol, self.interval, limit=self.limit, offline=self.offline)
+        return to_frame(columns)
 
     def run_test(self, df, drop_pct, rebound_pct):
-        usdt = self.initial_balance
-        holdings = 0.0
-        entry_price = None
-        trade_log = []
-        strategy = MeanReversionStrategy()
-        strategy.drop_threshold = drop_pct / 100
-        strategy.rebound_threshold = rebound_pct / 100
-
-        for i in range(20, len(df)):  # using 20-period lookback
-            window = df.iloc[:i + 1]
-            signal = strategy.generate_signal(window)
-            current_price = window["close"].iloc[-1]
-
-            if signal == "buy" and usdt > 0:
-                entry_price = current_price
-                holdings = round(usdt / current_price, 6)
-                usdt = 0
-                trade_log.append(("BUY", current_price))
-
-            elif signal == "sell" and holdings > 0:
-                usdt = round(holdings * current_price, 2)
-                trade_log.append(("SELL", current_price))
-                holdings = 0
-                entry_price = None
-
-        final_balance = usdt + (holdings * (entry_price or 0))
-        cumulative_return = ((final_balance - self.initial_balance) / self.initial_balance) * 100
-        return {
-            "drop": drop_pct,
-            "rebound": rebound_pct,
-            "trades": len(trade_log),
-            "final_balance": round(final_balance, 2),
-            "return_pct": round(cumulative_return, 2)
-        }
+        return evaluate(engine.as_array(df["close"]), drop_pct, rebound_pct, self.initial_balance, self.lookback)
 
-    def optimize(self, drop_range, rebound_range):
-        df = self.fetch_data()
-        results = []
+    def grid_search(self, df, drop_range, rebound_range, workers=1, batched=False):
+        """Test every (drop, rebound) pair and return results in grid order"""
+        grid = [(drop, rebound) for drop in drop_range for rebound in rebound_range]
 
-        print(f"\n🔍 Optimizing on {self.symbol} [{self.interval}], candles: {len(df)}\n")
+        if batched:
+            return batch_evaluate(engine.as_array(df["close"]), grid, self.initial_balance, self.lookback)
 
-        for drop in drop_range:
-            for rebound in rebound_range:
-                result = self.run_test(df.copy(), drop, rebound)
+        if workers <= 1:
+            results = []
+            for drop, rebound in grid:
+                result = self.run_test(df, drop, rebound)
                 results.append(result)
                 print(f"Tested: drop={drop:.1f}%, rebound={rebound:.1f}% → return={result['return_pct']}%")
+            return results
+
+        close = engine.as_array(df["close"])
+        results = [None] * len(grid)
+        started = time.perf_counter()
+        with shared.publish_close(close) as initargs:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=shared.attach_close,
+                initargs=initargs,
+            ) as pool:
+                futures = {
+                    pool.submit(_evaluate_shared, drop, rebound, self.initial_balance, self.lookback): i
+                    for i, (drop, rebound) in enumerate(grid)
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    result = future.result()
+                    results[futures[future]] = result
+
+                    elapsed = time.perf_counter() - started
+                    eta = elapsed / done * (len(grid) - done)
+                    print(
+                        f"[{done}/{len(grid)}] drop={result['drop']:.1f}%, rebound={result['rebound']:.1f}% "
+                        f"→ return={result['return_pct']}% | elapsed {elapsed:.1f}s, ETA {eta:.1f}s"
+                    )
+
+        return results
+
+    def optimize(self, drop_range, rebound_range, workers=1, batched=False):
+        import pandas as pd
+        df = self.fetch_data()
+
+        mode = "batched" if batched else f"workers: {workers}"
+        print(f"\n🔍 Optimizing on {self.symbol} [{self.interval}], candles: {len(df)}, {mode}\n")
 
+        results = self.grid_search(df, drop_range, rebound_range, workers, batched)
         results_df = pd.DataFrame(results)
         top = results_df.sort_values(by="return_pct", ascending=False).head(10)
 
         print(f"\n🏆 Top 10 Strategies for {self.symbol} ({self.interval}):")
         print(top.to_string(index=False))
+        return results_df
+
+
+def configured_lookback():
+    return STRATEGY_CONFIG["mean_reversion"]["lookback_period"]
+
+
+def evaluate(close, drop_pct, rebound_pct, initial_balance=1000.0, lookback=None):
+    """Backtest one (drop, rebound) pair on a close array; no signal before the first full lookback"""
+    strategy = MeanReversionStrategy()
+    strategy.drop_threshold = drop_pct / 100
+    strategy.rebound_threshold = rebound_pct / 100
+    strategy.lookback = lookback or configured_lookback()
+
+    signals = engine.strategy_signals(strategy, close, start=strategy.lookback)
+    result = engine.simulate(close, signals, initial_balance)
+
+    final_balance = engine.final_balance(result)
+    cumulative_return = ((final_balance - initial_balance) / initial_balance) * 100
+    return {
+        "drop": drop_pct,
+        "rebound": rebound_pct,
+        "trades": len(result["trade_log"]),
+        "final_balance": round(final_balance, 2),
+        "return_pct": round(cumulative_return, 2)
+    }
+
+
+def batch_evaluate(close, grid, initial_balance=1000.0, lookback=None):
+    """Backtest every (drop, rebound) pair of the grid together in a single pass, exactly like evaluate()"""
+    lookback = lookback or configured_lookback()
+    drops = [drop / 100 for drop, _ in grid]
+    rebounds = [rebound / 100 for _, rebound in grid]
+    state = engine.mean_reversion_grid(close, lookback, drops, rebounds, start=lookback, initial_balance=initial_balance)
+
+    results = []
+    for i, (drop, rebound) in enumerate(grid):
+        final_balance = state["usdt"][i] + state["holdings"][i] * state["entry_price"][i]
+        cumulative_return = ((final_balance - initial_balance) / initial_balance) * 100
+        results.append({
+            "drop": drop,
+            "rebound": rebound,
+            "trades": int(state["trades"][i]),
+            "final_balance": round(final_balance, 2),
+            "return_pct": round(cumulative_return, 2)
+        })
+    return results
+
+
+def _evaluate_shared(drop_pct, rebound_pct, initial_balance, lookback):
+    return evaluate(shared.shared_close(), drop_pct, rebound_pct, initial_balance, lookback)
+
 
 # Helper for float range
 def frange(start, stop, step):
@@ -93,19 +148,23 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--symbol", type=str, default="XRPUSDT", help="Trading pair to optimize")
     parser.add_argument("--interval", type=str, default="1h", help="Candle timeframe (e.g. 15m, 1h)")
-    parser.add_argument("--drop_start", type=float, default=1.0, help="Start drop %")
-    parser.add_argument("--drop_end", type=float, default=3.0, help="End drop %")
-    parser.add_argument("--rebound_start", type=float, default=1.0, help="Start rebound %")
-    parser.add_argument("--rebound_end", type=float, default=3.0, help="End rebound %")
+    parser.add_argument("--drop_start", type=float, default=1.0, help="Start drop %%")
+    parser.add_argument("--drop_end", type=float, default=3.0, help="End drop %%")
+    parser.add_argument("--rebound_start", type=float, default=1.0, help="Start rebound %%")
+    parser.add_argument("--rebound_end", type=float, default=3.0, help="End rebound %%")
     parser.add_argument("--step", type=float, default=0.5, help="Step size for both params")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the grid search (1 = serial)")
+    parser.add_argument("--batched", action="store_true", help="Advance the whole grid together in one pass")
+    parser.add_argument("--offline", action="store_true", help="Optimize on cached candles only (no network)")
+    parser.add_argument("--limit", type=int, default=1000, help="Number of candles to optimize on (any size)")
 
     args = parser.parse_args()
 
     drop_range = [round(x, 2) for x in frange(args.drop_start, args.drop_end, args.step)]
     rebound_range = [round(x, 2) for x in frange(args.rebound_start, args.rebound_end, args.step)]
 
-    optimizer = Optimizer(symbol=args.symbol, interval=args.interval)
-    optimizer.optimize(drop_range, rebound_range)
+    optimizer = Optimizer(symbol=args.symbol, interval=args.interval, limit=args.limit, offline=args.offline)
+    optimizer.optimize(drop_range, rebound_range, workers=args.workers, batched=args.batched)
 
 
 # Helper for float range
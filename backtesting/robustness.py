@@ -0,0 +1,155 @@
+# python -m backtesting.robustness --offline --limit 8760 --scenarios 10000 --workers 4
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from backtesting import engine, shared
+from config.settings import TRADING_CONFIG
+
+MODES = ("bootstrap", "jitter", "shuffle")
+BATCH = 500  # scenarios advanced together per engine call
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def block_bootstrap(close, count, block, rng):
+    """`count` synthetic price paths rebuilt from randomly drawn blocks of the log returns"""
+    close = engine.as_array(close)
+    returns = np.diff(np.log(close))
+    block = max(1, min(block, len(returns)))
+    blocks = -(-len(returns) // block)
+    starts = rng.integers(0, len(returns) - block + 1, size=(count, blocks))
+    index = (starts[:, :, None] + np.arange(block)).reshape(count, -1)[:, :len(returns)]
+    paths = np.empty((count, len(close)))
+    paths[:, 0] = close[0]
+    paths[:, 1:] = close[0] * np.exp(np.cumsum(returns[index], axis=1))
+    return paths
+
+
+def run_paths(paths, strategy, start=0, initial_balance=1000.0, fee_rate=0.0, slippage=0.0):
+    """Per-path return %, max drawdown %, win rate % and trade count as a DataFrame"""
+    import pandas as pd  # loaded by the first run, so `--help` stays fast
+    signals = engine.strategy_signals(strategy, paths, start)
+    state = engine.simulate_paths(paths, signals, initial_balance, fee_rate, slippage)
+    round_trips = state["trades"] // 2
+    return pd.DataFrame({
+        "return_pct": (state["final_balance"] - initial_balance) / initial_balance * 100,
+        "max_drawdown_pct": state["max_drawdown"] * 100,
+        "win_rate_pct": np.where(round_trips > 0, state["wins"] / np.maximum(round_trips, 1) * 100, np.nan),
+        "trades": state["trades"],
+    })
+
+
+def scenario_batch(close, strategy, mode, count, seed, block=24, fee_rate=0.001, fee_jitter=0.0005,
+                   slippage=0.0005, slippage_jitter=0.0005, start=0, initial_balance=1000.0):
+    """One batch of scenarios; every batch draws from its own seed, so results do not depend on the pool"""
+    rng = np.random.default_rng(seed)
+    fees = np.clip(fee_rate + rng.uniform(-fee_jitter, fee_jitter, count), 0, None)
+    slips = np.clip(slippage + rng.uniform(-slippage_jitter, slippage_jitter, count), 0, None)
+
+    if mode == "bootstrap":
+        paths = block_bootstrap(close, count, block, rng)
+        return run_paths(paths, strategy, start, initial_balance, fees, slips)
+    if mode == "jitter":
+        paths = np.broadcast_to(engine.as_array(close), (count, len(close)))
+        return run_paths(paths, strategy, start, initial_balance, fees, slips)
+    if mode == "shuffle":
+        return shuffled_trades(close, strategy, count, rng, start, initial_balance, fees, slips)
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def shuffled_trades(close, strategy, count, rng, start=0, initial_balance=1000.0, fees=0.0, slips=0.0):
+    """Replay the original round trips in random orders (with per-scenario costs) for the drawdown spread"""
+    import pandas as pd
+    close = engine.as_array(close)
+    signals = engine.strategy_signals(strategy, close, start=start)
+    prices = close[np.flatnonzero(signals)]
+    kinds = signals[np.flatnonzero(signals)]
+    # Round trips are BUY then SELL; an unmatched last BUY stays open and is left out
+    buys = prices[:-1][(kinds[:-1] == engine.BUY) & (kinds[1:] == engine.SELL)]
+    sells = prices[1:][(kinds[:-1] == engine.BUY) & (kinds[1:] == engine.SELL)]
+    gross = sells / buys
+
+    fees = np.broadcast_to(np.asarray(fees, dtype=np.float64), count)[:, None]
+    slips = np.broadcast_to(np.asarray(slips, dtype=np.float64), count)[:, None]
+    order = rng.permuted(np.broadcast_to(np.arange(len(gross)), (count, len(gross))), axis=1)
+    growth = gross[order] * ((1 - slips) / (1 + slips)) * (1 - fees) ** 2
+
+    equity = initial_balance * np.cumprod(np.concatenate([np.ones((count, 1)), growth], axis=1), axis=1)
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=1)
+    return pd.DataFrame({
+        "return_pct": (equity[:, -1] - initial_balance) / initial_balance * 100,
+        "max_drawdown_pct": drawdown.max(axis=1) * 100,
+        "win_rate_pct": (growth > 1).mean(axis=1) * 100 if len(gross) else np.full(count, np.nan),
+        "trades": np.full(count, 2 * len(gross)),
+    })
+
+
+def _scenario_batch_shared(strategy, mode, count, seed, options):
+    return scenario_batch(shared.shared_close(), strategy, mode, count, seed, **options)
+
+
+def run_scenarios(close, strategy, mode="bootstrap", scenarios=10_000, workers=1, seed=42, batch=BATCH, **options):
+    """Scenario results in batches of `batch`, spread over a process pool reading the closes from shared memory"""
+    import pandas as pd
+    close = engine.as_array(close)
+    counts = [min(batch, scenarios - done) for done in range(0, scenarios, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+
+    if workers <= 1 or len(counts) <= 1:
+        frames = [scenario_batch(close, strategy, mode, n, s, **options) for n, s in zip(counts, seeds)]
+        return pd.concat(frames, ignore_index=True)
+
+    with shared.publish_close(close) as initargs:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=shared.attach_close,
+            initargs=initargs,
+        ) as pool:
+            frames = list(pool.map(_scenario_batch_shared, [strategy] * len(counts), [mode] * len(counts),
+                                   counts, seeds, [options] * len(counts)))
+    return pd.concat(frames, ignore_index=True)
+
+
+def distribution(results):
+    """Percentiles of every metric plus the share of losing scenarios"""
+    table = results[["return_pct", "max_drawdown_pct", "win_rate_pct"]].quantile([p / 100 for p in PERCENTILES])
+    table.index = [f"p{p}" for p in PERCENTILES]
+    table.loc["mean"] = results[["return_pct", "max_drawdown_pct", "win_rate_pct"]].mean()
+    return table.round(2), float((results["return_pct"] < 0).mean() * 100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", type=str, default="all", help=f"One of {', '.join(MODES)} or all")
+    parser.add_argument("--scenarios", type=int, default=10_000, help="Scenarios per mode")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (1 = serial)")
+    parser.add_argument("--block", type=int, default=24, help="Bootstrap block length in candles")
+    parser.add_argument("--fee", type=float, default=0.001, help="Fee rate per fill")
+    parser.add_argument("--fee_jitter", type=float, default=0.0005, help="Uniform +/- jitter on the fee rate")
+    parser.add_argument("--slippage", type=float, default=0.0005, help="Slippage per fill as a fraction of price")
+    parser.add_argument("--slippage_jitter", type=float, default=0.0005, help="Uniform +/- jitter on slippage")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--offline", action="store_true", help="Use cached candles only (no network)")
+    parser.add_argument("--limit", type=int, default=8760, help="Number of candles (8760 = a year of 1h)")
+    args = parser.parse_args()
+
+    from backtesting.backtester import Backtester
+    backtester = Backtester(TRADING_CONFIG["pair"], TRADING_CONFIG["timeframe"], limit=args.limit, offline=args.offline)
+    close = engine.as_array(backtester.fetch_data()["close"])
+    start = getattr(backtester.strategy, "lookback", 1)
+    options = {"block": args.block, "fee_rate": args.fee, "fee_jitter": args.fee_jitter, "slippage": args.slippage,
+               "slippage_jitter": args.slippage_jitter, "start": start}
+
+    baseline = run_paths(close[None, :], backtester.strategy, start, fee_rate=args.fee, slippage=args.slippage)
+    print(f"\n🎲 Robustness of {type(backtester.strategy).__name__} on {backtester.symbol} "
+          f"[{backtester.interval}], candles: {len(close)}")
+    print(f"Baseline: return {baseline['return_pct'][0]:.2f}%, max drawdown {baseline['max_drawdown_pct'][0]:.2f}%, "
+          f"{baseline['trades'][0]} trades")
+
+    for mode in (MODES if args.mode == "all" else (args.mode,)):
+        started = time.perf_counter()
+        results = run_scenarios(close, backtester.strategy, mode, args.scenarios, args.workers, args.seed, **options)
+        table, losing = distribution(results)
+        print(f"\n📈 {mode}: {len(results)} scenarios in {time.perf_counter() - started:.2f}s, "
+              f"{losing:.1f}% losing")
+        print(table.to_string())
@@ -0,0 +1,152 @@
+# python -m backtesting.search --symbol XRPUSDT --interval 1m --limit 50000 --budget 30 --lookback_start 10 --lookback_end 60
+import argparse
+import math
+import numpy as np
+from backtesting import engine
+from backtesting.optimize import Optimizer, batch_evaluate, frange
+from strategies.scalping import ScalpingStrategy
+
+
+def mean_reversion_objective(close, candidates, initial_balance=1000.0):
+    """Return % of every {drop, rebound, lookback} candidate; one batched pass per lookback"""
+    scores = [None] * len(candidates)
+    by_lookback = {}
+    for i, params in enumerate(candidates):
+        by_lookback.setdefault(int(params["lookback"]), []).append(i)
+
+    for lookback, members in by_lookback.items():
+        grid = [(candidates[i]["drop"], candidates[i]["rebound"]) for i in members]
+        for i, result in zip(members, batch_evaluate(close, grid, initial_balance, lookback)):
+            scores[i] = result["return_pct"]
+    return scores
+
+
+def scalping_objective(close, candidates, initial_balance=1000.0):
+    """Return % of every {grid_size} candidate"""
+    scores = []
+    for params in candidates:
+        strategy = ScalpingStrategy()
+        strategy.grid_size_pct = params["grid_size"] / 100
+        result = engine.simulate(close, engine.strategy_signals(strategy, close, start=1), initial_balance)
+        scores.append(round((engine.final_balance(result) - initial_balance) / initial_balance * 100, 2))
+    return scores
+
+
+def grid_size(space):
+    return math.prod(len(values) for values in space.values())
+
+
+def sample_space(space, n, rng):
+    """Up to `n` distinct random points of the grid, without materializing the whole grid"""
+    names = list(space)
+    total = grid_size(space)
+    if n >= total:
+        picks = range(total)
+    else:
+        picks = set()
+        while len(picks) < n:
+            picks.update(int(i) for i in rng.integers(0, total, size=n - len(picks)))
+        picks = sorted(picks)
+
+    candidates = []
+    for flat in picks:
+        params = {}
+        for name in reversed(names):
+            flat, j = divmod(flat, len(space[name]))
+            params[name] = space[name][j]
+        candidates.append({name: params[name] for name in names})
+    return candidates
+
+
+def successive_halving(close, space, objective, budget, eta=3, min_bars=500, seed=42, initial_balance=1000.0):
+    """Find the best point of a parameter grid within `budget` full-history backtests.
+
+    Random candidates are first scored on the most recent slice of the history;
+    only the best 1/eta of them move on to a slice eta times longer, until the
+    survivors are scored on all of it. Cost is counted in candles backtested and
+    reported as full-history equivalents next to the cost of the whole grid.
+    """
+    close = engine.as_array(close)
+    n = len(close)
+    rungs = max(1, int(math.log(max(n / min_bars, 1), eta)) + 1)
+    bars = [max(min_bars, n // eta ** (rungs - 1 - r)) for r in range(rungs)]
+    bars[-1] = n
+
+    # Spend roughly the same share of the budget on every rung
+    first = max(eta, int(budget / rungs * n / bars[0]))
+    candidates = sample_space(space, first, np.random.default_rng(seed))
+
+    history = []
+    evaluations = 0
+    cost = 0
+    for r, length in enumerate(bars):
+        scores = objective(close[n - length:], candidates, initial_balance)
+        evaluations += len(candidates)
+        cost += len(candidates) * length
+        history.append({"bars": length, "candidates": len(candidates), "best_return_pct": max(scores)})
+
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda pair: -pair[0])
+        if r == len(bars) - 1:
+            import pandas as pd
+            best_score, best = ranked[0]
+            results = pd.DataFrame([{**candidates[i], "return_pct": score} for score, i in ranked])
+            break
+        keep = max(1, len(candidates) // eta)
+        candidates = [candidates[i] for _, i in ranked[:keep]]
+
+    return {
+        "best": candidates[best],
+        "return_pct": best_score,
+        "results": results,
+        "rungs": history,
+        "evaluations": evaluations,
+        "cost": round(cost / n, 2),
+        "grid_size": grid_size(space),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbol", type=str, default="XRPUSDT", help="Trading pair to optimize")
+    parser.add_argument("--interval", type=str, default="1h", help="Candle timeframe (e.g. 15m, 1h)")
+    parser.add_argument("--strategy", type=str, default="mean_reversion", help="mean_reversion or scalping")
+    parser.add_argument("--drop_start", type=float, default=0.5, help="Start drop %%")
+    parser.add_argument("--drop_end", type=float, default=5.0, help="End drop %%")
+    parser.add_argument("--rebound_start", type=float, default=0.5, help="Start rebound %%")
+    parser.add_argument("--rebound_end", type=float, default=5.0, help="End rebound %%")
+    parser.add_argument("--lookback_start", type=int, default=10, help="Shortest lookback period")
+    parser.add_argument("--lookback_end", type=int, default=60, help="Longest lookback period")
+    parser.add_argument("--lookback_step", type=int, default=5, help="Lookback period step")
+    parser.add_argument("--grid_start", type=float, default=0.05, help="Smallest scalping grid size %%")
+    parser.add_argument("--grid_end", type=float, default=2.0, help="Largest scalping grid size %%")
+    parser.add_argument("--step", type=float, default=0.1, help="Step size for the percentage params")
+    parser.add_argument("--budget", type=float, default=30, help="Search budget in full-history backtests")
+    parser.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta candidates per rung")
+    parser.add_argument("--min_bars", type=int, default=500, help="Candles in the first (shortest) rung")
+    parser.add_argument("--offline", action="store_true", help="Use cached candles only (no network)")
+    parser.add_argument("--limit", type=int, default=5000, help="Number of candles of history")
+    args = parser.parse_args()
+
+    if args.strategy == "scalping":
+        space = {"grid_size": [round(x, 2) for x in frange(args.grid_start, args.grid_end, args.step)]}
+        objective = scalping_objective
+    else:
+        space = {
+            "drop": [round(x, 2) for x in frange(args.drop_start, args.drop_end, args.step)],
+            "rebound": [round(x, 2) for x in frange(args.rebound_start, args.rebound_end, args.step)],
+            "lookback": list(range(args.lookback_start, args.lookback_end + 1, args.lookback_step)),
+        }
+        objective = mean_reversion_objective
+
+    optimizer = Optimizer(symbol=args.symbol, interval=args.interval, limit=args.limit, offline=args.offline)
+    close = engine.as_array(optimizer.fetch_data()["close"])
+    print(f"\n✂️ Successive halving on {optimizer.symbol} [{args.interval}], candles: {len(close)}, "
+          f"{' × '.join(str(len(values)) for values in space.values())} grid\n")
+
+    search = successive_halving(close, space, objective, args.budget, args.eta, args.min_bars)
+    for rung in search["rungs"]:
+        print(f"{rung['candidates']:>6} candidates on {rung['bars']:>7} candles → best {rung['best_return_pct']}%")
+    print(f"\n🏆 Best: {search['best']} → return={search['return_pct']}%")
+    print(f"Cost: {search['evaluations']} backtests = {search['cost']} full-history runs "
+          f"(full grid: {search['grid_size']} runs, {search['grid_size'] / max(search['cost'], 1e-9):.0f}x more)")
+    print(search["results"].head(10).to_string(index=False))
@@ -0,0 +1,31 @@
+# Close prices handed to worker pools through shared memory instead of pickling them per task
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+
+# (SharedMemory, array) attached once per worker process
+_attached = None
+
+
+@contextmanager
+def publish_close(close):
+    """Copy a float64 array into a new shared block; yields the initargs for attach_close"""
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    try:
+        np.ndarray(close.shape, dtype=close.dtype, buffer=shm.buf)[:] = close
+        yield shm.name, close.shape
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def attach_close(name, shape):
+    """Pool initializer: map the published closes in this worker"""
+    global _attached
+    shm = shared_memory.SharedMemory(name=name)
+    _attached = (shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf))
+
+
+def shared_close():
+    """The closes attached by attach_close in this worker"""
+    return _attached[1]
@@ -0,0 +1,162 @@
+# python -m backtesting.tick_backtest --synthetic 20000000 --interval 1m
+import argparse
+import os
+import time
+import numpy as np
+from backtesting import engine
+from data.kline_store import candle_open
+from data.ticks import CHUNK_SIZE, iter_chunks, tick_count, write_synthetic
+from strategies.scalping import ScalpingStrategy
+from config.settings import TRADING_CONFIG
+
+SCAN = 256  # first window when looking ahead for a sell; grows 4x per miss
+
+
+class ScalpingTickSimulator:
+    """ScalpingStrategy grid levels evaluated at every aggTrade instead of at candle closes.
+
+    The buy level of a candle is the previous candle's close less grid_size_pct, and
+    the sell level is the entry plus grid_size_pct, so the rule is the same as
+    ScalpingStrategy.on_bar, but a level is filled at the first trade that crosses
+    it, intrabar, and several round trips can happen inside one candle. State
+    carries across feed() calls, so any chunking of the trades gives the same result.
+    """
+
+    def __init__(self, strategy, interval, initial_balance=1000.0, fee_rate=0.0):
+        self.grid = strategy.grid_size_pct
+        self.interval = interval
+        self.fee_rate = fee_rate
+        self.usdt = initial_balance
+        self.holdings = 0.0
+        self.entry_price = None
+        self.trade_log = []  # (side, price, timestamp)
+        self.ticks = 0
+        self._candle = None  # open time of the candle the last trade belonged to
+        self._ref = np.nan  # close of the candle before it
+        self._last_price = np.nan
+        self._bar_opens = []
+        self._bar_closes = []
+
+    def feed(self, chunk):
+        """Advance over one chunk of trades in time order"""
+        ts = np.asarray(chunk["timestamp"])
+        price = np.asarray(chunk["price"])
+        n = len(price)
+        if not n:
+            return
+        candles = candle_open(ts, self.interval)
+        starts = np.flatnonzero(candles[1:] != candles[:-1]) + 1
+
+        # Every candle measures its drop from the close of the candle before it
+        if candles[0] != self._candle:
+            if self._candle is not None:
+                self._bar_opens.append([self._candle])
+                self._bar_closes.append([self._last_price])
+            self._ref = self._last_price
+        refs = np.concatenate([[self._ref], price[starts - 1]])
+        ref = np.repeat(refs, np.diff(np.concatenate([[0], starts, [n]])))
+        with np.errstate(invalid="ignore"):
+            buy_at = np.flatnonzero(((ref - price) / ref) >= self.grid)
+
+        self._bar_opens.append(candles[starts - 1])
+        self._bar_closes.append(price[starts - 1])
+        self._candle, self._ref, self._last_price = candles[-1], refs[-1], price[-1]
+        self.ticks += n
+
+        pos = 0
+        while pos < n:
+            if self.entry_price is None:
+                nxt = np.searchsorted(buy_at, pos)
+                if nxt == len(buy_at):
+                    break
+                pos = int(buy_at[nxt])
+                self._buy(price[pos], ts[pos])
+            else:
+                pos = self._next_sell(price, pos)
+                if pos == n:
+                    break
+                self._sell(price[pos], ts[pos])
+            pos += 1
+
+    def _next_sell(self, price, pos):
+        """Index of the first trade at or after `pos` at the sell level, or len(price)"""
+        entry = self.entry_price
+        window = SCAN
+        while pos < len(price):
+            seg = price[pos:pos + window]
+            hit = np.flatnonzero((seg - entry) / entry >= self.grid)
+            if len(hit):
+                return pos + int(hit[0])
+            pos += len(seg)
+            window *= 4
+        return pos
+
+    def _buy(self, price, ts):
+        self.entry_price = float(price)
+        if self.usdt > 0:
+            self.holdings = round(self.usdt * (1 - self.fee_rate) / price, 6)
+            self.usdt = 0
+            self.trade_log.append(("BUY", float(price), int(ts)))
+
+    def _sell(self, price, ts):
+        self.entry_price = None
+        if self.holdings > 0:
+            self.usdt = round(self.holdings * price * (1 - self.fee_rate), 2)
+            self.holdings = 0
+            self.trade_log.append(("SELL", float(price), int(ts)))
+
+    def closes(self):
+        """(open time, close) of every candle seen so far, the forming one last"""
+        opens = np.concatenate(self._bar_opens + [[self._candle]]) if self._candle is not None else np.empty(0)
+        closes = np.concatenate(self._bar_closes + [[self._last_price]]) if self._candle is not None else np.empty(0)
+        return opens.astype(np.int64), closes.astype(np.float64)
+
+    def result(self):
+        entry = self.entry_price if self.holdings else None
+        return {"usdt": self.usdt, "holdings": self.holdings, "entry_price": entry,
+                "trade_log": [(side, price) for side, price, _ in self.trade_log]}
+
+
+def run_ticks(source, strategy=None, interval="1m", chunk_size=CHUNK_SIZE, initial_balance=1000.0, fee_rate=0.0):
+    """Stream a tick file through the simulator; returns the simulator and trades/s throughput"""
+    simulator = ScalpingTickSimulator(strategy or ScalpingStrategy(), interval, initial_balance, fee_rate)
+    started = time.perf_counter()
+    for chunk in iter_chunks(source, chunk_size):
+        simulator.feed(chunk)
+    elapsed = time.perf_counter() - started
+    return simulator, simulator.ticks / max(elapsed, 1e-9)
+
+
+def _report(name, result, initial_balance):
+    balance = engine.final_balance(result)
+    trades = result["trade_log"]
+    wins = sum(sell > buy for (_, buy), (_, sell) in zip(trades[::2], trades[1::2]))
+    print(f"{name:<14} End ${balance:.2f} ({(balance - initial_balance) / initial_balance * 100:.2f}%), "
+          f"trades: {len(trades)}, wins: {wins}/{len(trades) // 2}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=str, default=None, help="Tick column directory or .parquet file")
+    parser.add_argument("--synthetic", type=int, default=0, help="Generate this many synthetic trades first")
+    parser.add_argument("--interval", type=str, default=None, help="Candle interval of the grid (default: TIMEFRAME)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Trades per chunk")
+    parser.add_argument("--fee", type=float, default=0.0, help="Fee rate per fill")
+    args = parser.parse_args()
+    interval = args.interval or TRADING_CONFIG["timeframe"]
+
+    source = args.ticks or os.path.join("state", "ticks", f"{TRADING_CONFIG['pair'].upper()}-synthetic")
+    if args.synthetic:
+        print(f"🧪 Writing {args.synthetic} synthetic trades to {source}")
+        write_synthetic(source, args.synthetic, chunk_size=args.chunk)
+
+    strategy = ScalpingStrategy()
+    print(f"\n⏱️ Tick backtest of {tick_count(source)} trades in chunks of {args.chunk} "
+          f"({strategy.grid_size_pct * 100:.2f}% grid, {interval} candles)")
+    simulator, rate = run_ticks(source, strategy, interval, args.chunk, fee_rate=args.fee)
+    print(f"Throughput:    {rate:,.0f} trades/s")
+
+    _, closes = simulator.closes()
+    bars = engine.simulate(closes, engine.strategy_signals(strategy, closes))
+    _report("Intrabar fills", simulator.result(), 1000.0)
+    _report("Close fills", bars, 1000.0)
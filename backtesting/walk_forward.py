@@ -0,0 +1,232 @@
+# python -m backtesting.walk_forward --symbol XRPUSDT --interval 1h --limit 8000 --train 2000 --test 500 --workers 4
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from backtesting import engine, shared
+from backtesting.optimize import Optimizer, batch_evaluate, configured_lookback, evaluate, frange
+from data.kline_store import interval_ms
+
+
+def fold_bounds(timestamps, interval, train, test, step=None):
+    """Rolling (train_start, test_start, test_end) index triples over a timestamp array.
+
+    Fold starts sit on a fixed time grid (multiples of `step` candles since the epoch),
+    so extending the history leaves every earlier fold on exactly the same candles.
+    Only folds whose test window is complete are returned.
+    """
+    if not len(timestamps):
+        return []
+    bar = interval_ms(interval)
+    stride = (step or test) * bar
+    start = -(-int(timestamps[0]) // stride) * stride
+    last_open = int(timestamps[-1])
+
+    bounds = []
+    while start + (train + test - 1) * bar <= last_open:
+        edges = np.searchsorted(timestamps, [start, start + train * bar, start + (train + test) * bar])
+        bounds.append(tuple(int(edge) for edge in edges))
+        start += stride
+    return bounds
+
+
+def windows(bounds, lookback):
+    """(train, test) index ranges of a fold; the test run starts `lookback` bars early so its
+    first signal can fire on the first test bar"""
+    train_start, test_start, test_end = bounds
+    return (train_start, test_start), (test_start - lookback, test_end)
+
+
+def window_key(timestamps, close, window, initial_balance, lookback):
+    """Hash of one window's candles and the settings every result on it depends on"""
+    start, end = window
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(timestamps[start:end]).tobytes())
+    digest.update(np.ascontiguousarray(close[start:end]).tobytes())
+    digest.update(json.dumps({"balance": initial_balance, "lookback": lookback}).encode())
+    return digest.hexdigest()
+
+
+def param_key(drop, rebound):
+    return json.dumps([drop, rebound])
+
+
+def run_fold(close, bounds, grid, initial_balance=1000.0, lookback=None, known_train=None, known_test=None):
+    """Optimize the grid on the train slice, then trade the winner on the unseen test slice.
+
+    `known_train` / `known_test` map param_key() to results already computed on the same
+    windows; only the missing grid points are evaluated.
+    """
+    lookback = lookback or configured_lookback()
+    (train_start, train_end), (test_start, test_end) = windows(bounds, lookback)
+    known_train = known_train or {}
+    known_test = known_test or {}
+
+    missing = [params for params in grid if param_key(*params) not in known_train]
+    computed = batch_evaluate(close[train_start:train_end], missing, initial_balance, lookback) if missing else []
+    new_train = {param_key(result["drop"], result["rebound"]): result for result in computed}
+    train_results = [known_train.get(param_key(*params)) or new_train[param_key(*params)] for params in grid]
+    best = max(train_results, key=lambda result: result["return_pct"])
+
+    new_test = {}
+    best_key = param_key(best["drop"], best["rebound"])
+    test = known_test.get(best_key)
+    if test is None:
+        test = evaluate(close[test_start:test_end], best["drop"], best["rebound"], initial_balance, lookback)
+        new_test[best_key] = test
+    return {
+        "drop": best["drop"],
+        "rebound": best["rebound"],
+        "train_return_pct": best["return_pct"],
+        "test_return_pct": test["return_pct"],
+        "test_trades": test["trades"],
+        "new_train": new_train,
+        "new_test": new_test,
+    }
+
+
+def _run_fold_shared(bounds, grid, initial_balance, lookback, known_train, known_test):
+    return run_fold(shared.shared_close(), bounds, grid, initial_balance, lookback, known_train, known_test)
+
+
+def load_results(cache_dir, key):
+    path = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_results(cache_dir, key, results):
+    tmp = os.path.join(cache_dir, f"{key}.tmp.json")
+    with open(tmp, "w") as f:
+        json.dump(results, f)
+    os.replace(tmp, os.path.join(cache_dir, f"{key}.json"))
+
+
+def walk_forward(df, interval, drop_range, rebound_range, train, test, step=None, workers=1,
+                 cache_dir="state/walk_forward", initial_balance=1000.0, lookback=None):
+    """Walk-forward optimization with results memoized on disk; returns (folds_df, summary).
+
+    Every cached result is keyed on the hash of the window it ran on plus its own
+    (drop, rebound) pair, so growing the history or the grid only evaluates what is new.
+    """
+    import pandas as pd  # keeps `--help` and fold workers free of its import time
+    lookback = lookback or configured_lookback()
+    grid = [(drop, rebound) for drop in drop_range for rebound in rebound_range]
+    if isinstance(df.index, pd.DatetimeIndex):
+        timestamps = df.index.values.astype("datetime64[ms]").astype(np.int64)
+    else:
+        timestamps = np.asarray(df.index, dtype=np.int64)
+    close = engine.as_array(df["close"])
+    bounds = [b for b in fold_bounds(timestamps, interval, train, test, step) if b[1] - b[0] > lookback]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    keys = [tuple(window_key(timestamps, close, w, initial_balance, lookback) for w in windows(b, lookback))
+            for b in bounds]
+    known = [(load_results(cache_dir, train_key), load_results(cache_dir, test_key)) for train_key, test_key in keys]
+    results = [None] * len(bounds)
+    evaluated = 0
+
+    def store(i, result):
+        nonlocal evaluated
+        results[i] = result
+        evaluated += len(result["new_train"])
+        for key, cached, new in zip(keys[i], known[i], (result["new_train"], result["new_test"])):
+            if new:
+                cached.update(new)
+                save_results(cache_dir, key, cached)
+
+    todo = []
+    for i, (known_train, known_test) in enumerate(known):
+        if all(param_key(*params) in known_train for params in grid):
+            # Every train result is cached, at most the winner's test run is left
+            store(i, run_fold(close, bounds[i], grid, initial_balance, lookback, known_train, known_test))
+        else:
+            todo.append(i)
+    print(f"🧮 {len(bounds)} folds, {len(bounds) - len(todo)} cached, {len(todo)} to compute")
+    started = time.perf_counter()
+
+    if workers <= 1 or len(todo) <= 1:
+        for i in todo:
+            store(i, run_fold(close, bounds[i], grid, initial_balance, lookback, *known[i]))
+    elif todo:
+        with shared.publish_close(close) as initargs:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=shared.attach_close,
+                initargs=initargs,
+            ) as pool:
+                futures = {pool.submit(_run_fold_shared, bounds[i], grid, initial_balance, lookback, *known[i]): i
+                           for i in todo}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    store(futures[future], future.result())
+                    elapsed = time.perf_counter() - started
+                    print(f"[{done}/{len(todo)}] folds | elapsed {elapsed:.1f}s, "
+                          f"ETA {elapsed / done * (len(todo) - done):.1f}s")
+
+    index = df.index
+    rows = []
+    equity = initial_balance
+    for (train_start, test_start, test_end), result in zip(bounds, results):
+        equity *= 1 + result["test_return_pct"] / 100
+        rows.append({
+            "train_start": index[train_start],
+            "test_start": index[test_start],
+            "test_end": index[test_end - 1],
+            "drop": result["drop"],
+            "rebound": result["rebound"],
+            "train_return_pct": result["train_return_pct"],
+            "test_return_pct": result["test_return_pct"],
+            "test_trades": result["test_trades"],
+            "oos_equity": round(equity, 2),
+        })
+    folds = pd.DataFrame(rows)
+
+    summary = {"folds": len(rows), "computed": len(todo), "evaluated": evaluated, "oos_equity": round(equity, 2)}
+    if rows:
+        changed = (folds[["drop", "rebound"]].diff().abs().sum(axis=1) > 0).iloc[1:]
+        summary.update({
+            "oos_return_pct": round((equity - initial_balance) / initial_balance * 100, 2),
+            "drop_std": round(float(folds["drop"].std(ddof=0)), 3),
+            "rebound_std": round(float(folds["rebound"].std(ddof=0)), 3),
+            "param_changes": int(changed.sum()),
+        })
+    return folds, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbol", type=str, default="XRPUSDT", help="Trading pair to optimize")
+    parser.add_argument("--interval", type=str, default="1h", help="Candle timeframe (e.g. 15m, 1h)")
+    parser.add_argument("--drop_start", type=float, default=1.0, help="Start drop %%")
+    parser.add_argument("--drop_end", type=float, default=3.0, help="End drop %%")
+    parser.add_argument("--rebound_start", type=float, default=1.0, help="Start rebound %%")
+    parser.add_argument("--rebound_end", type=float, default=3.0, help="End rebound %%")
+    parser.add_argument("--step", type=float, default=0.5, help="Step size for both params")
+    parser.add_argument("--train", type=int, default=2000, help="Candles per training window")
+    parser.add_argument("--test", type=int, default=500, help="Candles per out-of-sample window (and fold stride)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for folds (1 = serial)")
+    parser.add_argument("--offline", action="store_true", help="Use cached candles only (no network)")
+    parser.add_argument("--limit", type=int, default=8000, help="Number of candles of history")
+    parser.add_argument("--cache_dir", type=str, default="state/walk_forward", help="Fold result cache")
+    args = parser.parse_args()
+
+    drop_range = [round(x, 2) for x in frange(args.drop_start, args.drop_end, args.step)]
+    rebound_range = [round(x, 2) for x in frange(args.rebound_start, args.rebound_end, args.step)]
+
+    optimizer = Optimizer(symbol=args.symbol, interval=args.interval, limit=args.limit, offline=args.offline)
+    df = optimizer.fetch_data()
+    print(f"\n🚶 Walk-forward on {optimizer.symbol} [{args.interval}], candles: {len(df)}, "
+          f"train {args.train} / test {args.test}\n")
+
+    folds, summary = walk_forward(df, args.interval, drop_range, rebound_range, args.train, args.test,
+                                  workers=args.workers, cache_dir=args.cache_dir)
+    print("\n📈 Out-of-sample results per fold:")
+    print(folds.to_string(index=False))
+    print(f"\nOOS equity: ${summary['oos_equity']:.2f} ({summary.get('oos_return_pct', 0.0):.2f}%) over "
+          f"{summary['folds']} folds | drop σ {summary.get('drop_std', 0.0)}, rebound σ "
+          f"{summary.get('rebound_std', 0.0)}, parameter changes: {summary.get('param_changes', 0)}")
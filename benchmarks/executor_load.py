@@ -0,0 +1,81 @@
+# Drive TradeExecutor through many trading cycles against the simulated exchange
+# Run from the repo root: python -m benchmarks.executor_load --symbols 4 --cycles 5000
+import argparse
+import os
+import tempfile
+import time
+from brokers.account import AccountCache
+from brokers.exchange_info import ExchangeInfoCache
+from brokers.simulated_exchange import LatencyProfile, SimulatedBinanceAPI, SimulatedExchange
+from data.kline_store import KlineStore
+from data.market_data import MarketData
+from execution.executor import TradeExecutor
+from execution.position_manager import PositionManager
+from logs.metrics import get_metrics
+
+
+def run_load(symbols, cycles, state_dir, latency=0.0, jitter=0.0, error_rate=0.0, seed=42):
+    """Advance the simulated market one candle per cycle and run every executor once; returns a report"""
+    exchange = SimulatedExchange(symbols, bars=cycles + 10, seed=seed)
+    api = SimulatedBinanceAPI(exchange, LatencyProfile(latency, jitter, error_rate, seed))
+    store = KlineStore(api, root=os.path.join(state_dir, "klines"))
+    position_mgr = PositionManager(os.path.join(state_dir, "positions.json"))
+    exchange_info = ExchangeInfoCache(api, snapshot_file=os.path.join(state_dir, "exchange_info.json"))
+    account = AccountCache(api)
+    notifications = []
+
+    executors = [
+        TradeExecutor(
+            symbol=symbol,
+            api=api,
+            market_data=MarketData(api=api, symbol=symbol, interval=exchange.interval, store=store),
+            position_mgr=position_mgr,
+            exchange_info=exchange_info,
+            account=account,
+            notify=notifications.append,
+        )
+        for symbol in symbols
+    ]
+
+    started = time.perf_counter()
+    for _ in range(cycles):
+        exchange.advance()
+        for executor in executors:
+            executor.run_once()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "cycles": cycles * len(symbols),
+        "elapsed": elapsed,
+        "cycles_per_second": cycles * len(symbols) / elapsed,
+        "orders": exchange.orders,
+        "fees_paid": exchange.fees_paid,
+        "api_calls": api.calls,
+        "api_errors": sum(value for (name, _), value in get_metrics().counters.items() if name == "api_errors_total"),
+        "notifications": len(notifications),
+        "open_positions": position_mgr.get_all_positions(),
+        "balances": dict(exchange.balances),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=4, help="Number of simulated trading pairs")
+    parser.add_argument("--cycles", type=int, default=5000, help="Candles to simulate per pair")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean simulated request latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform latency jitter (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    args = parser.parse_args()
+
+    symbols = [f"SIM{i}USDT" for i in range(args.symbols)]
+    with tempfile.TemporaryDirectory() as state_dir:
+        report = run_load(symbols, args.cycles, state_dir, args.latency, args.jitter, args.error_rate)
+
+    print(f"\n🏁 {report['cycles']} trading cycles in {report['elapsed']:.2f}s "
+          f"→ {report['cycles_per_second']:.0f} cycles/s")
+    print(f"Orders: {report['orders']} | Fees: {report['fees_paid']:.2f} USDT | "
+          f"API calls: {report['api_calls']} ({report['api_errors']} failed)")
+    print(f"USDT balance: {report['balances'].get('USDT', 0.0):.2f} | Open positions: {len(report['open_positions'])}")
+    print("\n⏱️ Stage latency:")
+    for stage, s in get_metrics().summary().items():
+        print(f"{stage:>16}: p50 {s['p50_ms']:.3f}ms | p99 {s['p99_ms']:.3f}ms | max {s['max_ms']:.3f}ms ({s['count']} calls)")
@@ -0,0 +1,75 @@
+# Compare kline decoding paths on a synthetic /api/v3/klines body
+# Run from the repo root: python -m benchmarks.kline_decode
+import argparse
+import json
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from data.kline_store import decode_klines, klines_to_columns, to_frame
+
+
+def make_body(rows):
+    rng = np.random.default_rng(7)
+    start = 1_600_000_000_000
+    closes = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    klines = [
+        [start + i * 60_000, f"{c:.8f}", f"{c * 1.001:.8f}", f"{c * 0.999:.8f}", f"{c:.8f}",
+         f"{rng.uniform(0, 1000):.8f}", start + i * 60_000 + 59_999, "1234.5678", 42, "1.0", "2.0", "0"]
+        for i, c in enumerate(closes)
+    ]
+    return json.dumps(klines, separators=(",", ":")).encode()
+
+
+def legacy_frame(body):
+    """The original per-call path: 12-column object DataFrame, then to_datetime/set_index/astype"""
+    df = pd.DataFrame(json.loads(body), columns=[
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'close_time', 'quote_asset_volume', 'num_trades',
+        'taker_buy_base', 'taker_buy_quote', 'ignore'
+    ])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+
+
+def parsed_rows_frame(body):
+    return to_frame(klines_to_columns(json.loads(body)))
+
+
+def decoded_frame(body):
+    return to_frame(decode_klines(body))
+
+
+def measure(fn, body, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    body = make_body(args.rows)
+    print(f"📦 {args.rows} klines, {len(body) / 1e6:.1f} MB body")
+
+    pd.testing.assert_frame_equal(legacy_frame(body), decoded_frame(body), check_freq=False)
+
+    baseline = None
+    for name, fn in (("legacy DataFrame", legacy_frame), ("json rows -> columns", parsed_rows_frame),
+                     ("byte decoder", decoded_frame)):
+        seconds, peak = measure(fn, body, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:>22}: {seconds * 1000:8.1f} ms | {args.rows / seconds / 1e6:5.2f} M rows/s | "
+              f"peak {peak / 1e6:7.1f} MB | {baseline / seconds:4.1f}x")
@@ -0,0 +1,65 @@
+# Track import cost of the CLI entry points, each measured in a fresh interpreter
+# Run from the repo root: python -m benchmarks.startup --repeat 5
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ("main", "backtesting.backtester", "backtesting.optimize", "backtesting.walk_forward",
+                "backtesting.search", "backtesting.robustness", "backtesting.tick_backtest")
+HEAVY = ("binance", "aiohttp", "dateparser", "pandas", "requests", "websockets", "dotenv")
+
+
+def import_profile(module):
+    """(total import µs, {top-level package: cumulative µs}) from one `python -X importtime` run"""
+    env = {key: value for key, value in os.environ.items() if key != "ENVIRONMENT"}  # must not be needed to import
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True,
+                         text=True, env=env, check=True).stderr
+    total = 0
+    packages = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative = int(cumulative)
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        if depth == 1:
+            total += cumulative  # top-level imports only, nested ones are part of their parent
+        package = name.split(".")[0]
+        packages[package] = max(packages.get(package, 0), cumulative)
+    return total, packages
+
+
+def help_seconds(module):
+    """Wall time of `python -m module --help`, the cost a user feels before any work starts"""
+    env = {key: value for key, value in os.environ.items() if key != "ENVIRONMENT"}
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", module, "--help"], capture_output=True, env=env, check=True)
+    return time.perf_counter() - started
+
+
+def measure(module, repeat):
+    """Best of `repeat` runs, so disk cache and scheduler noise do not count"""
+    runs = [import_profile(module) for _ in range(repeat)]
+    total, packages = min(runs, key=lambda run: run[0])
+    return {
+        "import_ms": total / 1000,
+        "help_ms": min(help_seconds(module) for _ in range(repeat)) * 1000,
+        "heavy": sorted((p for p in packages if p in HEAVY), key=lambda p: -packages[p]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point (best one is kept)")
+    parser.add_argument("--modules", type=str, default=",".join(ENTRY_POINTS), help="Comma-separated modules")
+    args = parser.parse_args()
+
+    baseline = import_profile("sys")[0] / 1000
+    print(f"🚀 Startup cost per entry point, best of {args.repeat} (bare interpreter imports: {baseline:.1f} ms)")
+    for module in args.modules.split(","):
+        result = measure(module, args.repeat)
+        print(f"{module:>26}: import {result['import_ms']:7.1f} ms | --help {result['help_ms']:7.1f} ms | "
+              f"heavy: {', '.join(result['heavy']) or '-'}")
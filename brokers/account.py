@@ -0,0 +1,158 @@
+# Account balances and order updates kept current by the user-data stream
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from config.settings import BINANCE_CONFIG
+from data.stream import WebSocketStream
+
+LISTEN_KEY_KEEPALIVE = 30 * 60  # seconds; Binance drops a listen key after 60 minutes without one
+MAX_ORDERS = 1000  # execution reports kept in memory
+
+
+class Balance(NamedTuple):
+    asset: str
+    free: float
+    locked: float
+
+    @property
+    def total(self):
+        return self.free + self.locked
+
+
+class AccountCache:
+    """Balances seeded by one REST snapshot, then kept current by user-data stream events.
+
+    While the stream is connected every read is in memory. Without it, a snapshot
+    older than `max_age` seconds (or one invalidated by our own order) is refreshed
+    over REST on the next read, so balances are never staler than that bound.
+    """
+
+    def __init__(self, api, max_age=60.0):
+        self.api = api
+        self.max_age = max_age
+        self.balances = {}
+        self.orders = OrderedDict()  # orderId -> latest execution report
+        self.synced_at = None  # monotonic time of the last REST snapshot
+        self._position_events = {}  # asset -> exchange time (ms) of its newest absolute balance
+        self._stream = None
+        self._loop = None
+        self._listen_key = None
+        self._lock = threading.Lock()
+
+    @property
+    def live(self):
+        """True while the user-data stream is connected on top of a snapshot"""
+        return self._stream is not None and self._stream.connected and self.synced_at is not None
+
+    def is_fresh(self):
+        if self.live:
+            return True
+        return self.synced_at is not None and time.monotonic() - self.synced_at < self.max_age
+
+    def balance(self, asset):
+        """Balance of one asset; refreshed over REST first only if the cache is stale"""
+        if not self.is_fresh():
+            self.refresh()
+        with self._lock:
+            return self.balances.get(asset) or Balance(asset, 0.0, 0.0)
+
+    def invalidate(self):
+        """Force the next read to refresh, unless the stream will report the change itself"""
+        if not self.live:
+            self.synced_at = None
+
+    def refresh(self):
+        """Replace balances with a REST snapshot; keeps the last known ones on failure"""
+        account = self.api.get_account()
+        if not account:
+            return False
+        updated = account.get("updateTime", 0)
+        with self._lock:
+            for b in account["balances"]:
+                asset = b["asset"]
+                if self._position_events.get(asset, 0) <= updated:
+                    self.balances[asset] = Balance(asset, float(b["free"]), float(b["locked"]))
+            self.synced_at = time.monotonic()
+        return True
+
+    def apply(self, event):
+        """Apply one user-data stream event"""
+        kind = event.get("e")
+        with self._lock:
+            if kind == "outboundAccountPosition":
+                for b in event["B"]:
+                    asset = b["a"]
+                    if event["E"] >= self._position_events.get(asset, 0):
+                        self.balances[asset] = Balance(asset, float(b["f"]), float(b["l"]))
+                        self._position_events[asset] = event["E"]
+            elif kind == "balanceUpdate":
+                # A deposit or withdrawal; skip it if an absolute balance after it already arrived
+                asset = event["a"]
+                if event["E"] > self._position_events.get(asset, 0):
+                    old = self.balances.get(asset) or Balance(asset, 0.0, 0.0)
+                    self.balances[asset] = old._replace(free=old.free + float(event["d"]))
+            elif kind == "executionReport":
+                self.orders[event["i"]] = {
+                    "symbol": event["s"],
+                    "side": event["S"],
+                    "status": event["X"],
+                    "client_order_id": event["c"],
+                    "filled_qty": float(event["z"]),
+                    "quote_qty": float(event["Z"]),
+                }
+                self.orders.move_to_end(event["i"])
+                if len(self.orders) > MAX_ORDERS:
+                    self.orders.popitem(last=False)
+
+    async def stream(self, ws_url=None):
+        """Follow the user-data stream, resyncing over REST after every (re)connect"""
+        base = ws_url or BINANCE_CONFIG["ws_url"]
+
+        def url():
+            self._listen_key = self.api.create_listen_key()
+            return f"{base}/{self._listen_key}" if self._listen_key else None
+
+        async def on_message(event):
+            if event.get("e") == "listenKeyExpired":
+                logging.warning("User-data listen key expired, reconnecting")
+                await self._stream.reconnect()
+                return
+            self.apply(event)
+
+        async def on_connect():
+            # Catch up on anything missed while disconnected; a fresh start() snapshot already covers the first connect
+            if self._stream.reconnects or not self.is_fresh():
+                await asyncio.to_thread(self.refresh)
+            logging.info(f"👛 Account stream live with {len(self.balances)} balances")
+
+        self._stream = WebSocketStream(url, on_message, on_connect)
+        keepalive = asyncio.create_task(self._keepalive())
+        try:
+            await self._stream.run()
+        finally:
+            keepalive.cancel()
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(LISTEN_KEY_KEEPALIVE)
+            if self._listen_key:
+                await asyncio.to_thread(self.api.keepalive_listen_key, self._listen_key)
+
+    def start(self, ws_url=None):
+        """Seed balances over REST, then run stream() on its own event loop in a daemon thread"""
+        self.refresh()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.stream(ws_url))
+
+        thread = threading.Thread(target=run, name="account-stream", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        if self._stream is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stream.stop(), self._loop).result(timeout=5)
@@ -1,59 +1,215 @@
 # brokers/binance_api.py
-from binance.client import Client
+from brokers.transport import get_binance_scheduler, get_transport
 from config.settings import BINANCE_CONFIG, TRADING_CONFIG
+from data.kline_store import decode_klines
+from logs.metrics import get_metrics
 import logging
-import requests
+import threading
+import time
+
+# Request weights of the public endpoints we call directly (GET /api/v3/...)
+KLINES_WEIGHT = 2
+TICKER_PRICE_WEIGHT = 2
+EXCHANGE_INFO_WEIGHT = 20
+# Signed calls go through python-binance's own session, but spend from the same weight budget
+TIME_WEIGHT = 1
+ACCOUNT_WEIGHT = 20
+ORDER_WEIGHT = 1
+LISTEN_KEY_WEIGHT = 2
+
+TIME_SYNC_TTL = 1800  # seconds a measured server time offset is trusted
+TIMESTAMP_ERROR = -1021  # "Timestamp for this request is outside of the recvWindow"
 
 class BinanceAPI:
-    def __init__(self):
+    def __init__(self, transport=None, scheduler=None, client=None):
         api_key = BINANCE_CONFIG["api_key"]
         api_secret = BINANCE_CONFIG["api_secret"]
         base_url = BINANCE_CONFIG["base_url"]
         self.use_testnet = TRADING_CONFIG["testnet"]
+        self.rest_url = base_url.rstrip("/")
+        self.transport = transport or get_transport()
+        self.scheduler = scheduler or get_binance_scheduler()
 
-        self.client = Client(api_key=api_key, api_secret=api_secret)
-
-        if self.use_testnet:
-            self.client.API_URL = base_url
-            self.client._base_endpoint = base_url
-            self.client._api_url = base_url
+        if client is None:
+            # python-binance pulls in aiohttp and dateparser (~0.7s), so only clients that are built pay for it
+            from binance.client import Client
+            client = Client(api_key=api_key, api_secret=api_secret, ping=False)
+            if self.use_testnet:
+                client.API_URL = base_url
+                client._base_endpoint = base_url
+                client._api_url = base_url
+        self.client = client
+        self._time_synced_at = None
+        self._time_lock = threading.Lock()
 
         env = "TESTNET" if self.use_testnet else "LIVE"
         logging.info(f"🌐 Using Binance {env} API: {base_url}")
 
+    def sync_time(self, force=False):
+        """Keep the signing clock aligned with the server; only calls /time when the offset is stale.
+
+        Signed requests then carry a corrected timestamp without a round trip of their own.
+        Returns the offset in ms (the previous one if the server could not be reached).
+        """
+        with self._time_lock:
+            fresh = self._time_synced_at is not None and time.monotonic() - self._time_synced_at < TIME_SYNC_TTL
+            if fresh and not force:
+                return self.client.timestamp_offset
+            try:
+                self.scheduler.acquire(TIME_WEIGHT)
+                sent = time.time() * 1000
+                server_time = self.client.get_server_time()["serverTime"]
+                received = time.time() * 1000
+                self.client.timestamp_offset = int(server_time - (sent + received) / 2)
+                self._time_synced_at = time.monotonic()
+                logging.info(f"🕒 Server time offset: {self.client.timestamp_offset}ms")
+            except Exception as e:
+                logging.warning(f"Could not sync server time: {e}")
+                get_metrics().inc("api_errors_total", endpoint="time")
+            return self.client.timestamp_offset
+
     def get_asset_balance(self, asset: str) -> float:
+        """Free balance of one asset from a single /account call (retried once), 0.0 if unavailable."""
+        # client.get_asset_balance() fetches the whole account anyway, so go there directly
+        for attempt in (1, 2):
+            try:
+                self.scheduler.acquire(ACCOUNT_WEIGHT)
+                for b in self.client.get_account()['balances']:
+                    if b['asset'] == asset:
+                        return float(b['free'])
+                return 0.0
+            except Exception as e:
+                if attempt == 1:
+                    logging.warning(f"Balance request failed for {asset}, retrying: {e}")
+                    get_metrics().inc("api_retries_total", endpoint="balance")
+                else:
+                    logging.error(f"Failed to fetch balance for asset {asset}: {e}")
+                    get_metrics().inc("api_errors_total", endpoint="balance")
+        return 0.0
+
+    def get_account(self):
+        """Signed /api/v3/account snapshot (all balances), or None on failure."""
         try:
-            balance_info = self.client.get_asset_balance(asset=asset)
-            if balance_info:
-                return float(balance_info['free'])
+            self.scheduler.acquire(ACCOUNT_WEIGHT)
+            return self.client.get_account()
         except Exception as e:
-            logging.warning(f"Direct asset balance failed for {asset}, trying fallback: {e}")
+            logging.error(f"Failed to fetch account: {e}")
+            get_metrics().inc("api_errors_total", endpoint="account")
+            return None
 
+    def create_listen_key(self):
+        """Listen key for the user-data stream, or None on failure."""
         try:
-            account_info = self.client.get_account()
-            for b in account_info['balances']:
-                if b['asset'] == asset:
-                    return float(b['free'])
+            self.scheduler.acquire(LISTEN_KEY_WEIGHT)
+            return self.client.stream_get_listen_key()
         except Exception as e:
-            logging.error(f"Failed to fetch fallback balance for asset {asset}: {e}")
+            logging.error(f"Failed to create user-data listen key: {e}")
+            get_metrics().inc("api_errors_total", endpoint="listen_key")
+            return None
 
-        return 0.0
+    def keepalive_listen_key(self, listen_key):
+        """Extend a listen key's 60 minute lifetime; False on failure."""
+        try:
+            self.scheduler.acquire(LISTEN_KEY_WEIGHT)
+            self.client.stream_keepalive(listen_key)
+            return True
+        except Exception as e:
+            logging.warning(f"Listen key keepalive failed: {e}")
+            get_metrics().inc("api_errors_total", endpoint="listen_key")
+            return False
+
+    def get_symbol_price(self, symbol: str):
+        """Latest traded price for a symbol, or None if it could not be fetched."""
+        try:
+            response = self.transport.get(
+                f"{self.rest_url}/api/v3/ticker/price",
+                params={"symbol": symbol},
+                scheduler=self.scheduler,
+                weight=TICKER_PRICE_WEIGHT,
+            )
+            response.raise_for_status()
+            return float(response.json()["price"])
+        except Exception as e:
+            logging.error(f"Error fetching price for {symbol}: {e}")
+            get_metrics().inc("api_errors_total", endpoint="ticker_price")
+            return None
+
+    def get_exchange_info(self):
+        """Full /api/v3/exchangeInfo (symbols and their trading filters), or None on failure."""
+        try:
+            response = self.transport.get(
+                f"{self.rest_url}/api/v3/exchangeInfo",
+                scheduler=self.scheduler,
+                weight=EXCHANGE_INFO_WEIGHT,
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logging.error(f"Error fetching exchange info: {e}")
+            get_metrics().inc("api_errors_total", endpoint="exchange_info")
+            return None
+
+    def place_market_order(self, symbol: str, side: str, quantity: float):
+        """Submit a MARKET order and return the exchange response, or None on failure."""
+        from binance.exceptions import BinanceAPIException
+        self.sync_time()
+        try:
+            try:
+                self.scheduler.acquire(ORDER_WEIGHT)
+                return self.client.create_order(symbol=symbol, side=side.upper(), type="MARKET", quantity=quantity)
+            except BinanceAPIException as e:
+                if e.code != TIMESTAMP_ERROR:
+                    raise
+                # Rejected before matching, so resubmitting cannot double fill
+                logging.warning(f"Order timestamp rejected for {symbol}, resyncing server time")
+                get_metrics().inc("api_retries_total", endpoint="order")
+                self.sync_time(force=True)
+                self.scheduler.acquire(ORDER_WEIGHT)
+                return self.client.create_order(symbol=symbol, side=side.upper(), type="MARKET", quantity=quantity)
+        except Exception as e:
+            logging.error(f"Market {side} order failed for {symbol}: {e}")
+            get_metrics().inc("api_errors_total", endpoint="order")
+            return None
 
-    def get_klines(self, symbol: str, interval: str, limit: int = 100):
+    def get_klines(self, symbol: str, interval: str, limit: int = 100, start_time: int = None, end_time: int = None):
         """
         Fetch OHLCV candlestick data using direct REST API call (compatible with testnet).
+        Optional start_time/end_time (ms) select an explicit range of open times.
         """
         try:
-            base_url = "https://testnet.binance.vision" if self.use_testnet else "https://api.binance.com"
-            url = f"{base_url}/api/v3/klines"
+            url = f"{self.rest_url}/api/v3/klines"
             params = {
                 "symbol": symbol,
                 "interval": interval,
                 "limit": limit
             }
-            response = requests.get(url, params=params, timeout=5)
+            if start_time is not None:
+                params["startTime"] = start_time
+            if end_time is not None:
+                params["endTime"] = end_time
+            response = self.transport.get(url, params=params, timeout=5, scheduler=self.scheduler, weight=KLINES_WEIGHT)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logging.error(f"Error fetching klines for {symbol} at {interval}: {e}")
+            get_metrics().inc("api_errors_total", endpoint="klines")
             return []
+
+    def get_kline_columns(self, symbol: str, interval: str, limit: int = 100, start_time: int = None, end_time: int = None):
+        """Like get_klines, but decoded from the raw body into typed NumPy columns (empty on error)."""
+        try:
+            params = {"symbol": symbol, "interval": interval, "limit": limit}
+            if start_time is not None:
+                params["startTime"] = start_time
+            if end_time is not None:
+                params["endTime"] = end_time
+            response = self.transport.get(
+                f"{self.rest_url}/api/v3/klines", params=params, timeout=5,
+                scheduler=self.scheduler, weight=KLINES_WEIGHT,
+            )
+            response.raise_for_status()
+            return decode_klines(response.content)
+        except Exception as e:
+            logging.error(f"Error fetching klines for {symbol} at {interval}: {e}")
+            get_metrics().inc("api_errors_total", endpoint="klines")
+            return decode_klines(b"[]")
@@ -0,0 +1,140 @@
+# Cached exchange metadata for pre-trade quantity/price normalization
+import json
+import logging
+import os
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN
+
+
+def index_filters(exchange_info):
+    """Pick the LOT_SIZE / PRICE_FILTER / (MIN_)NOTIONAL values we trade with, per symbol"""
+    index = {}
+    for info in exchange_info.get("symbols", []):
+        filters = {"base_asset": info.get("baseAsset"), "quote_asset": info.get("quoteAsset")}
+        for f in info.get("filters", []):
+            kind = f["filterType"]
+            if kind == "LOT_SIZE":
+                filters["step_size"] = f["stepSize"]
+                filters["min_qty"] = f["minQty"]
+                filters["max_qty"] = f["maxQty"]
+            elif kind == "PRICE_FILTER":
+                filters["tick_size"] = f["tickSize"]
+                filters["min_price"] = f["minPrice"]
+                filters["max_price"] = f["maxPrice"]
+            elif kind in ("MIN_NOTIONAL", "NOTIONAL"):
+                filters["min_notional"] = f.get("minNotional")
+        index[info["symbol"]] = filters
+    return index
+
+
+def _floor_to_step(value, step):
+    step = Decimal(step)
+    if step <= 0:
+        return Decimal(str(value))
+    return (Decimal(str(value)) / step).to_integral_value(rounding=ROUND_DOWN) * step
+
+
+class ExchangeInfoCache:
+    """exchangeInfo loaded once and indexed per symbol in memory.
+
+    The index is refreshed after `ttl` seconds and snapshotted to disk, so a
+    restart reuses the snapshot instead of downloading exchangeInfo again. If a
+    refresh fails the last known filters keep being used and the next attempt
+    waits `retry_delay` seconds, doubling per failure up to `ttl`. Symbols the
+    exchange does not list are remembered until the next refresh.
+    """
+
+    def __init__(self, api=None, ttl=3600, snapshot_file="state/exchange_info.json", retry_delay=30):
+        self.api = api
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self.snapshot_file = snapshot_file
+        self.symbols = {}
+        self.unknown = set()
+        self.fetched_at = 0.0
+        self.retry_at = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._load_snapshot()
+
+    def filters(self, symbol):
+        """Filter values for a symbol, refreshing the cache if it expired"""
+        seen = self.fetched_at
+        if self._needs_refresh(symbol, seen):
+            self.refresh(seen)
+            if symbol not in self.symbols:
+                self.unknown.add(symbol)
+        return self.symbols.get(symbol)
+
+    def _needs_refresh(self, symbol, fetched_at):
+        now = time.time()
+        if now < self.retry_at:
+            return False
+        return now - fetched_at > self.ttl or (symbol not in self.symbols and symbol not in self.unknown)
+
+    def refresh(self, seen=None):
+        """Download exchangeInfo; with `seen`, skip it if another thread refreshed since that timestamp"""
+        with self._lock:
+            if self.api is None or (seen is not None and self.fetched_at != seen):
+                return
+            try:
+                exchange_info = self.api.get_exchange_info()
+            except Exception as e:
+                exchange_info = None
+                logging.warning(f"exchangeInfo refresh failed, keeping cached filters: {e}")
+            if not exchange_info:
+                self._failures += 1
+                delay = min(self.retry_delay * 2 ** (self._failures - 1), max(self.ttl, self.retry_delay))
+                self.retry_at = time.time() + delay
+                return
+
+            self.symbols = index_filters(exchange_info)
+            self.unknown = set()
+            self.fetched_at = time.time()
+            self.retry_at = 0.0
+            self._failures = 0
+            self._save_snapshot()
+            logging.info(f"📐 Cached exchange filters for {len(self.symbols)} symbols")
+
+    def normalize_quantity(self, symbol, qty):
+        """Floor a quantity to LOT_SIZE stepSize; 0.0 if it falls below minQty"""
+        f = self.filters(symbol)
+        if not f or "step_size" not in f:
+            return round(qty, 6)
+
+        qty = _floor_to_step(min(Decimal(str(qty)), Decimal(f["max_qty"])), f["step_size"])
+        if qty < Decimal(f["min_qty"]):
+            return 0.0
+        return float(qty)
+
+    def normalize_price(self, symbol, price):
+        """Floor a price to the PRICE_FILTER tickSize"""
+        f = self.filters(symbol)
+        if not f or "tick_size" not in f:
+            return price
+        return float(_floor_to_step(price, f["tick_size"]))
+
+    def meets_min_notional(self, symbol, qty, price):
+        f = self.filters(symbol)
+        if not f or not f.get("min_notional"):
+            return True
+        return Decimal(str(qty)) * Decimal(str(price)) >= Decimal(f["min_notional"])
+
+    def _save_snapshot(self):
+        os.makedirs(os.path.dirname(self.snapshot_file) or ".", exist_ok=True)
+        tmp = self.snapshot_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": self.fetched_at, "symbols": self.symbols}, f)
+        os.replace(tmp, self.snapshot_file)
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, "r") as f:
+                snapshot = json.load(f)
+            self.symbols = snapshot["symbols"]
+            self.fetched_at = snapshot["fetched_at"]
+        except (json.JSONDecodeError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable exchange info snapshot: {e}")
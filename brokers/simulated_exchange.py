@@ -0,0 +1,313 @@
+# In-process Binance stand-in for offline load tests of the trading loop
+import itertools
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import numpy as np
+import requests
+from brokers.binance_api import BinanceAPI
+from brokers.transport import WeightScheduler
+from data.kline_store import COLUMNS, candle_open, interval_ms
+
+
+class LatencyProfile:
+    """Per-request delay and failure rate applied by SimulatedNetwork"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def delay(self):
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def fails(self):
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+
+class SimulatedExchange:
+    """Random-walk markets with a depth-limited order book, balances and trading fees.
+
+    Each symbol has a price path of `history + bars` candles; `advance()` closes the
+    current candle and opens the next one. Market orders walk `depth_levels` price
+    levels (each worth `level_notional` quote) on the side they take, and the fee is
+    charged in the quote asset on both sides.
+    """
+
+    def __init__(self, symbols, interval="1m", history=1000, bars=100_000, quote_balance=10_000.0,
+                 fee_rate=0.001, spread_bps=2.0, level_bps=1.0, depth_levels=10, level_notional=1_000.0,
+                 volatility=0.003, seed=42, quote_asset="USDT"):
+        self.interval = interval
+        self.step = interval_ms(interval)
+        self.fee_rate = fee_rate
+        self.spread = spread_bps / 10_000
+        self.level_step = level_bps / 10_000
+        self.depth_levels = depth_levels
+        self.level_notional = level_notional
+        self.quote_asset = quote_asset
+
+        rng = np.random.default_rng(seed)
+        self.closes = {}
+        for symbol in symbols:
+            start = float(rng.uniform(0.5, 50_000))
+            walk = np.cumsum(rng.normal(0, volatility, history + bars))
+            self.closes[symbol] = start * np.exp(walk - walk.mean())  # re-centred on the start price
+        self.origin = candle_open(int(time.time() * 1000), interval) - history * self.step
+        self.now = history  # index of the candle currently forming
+
+        self.balances = {quote_asset: quote_balance}
+        self.orders = 0
+        self.fees_paid = 0.0
+        self._order_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def advance(self, bars=1):
+        with self._lock:
+            self.now += bars
+
+    def base_asset(self, symbol):
+        return symbol[:-len(self.quote_asset)]
+
+    def price(self, symbol):
+        return float(self.closes[symbol][self.now])
+
+    def klines(self, symbol, limit=100, start_time=None, end_time=None):
+        """Column arrays for candles [start_time, end_time], newest `limit` if no start is given"""
+        with self._lock:
+            now = self.now
+        last = now if end_time is None else min(now, (end_time - self.origin) // self.step)
+        first = max(0, last - limit + 1) if start_time is None else max(0, -(-(start_time - self.origin) // self.step))
+        last = min(last, first + limit - 1)
+        index = np.arange(first, max(first, last + 1))
+
+        closes = self.closes[symbol]
+        close = closes[index]
+        open_ = closes[np.maximum(index - 1, 0)]
+        timestamps = self.origin + index * self.step
+        return {
+            "timestamp": timestamps.astype(np.int64),
+            "open": open_,
+            "high": np.maximum(open_, close),
+            "low": np.minimum(open_, close),
+            "close": close,
+            "volume": np.full(len(index), 100.0),
+            # The forming candle closes in the real future so the kline store keeps it open
+            "close_time": np.where(index == now, 2**62, timestamps + self.step - 1).astype(np.int64),
+        }
+
+    def exchange_info(self):
+        symbols = []
+        for symbol, closes in self.closes.items():
+            price = float(closes[0])
+            tick = 10.0 ** (np.floor(np.log10(price)) - 4)
+            step = min(1.0, 10.0 ** -np.floor(np.log10(max(1.0, price)) + 1))
+            symbols.append({
+                "symbol": symbol, "baseAsset": self.base_asset(symbol), "quoteAsset": self.quote_asset,
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": f"{tick:.8f}", "maxPrice": "1000000.00000000",
+                     "tickSize": f"{tick:.8f}"},
+                    {"filterType": "LOT_SIZE", "minQty": f"{step:.8f}", "maxQty": "9000000.00000000",
+                     "stepSize": f"{step:.8f}"},
+                    {"filterType": "NOTIONAL", "minNotional": "5.00000000", "maxNotional": "9000000.00000000"},
+                ],
+            })
+        return {"symbols": symbols}
+
+    def market_order(self, symbol, side, quantity):
+        """Fill a market order against the book; raises ValueError like an exchange rejection"""
+        side = side.upper()
+        with self._lock:
+            mid = float(self.closes[symbol][self.now])
+            sign = 1 if side == "BUY" else -1
+            remaining = quantity
+            fills = []
+            for level in range(self.depth_levels):
+                if remaining <= 0:
+                    break
+                price = mid * (1 + sign * (self.spread / 2 + level * self.level_step))
+                qty = min(remaining, self.level_notional / price)
+                fills.append((price, qty))
+                remaining -= qty
+            if remaining > 1e-12:
+                raise ValueError(f"Order for {quantity} {symbol} exceeds book depth")
+
+            notional = sum(price * qty for price, qty in fills)
+            fee = notional * self.fee_rate
+            base = self.base_asset(symbol)
+            if side == "BUY":
+                if self.balances.get(self.quote_asset, 0.0) < notional + fee:
+                    raise ValueError("Account has insufficient balance for requested action.")
+                self.balances[self.quote_asset] -= notional + fee
+                self.balances[base] = self.balances.get(base, 0.0) + quantity
+            else:
+                if self.balances.get(base, 0.0) < quantity - 1e-12:
+                    raise ValueError("Account has insufficient balance for requested action.")
+                self.balances[base] -= quantity
+                self.balances[self.quote_asset] += notional - fee
+
+            self.orders += 1
+            self.fees_paid += fee
+            return {
+                "symbol": symbol,
+                "orderId": next(self._order_ids),
+                "side": side,
+                "type": "MARKET",
+                "status": "FILLED",
+                "executedQty": f"{quantity:.8f}",
+                "cummulativeQuoteQty": f"{notional:.8f}",
+                "fills": [
+                    {"price": f"{price:.8f}", "qty": f"{qty:.8f}",
+                     "commission": f"{price * qty * self.fee_rate:.8f}", "commissionAsset": self.quote_asset}
+                    for price, qty in fills
+                ],
+            }
+
+
+class SimulatedNetwork:
+    """Round trips to the simulated exchange: counts them (and how many overlap), sleeps the
+    profile's latency and draws failures"""
+
+    def __init__(self, profile=None):
+        self.profile = profile or LatencyProfile()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def round_trip(self):
+        """True if the request reaches the exchange"""
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.profile.delay()
+            if delay:
+                time.sleep(delay)
+            return not self.profile.fails()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _response(url, status_code, payload):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = "OK" if status_code == 200 else "Simulated error"
+    response.headers["Content-Type"] = "application/json"
+    response.encoding = "utf-8"
+    response._content = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return response
+
+
+class SimulatedTransport:
+    """Transport stand-in that answers the public REST endpoints with Binance-shaped JSON bodies"""
+
+    def __init__(self, exchange, network):
+        self.exchange = exchange
+        self.network = network
+        self.routes = {
+            "/api/v3/klines": self._klines,
+            "/api/v3/ticker/price": self._ticker_price,
+            "/api/v3/exchangeInfo": lambda params: self.exchange.exchange_info(),
+        }
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method, url, params=None, scheduler=None, weight=1, **kwargs):
+        if scheduler:
+            scheduler.acquire(weight)
+        route = self.routes.get(urlsplit(url).path)
+        if not self.network.round_trip():
+            response = _response(url, 503, {"code": -1001, "msg": "Simulated network failure"})
+        elif route is None:
+            response = _response(url, 404, {"code": -1000, "msg": f"Unknown endpoint {url}"})
+        else:
+            response = _response(url, 200, route(params or {}))
+        if scheduler:
+            scheduler.update(response)
+        return response
+
+    def _klines(self, params):
+        columns = self.exchange.klines(params["symbol"], int(params.get("limit", 500)),
+                                       params.get("startTime"), params.get("endTime"))
+        rows = zip(columns["timestamp"].tolist(), *(columns[name].tolist() for name in COLUMNS[1:]),
+                   columns["close_time"].tolist())
+        return [[timestamp, *(f"{value:.8f}" for value in values), close_time, "0", 0, "0", "0", "0"]
+                for timestamp, *values, close_time in rows]
+
+    def _ticker_price(self, params):
+        return {"symbol": params["symbol"], "price": f"{self.exchange.price(params['symbol']):.8f}"}
+
+
+class SimulatedClient:
+    """python-binance Client stand-in for the signed calls BinanceAPI makes"""
+
+    def __init__(self, exchange, network):
+        self.exchange = exchange
+        self.network = network
+        self.timestamp_offset = 0
+        self.time_calls = 0
+
+    def _reach(self):
+        if not self.network.round_trip():
+            raise ConnectionError("Simulated network failure")
+
+    def get_server_time(self):
+        self._reach()
+        self.time_calls += 1
+        return {"serverTime": int(time.time() * 1000)}  # the simulated clock is the local one
+
+    def get_account(self):
+        self._reach()
+        return {"balances": [{"asset": asset, "free": f"{free:.8f}", "locked": "0.00000000"}
+                             for asset, free in self.exchange.balances.items()]}
+
+    def stream_get_listen_key(self):
+        self._reach()
+        return "simulated"
+
+    def stream_keepalive(self, listen_key):
+        self._reach()
+        return {}
+
+    def create_order(self, symbol, side, type, quantity):
+        from binance.exceptions import BinanceAPIException
+        self._reach()
+        try:
+            return self.exchange.market_order(symbol, side, quantity)
+        except ValueError as e:
+            body = json.dumps({"code": -2010, "msg": str(e)})
+            raise BinanceAPIException(_response("/api/v3/order", 400, body.encode()), 400, body)
+
+
+class SimulatedBinanceAPI(BinanceAPI):
+    """The real BinanceAPI wired to a SimulatedExchange below the HTTP and client layer.
+
+    Requests, response decoding, retries and error handling all run through
+    BinanceAPI itself; only the transport and the python-binance client are
+    replaced. One candle per cycle runs far faster than real time, so the default
+    scheduler's budget is effectively unlimited.
+    """
+
+    def __init__(self, exchange, profile=None, scheduler=None):
+        self.exchange = exchange
+        self.network = SimulatedNetwork(profile)
+        super().__init__(
+            transport=SimulatedTransport(exchange, self.network),
+            scheduler=scheduler or WeightScheduler(limit=10**12),
+            client=SimulatedClient(exchange, self.network),
+        )
+
+    @property
+    def calls(self):
+        return self.network.calls
+
+    @property
+    def time_syncs(self):
+        return self.client.time_calls
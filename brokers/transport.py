@@ -0,0 +1,224 @@
+# Shared keep-alive HTTP transport and Binance request-weight scheduler
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class WeightScheduler:
+    """Keep Binance request weight under the per-minute limit and smooth bursts.
+
+    Weight is spent from a token bucket refilled at limit/60 per second, so a burst
+    is spread out instead of burning the whole minute at once. The server's
+    X-MBX-USED-WEIGHT-1M header corrects our estimate after every response, and a
+    429/418 blocks every caller until its Retry-After has passed.
+    """
+
+    def __init__(self, limit=6000, headroom=0.1, burst=None):
+        self.limit = limit
+        self.budget = limit * (1 - headroom)
+        self.rate = self.budget / 60.0
+        self.burst = burst or self.budget / 10
+        self.used_weight = 0
+        self.throttled = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._window = int(time.time() // 60)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight=1):
+        """Block until `weight` may be spent; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                window = int(time.time() // 60)
+                if window != self._window:
+                    self._window = window
+                    self.used_weight = 0
+
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if now < self._blocked_until:
+                    pause = self._blocked_until - now
+                elif self.used_weight + weight > self.budget:
+                    pause = 60 - time.time() % 60 + 0.05  # wait for the next weight window
+                elif self._tokens < weight:
+                    pause = (weight - self._tokens) / self.rate
+                else:
+                    self._tokens -= weight
+                    self.used_weight += weight
+                    return waited
+
+            self.throttled += 1
+            time.sleep(pause)
+            waited += pause
+
+    def update(self, response):
+        """Sync with the weight the server reports and honour rate-limit bans."""
+        with self._lock:
+            used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used is not None:
+                # The server also counts other clients on this IP, ours counts requests still in flight
+                self.used_weight = max(self.used_weight, int(used))
+
+            if response.status_code in (418, 429):
+                retry_after = float(response.headers.get("Retry-After", 60))
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                logging.warning(f"Binance answered {response.status_code}; pausing requests for {retry_after:.0f}s")
+
+
+_connects = threading.local()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _connects.happened = True  # flag, per thread, that a real TCP connect happened
+        return super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _connects.happened = True
+        return super().connect()
+
+
+class _CountingHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CountingHTTPPool, "https": _CountingHTTPSPool}
+
+
+class Transport:
+    """One pooled requests.Session shared by every HTTP caller in the process.
+
+    Connections are kept alive per host (up to `max_per_host` open at once), and
+    each call records its queue wait and whether it reused a pooled connection.
+    """
+
+    def __init__(self, max_per_host=10, max_hosts=10, timeout=10):
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.session = requests.Session()
+        self.adapter = _PooledAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host, pool_block=True)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, scheduler=None, weight=1, **kwargs):
+        """Send a request through the shared pool, optionally paced by a WeightScheduler."""
+        host = urlsplit(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+
+        queued = time.perf_counter()
+        scheduler_wait = scheduler.acquire(weight) if scheduler else 0.0
+        with self._slots(host):
+            queue_wait = time.perf_counter() - queued
+            _connects.happened = False
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            finally:
+                latency = time.perf_counter() - started
+                self._record(host, queue_wait, scheduler_wait, latency, _connects.happened)
+
+        if scheduler:
+            scheduler.update(response)
+        return response
+
+    def _slots(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def _record(self, host, queue_wait, scheduler_wait, latency, new_connection):
+        with self._lock:
+            stats = self._stats.setdefault(host, {
+                "requests": 0, "new_connections": 0, "queue_wait": 0.0, "scheduler_wait": 0.0,
+                "latency_new": 0.0, "latency_reused": 0.0,
+            })
+            stats["requests"] += 1
+            stats["queue_wait"] += queue_wait
+            stats["scheduler_wait"] += scheduler_wait
+            if new_connection:
+                stats["new_connections"] += 1
+                stats["latency_new"] += latency
+            else:
+                stats["latency_reused"] += latency
+
+    def metrics(self):
+        """Per-host connection reuse, queue wait and the latency saved by keep-alive."""
+        report = {}
+        with self._lock:
+            for host, s in self._stats.items():
+                reused = s["requests"] - s["new_connections"]
+                avg_new = s["latency_new"] / s["new_connections"] if s["new_connections"] else None
+                avg_reused = s["latency_reused"] / reused if reused else None
+                saved = (avg_new - avg_reused) if avg_new is not None and avg_reused is not None else None
+                report[host] = {
+                    "requests": s["requests"],
+                    "reused": reused,
+                    "reuse_ratio": reused / s["requests"],
+                    "avg_queue_wait_ms": s["queue_wait"] / s["requests"] * 1000,
+                    "avg_scheduler_wait_ms": s["scheduler_wait"] / s["requests"] * 1000,
+                    "avg_latency_new_ms": avg_new * 1000 if avg_new is not None else None,
+                    "avg_latency_reused_ms": avg_reused * 1000 if avg_reused is not None else None,
+                    "saved_per_reused_call_ms": saved * 1000 if saved is not None else None,
+                }
+        return report
+
+    def log_metrics(self):
+        for host, m in self.metrics().items():
+            saved = m["saved_per_reused_call_ms"]
+            logging.info(
+                f"🔌 {host}: {m['requests']} requests, {m['reuse_ratio']:.0%} reused, "
+                f"queue wait {m['avg_queue_wait_ms']:.1f}ms"
+                + (f", ~{saved:.1f}ms saved per reused call" if saved is not None else "")
+            )
+
+
+_transport = None
+_binance_scheduler = None
+_singleton_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide shared Transport."""
+    global _transport
+    with _singleton_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
+
+
+def get_binance_scheduler():
+    """Process-wide WeightScheduler for Binance REST calls (all share one IP weight budget)."""
+    global _binance_scheduler
+    with _singleton_lock:
+        if _binance_scheduler is None:
+            _binance_scheduler = WeightScheduler()
+        return _binance_scheduler
@@ -1,33 +1,7 @@
 import os
-from dotenv import load_dotenv
+from collections.abc import Mapping
 
-# Load .env variables
-load_dotenv()
-
-# 🌍 ENVIRONMENT SELECTOR
-# ✅ ENVIRONMENT: must be 'live' or 'testnet'
-ENVIRONMENT = os.getenv("ENVIRONMENT")
-if ENVIRONMENT is None:
-    raise ValueError("Missing ENVIRONMENT in .env file — must be set to 'live' or 'testnet'.")
-
-ENVIRONMENT = ENVIRONMENT.lower()
-if ENVIRONMENT not in ("live", "testnet"):
-    raise ValueError("Invalid ENVIRONMENT — must be 'live' or 'testnet'.")
-
-if ENVIRONMENT == "live":
-    API_KEY = os.getenv("BINANCE_API_KEY")
-    API_SECRET = os.getenv("BINANCE_API_SECRET")
-    BASE_URL = os.getenv("BINANCE_BASE_URL", "https://api.binance.com")
-    TESTNET = False
-
-elif ENVIRONMENT == "testnet":
-    API_KEY = os.getenv("BINANCE_TESTNET_API_KEY")
-    API_SECRET = os.getenv("BINANCE_TESTNET_API_SECRET")
-    BASE_URL = os.getenv("BINANCE_TESTNET_BASE_URL", "https://testnet.binance.vision")
-    TESTNET = True
-
-else:
-    raise ValueError("❌ Invalid ENVIRONMENT in .env — must be 'live' or 'testnet'")
+# .env is read and validated on first use, not on import, so `--help` and tests start without it
 
 # 📊 STRATEGY SETTINGS
 STRATEGY_CONFIG = {
@@ -43,23 +17,102 @@ STRATEGY_CONFIG = {
     }
 }
 
-# ⚙️ TRADING CONFIGURATION
-TRADING_CONFIG = {
-    "pair": os.getenv("TRADING_PAIR", "XRPUSDT"),
-    "timeframe": os.getenv("TIMEFRAME", "1h"),
-    "trade_amount_usd": float(os.getenv("TRADE_AMOUNT_USD", 20)),
-    "testnet": TESTNET
-}
+_settings = None
 
-# 🔑 BINANCE CONFIG
-BINANCE_CONFIG = {
-    "api_key": API_KEY,
-    "api_secret": API_SECRET,
-    "base_url": BASE_URL
-}
 
-# 📬 TELEGRAM CONFIG
-TELEGRAM_CONFIG = {
-    "bot_token": os.getenv("TELEGRAM_BOT_TOKEN"),
-    "chat_id": os.getenv("TELEGRAM_CHAT_ID")
-}
+def load_settings():
+    """Read .env and the environment once; raises ValueError if ENVIRONMENT is missing or invalid"""
+    global _settings
+    if _settings is not None:
+        return _settings
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # 🌍 ENVIRONMENT SELECTOR
+    # ✅ ENVIRONMENT: must be 'live' or 'testnet'
+    environment = os.getenv("ENVIRONMENT")
+    if environment is None:
+        raise ValueError("Missing ENVIRONMENT in .env file — must be set to 'live' or 'testnet'.")
+
+    environment = environment.lower()
+    if environment not in ("live", "testnet"):
+        raise ValueError("Invalid ENVIRONMENT — must be 'live' or 'testnet'.")
+
+    if environment == "live":
+        api_key = os.getenv("BINANCE_API_KEY")
+        api_secret = os.getenv("BINANCE_API_SECRET")
+        base_url = os.getenv("BINANCE_BASE_URL", "https://api.binance.com")
+        ws_url = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws")
+    else:
+        api_key = os.getenv("BINANCE_TESTNET_API_KEY")
+        api_secret = os.getenv("BINANCE_TESTNET_API_SECRET")
+        base_url = os.getenv("BINANCE_TESTNET_BASE_URL", "https://testnet.binance.vision")
+        ws_url = os.getenv("BINANCE_TESTNET_WS_URL", "wss://stream.testnet.binance.vision/ws")
+
+    # ⚙️ TRADING CONFIGURATION
+    # Comma-separated TRADING_PAIRS runs several symbols in one process
+    trading_pairs = os.getenv("TRADING_PAIRS", os.getenv("TRADING_PAIR", "XRPUSDT"))
+
+    _settings = {
+        "ENVIRONMENT": environment,
+        "API_KEY": api_key,
+        "API_SECRET": api_secret,
+        "BASE_URL": base_url,
+        "WS_URL": ws_url,
+        "TESTNET": environment == "testnet",
+        "TRADING_PAIRS": trading_pairs,
+        "TRADING_CONFIG": {
+            "pair": os.getenv("TRADING_PAIR", "XRPUSDT"),
+            "pairs": [p.strip().upper() for p in trading_pairs.split(",") if p.strip()],
+            "timeframe": os.getenv("TIMEFRAME", "1h"),
+            "trade_amount_usd": float(os.getenv("TRADE_AMOUNT_USD", 20)),
+            "testnet": environment == "testnet"
+        },
+        # 🔑 BINANCE CONFIG
+        "BINANCE_CONFIG": {
+            "api_key": api_key,
+            "api_secret": api_secret,
+            "base_url": base_url,
+            "ws_url": ws_url
+        },
+        # 📬 TELEGRAM CONFIG
+        "TELEGRAM_CONFIG": {
+            "bot_token": os.getenv("TELEGRAM_BOT_TOKEN"),
+            "chat_id": os.getenv("TELEGRAM_CHAT_ID")
+        },
+    }
+    return _settings
+
+
+class LazyConfig(Mapping):
+    """A read-only settings dict that loads (and validates) the environment on first key access"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getitem__(self, key):
+        return load_settings()[self.name][key]
+
+    def __iter__(self):
+        return iter(load_settings()[self.name])
+
+    def __len__(self):
+        return len(load_settings()[self.name])
+
+    def __repr__(self):
+        return repr(load_settings()[self.name]) if _settings is not None else f"<{self.name} (not loaded)>"
+
+
+TRADING_CONFIG = LazyConfig("TRADING_CONFIG")
+BINANCE_CONFIG = LazyConfig("BINANCE_CONFIG")
+TELEGRAM_CONFIG = LazyConfig("TELEGRAM_CONFIG")
+
+
+def __getattr__(name):
+    # ENVIRONMENT, API_KEY, TESTNET, ... resolve when first read, not when this module is imported
+    if name.isupper():
+        settings = load_settings()
+        if name in settings:
+            return settings[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,19 @@
+# Shared test setup: settings need an environment, and the backtest tests trade one synthetic market
+import os
+
+os.environ.setdefault("ENVIRONMENT", "testnet")
+
+import numpy as np
+
+
+def make_closes(n=3000, seed=3, period=12):
+    """A noisy sine wave around 0.5, with swings large enough for every strategy to trade"""
+    rng = np.random.default_rng(seed)
+    return 0.5 * (1 + 0.1 * np.sin(np.arange(n) / period) + rng.normal(0, 0.004, n))
+
+
+def make_candles(n=2000, seed=3, period=12):
+    """make_closes on an hourly index; a longer history extends a shorter one candle for candle"""
+    import pandas as pd
+    index = pd.date_range("2024-01-01", periods=n, freq="h", name="timestamp")
+    return pd.DataFrame({"close": make_closes(n, seed, period)}, index=index)
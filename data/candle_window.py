@@ -0,0 +1,69 @@
+# Fixed-size in-place candle window for live trading
+import numpy as np
+from data.kline_store import COLUMNS, interval_ms
+
+
+class CandleWindow:
+    """The last `size` candles in preallocated column arrays, updated in place.
+
+    Every column is stored twice (slot i and slot i + size), so the newest `size`
+    candles are always one contiguous slice: views() hands out zero-copy arrays in
+    time order and pushing a candle never moves or reallocates anything.
+    """
+
+    def __init__(self, size, interval):
+        self.size = size
+        self.step = interval_ms(interval)
+        self.count = 0
+        self._next = 0  # slot the next new candle is written to
+        self._data = {name: np.zeros(2 * size, dtype=np.int64 if name == "timestamp" else np.float64)
+                      for name in COLUMNS}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def last_timestamp(self):
+        return int(self._data["timestamp"][self._next - 1]) if self.count else None
+
+    def reset(self, columns):
+        """Replace the whole window with the newest rows of `columns`"""
+        n = min(len(columns["timestamp"]), self.size)
+        for name in COLUMNS:
+            values = np.asarray(columns[name])[len(columns[name]) - n:]
+            self._data[name][:n] = values
+            self._data[name][self.size:self.size + n] = values
+        self.count = n
+        self._next = n % self.size
+
+    def update(self, row):
+        """Apply one candle, new or still forming; returns False if it leaves a gap (caller should reset)"""
+        last = self.last_timestamp
+        ts = int(row["timestamp"])
+        if last is None or ts == last + self.step:
+            self._write(self._next, row)
+            self._next = (self._next + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+            return True
+        if ts > last:
+            return False
+
+        back = (last - ts) // self.step
+        if back < self.count and (last - ts) % self.step == 0:
+            self._write((self._next - 1 - back) % self.size, row)  # late final values of a held candle
+        return True
+
+    def views(self):
+        """Read-only zero-copy column arrays, oldest candle first"""
+        start = (self._next - self.count) % self.size
+        views = {}
+        for name in COLUMNS:
+            view = self._data[name][start:start + self.count]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def _write(self, slot, row):
+        for name in COLUMNS:
+            buffer = self._data[name]
+            buffer[slot] = buffer[slot + self.size] = row[name]
@@ -0,0 +1,129 @@
+# Paginated, concurrent historical kline downloader
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from brokers.transport import get_binance_scheduler, get_transport
+from data.kline_store import COLUMNS, PAGE_LIMIT, decode_klines, interval_ms
+from logs.metrics import get_metrics
+
+
+class DownloadError(Exception):
+    pass
+
+
+class HistoryDownloader:
+    """Fetch any [start, end) range of klines as startTime/endTime pages.
+
+    Pages are requested concurrently with at most `max_in_flight` requests open,
+    through the shared keep-alive transport and the Binance WeightScheduler, so we
+    back off before Binance starts answering 429/418. Finished pages are
+    checkpointed to disk, so an interrupted download resumes where it stopped.
+    Pages sit on a fixed grid of PAGE_LIMIT candles since the epoch, so a retry
+    with a different start or end still finds the checkpoints it overlaps.
+    """
+
+    def __init__(self, base_url, max_in_flight=4, checkpoint_dir="state/klines/.partial",
+                 request_weight=2, max_retries=5, timeout=10, transport=None, scheduler=None):
+        self.base_url = base_url.rstrip("/")
+        self.max_in_flight = max_in_flight
+        self.checkpoint_dir = checkpoint_dir
+        self.request_weight = request_weight
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.transport = transport or get_transport()
+        self.scheduler = scheduler or get_binance_scheduler()
+
+    def pages(self, interval, start, end):
+        """Page-grid [page_start, page_end) ranges covering [start, end); only the last one is cut short"""
+        span = PAGE_LIMIT * interval_ms(interval)
+        first = start // span * span
+        return [(page_start, min(page_start + span, end)) for page_start in range(first, end, span)]
+
+    def download(self, symbol, interval, start, end):
+        """Return typed columns for every candle with open time in [start, end)"""
+        symbol = symbol.upper()
+        pages = self.pages(interval, start, end)
+        page_dir = os.path.join(self.checkpoint_dir, symbol, interval)
+        os.makedirs(page_dir, exist_ok=True)
+
+        todo = [page for page in pages if not os.path.exists(self._page_path(page_dir, page))]
+        if len(todo) < len(pages):
+            logging.info(f"Resuming {symbol} {interval} download: {len(pages) - len(todo)}/{len(pages)} pages on disk")
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            futures = [pool.submit(self._fetch_page, symbol, interval, page, page_dir) for page in todo]
+            errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            raise DownloadError(f"{len(errors)}/{len(todo)} pages failed for {symbol} {interval}: {errors[0]}")
+
+        columns = self._stitch(page_dir, pages, interval, start, end)
+        # Everything left in the directory is done with, including pages of earlier runs
+        # that stopped with a different end and temp files of interrupted writes
+        for name in os.listdir(page_dir):
+            os.remove(os.path.join(page_dir, name))
+        os.rmdir(page_dir)
+        return columns
+
+    def _page_path(self, page_dir, page):
+        return os.path.join(page_dir, f"{page[0]}-{page[1]}.npy")
+
+    def _fetch_page(self, symbol, interval, page, page_dir):
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": page[0],
+            "endTime": page[1] - 1,
+            "limit": PAGE_LIMIT
+        }
+        columns = decode_klines(self._request("/api/v3/klines", params))
+        rows = np.column_stack([columns[name] for name in COLUMNS])
+
+        tmp = self._page_path(page_dir, page) + ".tmp.npy"
+        np.save(tmp, rows)
+        os.replace(tmp, self._page_path(page_dir, page))
+
+    def _request(self, path, params):
+        """GET with retries; returns the raw response body"""
+        for attempt in range(self.max_retries):
+            try:
+                response = self.transport.get(
+                    self.base_url + path, params=params, timeout=self.timeout,
+                    scheduler=self.scheduler, weight=self.request_weight,
+                )
+            except requests.RequestException as e:
+                logging.warning(f"Kline page request failed ({e}), retry {attempt + 1}/{self.max_retries}")
+                get_metrics().inc("api_retries_total", endpoint="klines_history")
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            if response.status_code in (418, 429) or response.status_code >= 500:
+                get_metrics().inc("api_retries_total", endpoint="klines_history")
+            if response.status_code in (418, 429):
+                continue  # the scheduler now holds every request until Retry-After has passed
+            if response.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            response.raise_for_status()
+            return response.content
+
+        get_metrics().inc("api_errors_total", endpoint="klines_history")
+        raise DownloadError(f"Giving up on {path} {params} after {self.max_retries} attempts")
+
+    def _stitch(self, page_dir, pages, interval, start, end):
+        rows = np.concatenate([np.load(self._page_path(page_dir, page)) for page in pages])
+        _, keep = np.unique(rows[:, 0], return_index=True)
+        rows = rows[keep]
+        rows = rows[(rows[:, 0] >= start) & (rows[:, 0] < end)]
+
+        columns = {"timestamp": rows[:, 0].astype(np.int64)}
+        for i, name in enumerate(COLUMNS[1:], start=1):
+            columns[name] = np.ascontiguousarray(rows[:, i])
+
+        gaps = np.flatnonzero(np.diff(columns["timestamp"]) != interval_ms(interval))
+        if len(gaps):
+            logging.warning(f"{len(gaps)} gaps left by the exchange in downloaded {interval} history")
+        return columns
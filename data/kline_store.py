@@ -0,0 +1,234 @@
+# Persistent on-disk candle store with incremental gap-fill
+import json
+import logging
+import os
+import time
+import numpy as np
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+PAGE_LIMIT = 1000
+KLINE_FIELDS = 12  # values per row in a /api/v3/klines response
+
+_INTERVAL_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+_WEEK_OFFSET_MS = 4 * 86_400_000  # weekly candles open on Monday, the epoch was a Thursday
+
+
+def interval_ms(interval: str) -> int:
+    """Length of a Binance kline interval (e.g. '15m', '1h') in milliseconds"""
+    unit = interval[-1]
+    if unit not in _INTERVAL_UNITS_MS or not interval[:-1].isdigit():
+        raise ValueError(f"Unsupported interval: {interval}")
+    return int(interval[:-1]) * _INTERVAL_UNITS_MS[unit]
+
+
+def candle_open(ts_ms: int, interval: str) -> int:
+    """Open time of the candle that contains `ts_ms`"""
+    step = interval_ms(interval)
+    offset = _WEEK_OFFSET_MS if interval.endswith("w") else 0
+    return (ts_ms - offset) // step * step + offset
+
+
+def klines_to_columns(klines):
+    """Convert already-parsed REST kline rows into typed column arrays"""
+    rows = np.array([row[:7] for row in klines], dtype=np.float64).reshape(-1, 7)
+    return _rows_to_columns(rows)
+
+
+def decode_klines(raw: bytes):
+    """Decode a raw /api/v3/klines body straight into typed column arrays.
+
+    Every kline field is a number (prices are quoted strings), so with brackets and
+    quotes stripped the body is one flat comma-separated list that NumPy parses in
+    C, without building a Python list or string per value. Timestamps stay exact:
+    they are far below 2**53.
+    """
+    values = np.fromstring(raw.translate(None, b'[]"'), sep=",") if raw.strip(b"[] \n") else np.empty(0)
+    if len(values) % KLINE_FIELDS:
+        raise ValueError(f"Malformed klines body: {len(values)} values is not a multiple of {KLINE_FIELDS}")
+    return _rows_to_columns(values.reshape(-1, KLINE_FIELDS))
+
+
+def _rows_to_columns(rows):
+    columns = {"timestamp": rows[:, 0].astype(np.int64)}
+    for i, name in enumerate(COLUMNS[1:], start=1):
+        columns[name] = np.ascontiguousarray(rows[:, i])
+    columns["close_time"] = rows[:, 6].astype(np.int64)
+    return columns
+
+
+def to_frame(columns):
+    """Build the OHLCV DataFrame the strategies expect from column arrays"""
+    import pandas as pd  # only DataFrame users pay its import time; the live path runs on arrays
+    index = pd.DatetimeIndex(pd.to_datetime(np.asarray(columns["timestamp"]), unit="ms"), name="timestamp")
+    return pd.DataFrame({name: np.asarray(columns[name]) for name in COLUMNS[1:]}, index=index)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def kline_store(offline=False):
+    """A KlineStore that reads only the disk cache (`offline`) or also fetches missing candles from Binance"""
+    if offline:
+        return KlineStore()
+    # requests and python-binance load only when candles may come from the network
+    from brokers.binance_api import BinanceAPI
+    from config.settings import BINANCE_CONFIG
+    from data.history import HistoryDownloader
+    return KlineStore(BinanceAPI(), downloader=HistoryDownloader(BINANCE_CONFIG["base_url"]))
+
+
+class KlineStore:
+    """Columnar .npy candle cache keyed by symbol/interval.
+
+    Each symbol/interval directory holds one memory-mappable .npy file per column
+    and a manifest of the open-time ranges already downloaded, so only the gaps
+    are fetched. Only closed candles are persisted.
+    """
+
+    def __init__(self, api=None, root="state/klines", downloader=None):
+        self.api = api
+        self.root = root
+        self.downloader = downloader
+
+    def _path(self, symbol, interval, name=""):
+        return os.path.join(self.root, symbol.upper(), interval, name)
+
+    def _manifest(self, symbol, interval):
+        path = self._path(symbol, interval, "manifest.json")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            return json.load(f)["ranges"]
+
+    def covered_ranges(self, symbol, interval):
+        """Half-open [start, end) open-time ranges held on disk"""
+        return [tuple(r) for r in self._manifest(symbol, interval)]
+
+    def missing_ranges(self, symbol, interval, start, end):
+        """Sub-ranges of [start, end) that are not cached yet"""
+        missing = []
+        cursor = start
+        for have_start, have_end in self._manifest(symbol, interval):
+            if have_end <= cursor:
+                continue
+            if have_start >= end:
+                break
+            if have_start > cursor:
+                missing.append((cursor, have_start))
+            cursor = max(cursor, have_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def load(self, symbol, interval, start=None, end=None):
+        """Memory-mapped column views for candles with open time in [start, end)"""
+        if not os.path.exists(self._path(symbol, interval, "timestamp.npy")):
+            return {name: np.empty(0, dtype=np.int64 if name == "timestamp" else np.float64) for name in COLUMNS}
+
+        columns = {name: np.load(self._path(symbol, interval, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+        timestamps = columns["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def save(self, symbol, interval, columns, start, end):
+        """Merge new closed candles into the store and mark [start, end) as covered"""
+        os.makedirs(self._path(symbol, interval), exist_ok=True)
+        existing = self.load(symbol, interval)
+
+        merged = {name: np.concatenate([columns[name], existing[name]]) for name in COLUMNS}
+        # np.unique keeps the first occurrence, so freshly fetched rows win
+        _, keep = np.unique(merged["timestamp"], return_index=True)
+
+        for name in COLUMNS:
+            tmp = self._path(symbol, interval, f"{name}.tmp.npy")
+            np.save(tmp, np.ascontiguousarray(merged[name][keep]))
+            os.replace(tmp, self._path(symbol, interval, f"{name}.npy"))
+
+        ranges = _merge_ranges(self._manifest(symbol, interval) + [[start, end]])
+        tmp = self._path(symbol, interval, "manifest.tmp.json")
+        with open(tmp, "w") as f:
+            json.dump({"ranges": ranges}, f)
+        os.replace(tmp, self._path(symbol, interval, "manifest.json"))
+
+    def sync(self, symbol, interval, start, end):
+        """Download the missing parts of [start, end); returns the still-open candle, if any"""
+        open_candle = None
+        closed_end = candle_open(int(time.time() * 1000), interval)
+
+        for gap_start, gap_end in self.missing_ranges(symbol, interval, start, end):
+            # Bulk history goes through the concurrent downloader when one is configured
+            if self.downloader is not None and gap_start < closed_end:
+                history_end = min(gap_end, closed_end)
+                try:
+                    columns = self.downloader.download(symbol, interval, gap_start, history_end)
+                except Exception as e:
+                    logging.error(f"History download failed for {symbol} {interval}: {e}")
+                    continue
+                self.save(symbol, interval, columns, gap_start, history_end)
+                gap_start = history_end
+                if gap_start >= gap_end:
+                    continue
+
+            open_candle = self._fetch_gap(symbol, interval, gap_start, gap_end) or open_candle
+
+        return open_candle
+
+    def _fetch_gap(self, symbol, interval, gap_start, gap_end):
+        step = interval_ms(interval)
+        open_candle = None
+        pages = []
+        cursor = gap_start
+        complete = False
+        while cursor < gap_end:
+            page = self.api.get_kline_columns(symbol, interval, limit=PAGE_LIMIT, start_time=cursor, end_time=gap_end - 1)
+            fetched = len(page["timestamp"])
+            if not fetched:
+                break  # request failed or no data; leave the rest of the gap for next time
+            pages.append(page)
+            cursor = int(page["timestamp"][-1]) + step
+            if fetched < PAGE_LIMIT:
+                complete = True
+                break
+        else:
+            complete = True
+
+        if not pages:
+            pages.append(decode_klines(b"[]"))
+        klines = {name: np.concatenate([page[name] for page in pages]) for name in pages[0]}
+
+        now_ms = int(time.time() * 1000)
+        closed = klines["close_time"] < now_ms
+        if not closed.all():
+            open_candle = {name: values[-1:] for name, values in klines.items()}
+
+        # The open candle can still change, so its slot is never marked as covered
+        covered_end = min(gap_end if complete else cursor, candle_open(now_ms, interval))
+        if covered_end > gap_start:
+            self.save(symbol, interval, {name: values[closed] for name, values in klines.items()}, gap_start, covered_end)
+        return open_candle
+
+    def get(self, symbol, interval, limit=500, offline=False, include_open=False):
+        """Latest `limit` closed candles (plus the open one if asked), fetching only what is missing"""
+        if offline or self.api is None:
+            columns = self.load(symbol, interval)
+            if len(columns["timestamp"]) < limit:
+                logging.warning(f"Kline cache holds {len(columns['timestamp'])}/{limit} candles for {symbol} {interval}")
+            return {name: values[-limit:] for name, values in columns.items()}
+
+        step = interval_ms(interval)
+        closed_end = candle_open(int(time.time() * 1000), interval)
+        start = closed_end - limit * step
+        open_candle = self.sync(symbol, interval, start, closed_end + step if include_open else closed_end)
+
+        columns = self.load(symbol, interval, start, closed_end)
+        if include_open and open_candle is not None:
+            columns = {name: np.concatenate([columns[name], open_candle[name]]) for name in COLUMNS}
+        return {name: values[-limit:] for name, values in columns.items()}
@@ -1,30 +1,277 @@
 # Fetch historical and live data
-import pandas as pd
+import asyncio
+import logging
+import time
+import numpy as np
 from brokers.binance_api import BinanceAPI
-from config.settings import TRADING_CONFIG
+from config.settings import BINANCE_CONFIG, TRADING_CONFIG
+from data.candle_window import CandleWindow
+from data.kline_store import COLUMNS, KlineStore, candle_open, interval_ms, to_frame
+from data.stream import KlineStream
+from logs.metrics import get_metrics
+
+LIVE_REFRESH_BARS = 3  # newest candles re-read each live cycle: the forming one plus late closes
+
+
+def timeframe_ratio(base_interval, interval):
+    """How many `base_interval` candles make up one `interval` candle"""
+    ratio, remainder = divmod(interval_ms(interval), interval_ms(base_interval))
+    if remainder or not ratio:
+        raise ValueError(f"{interval} is not a whole multiple of {base_interval}")
+    return ratio
+
+
+def resample_columns(columns, interval):
+    """Aggregate candle (or trade) columns into `interval` OHLCV bars in one vectorized pass.
+
+    Inputs must be in time order. A bar with no inputs is filled flat at the previous
+    close with zero volume, as Binance reports it, so the output is always contiguous.
+    """
+    ts = np.asarray(columns["timestamp"], dtype=np.int64)
+    if not len(ts):
+        return {name: np.asarray(columns[name])[:0] for name in COLUMNS}
+
+    buckets = candle_open(ts, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    bars = {
+        "timestamp": buckets[starts],
+        "open": np.asarray(columns["open"], dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(np.asarray(columns["high"], dtype=np.float64), starts),
+        "low": np.minimum.reduceat(np.asarray(columns["low"], dtype=np.float64), starts),
+        "close": np.asarray(columns["close"], dtype=np.float64)[ends],
+        "volume": np.add.reduceat(np.asarray(columns["volume"], dtype=np.float64), starts),
+    }
+
+    step = interval_ms(interval)
+    grid = np.arange(bars["timestamp"][0], bars["timestamp"][-1] + step, step)
+    if len(grid) == len(starts):
+        return bars
+    prev = np.searchsorted(bars["timestamp"], grid, side="right") - 1
+    present = bars["timestamp"][prev] == grid
+    close = bars["close"][prev]
+    filled = {"timestamp": grid, "close": close, "volume": np.where(present, bars["volume"][prev], 0.0)}
+    for name in ("open", "high", "low"):
+        filled[name] = np.where(present, bars[name][prev], close)
+    return filled
+
+
+def _combine(bar, row, bucket):
+    """`bar` extended by one more input `row`; starts a new bar if `bar` belongs to another bucket"""
+    if bar is None or bar["timestamp"] != bucket:
+        return {"timestamp": bucket, "open": row["open"], "high": row["high"], "low": row["low"],
+                "close": row["close"], "volume": row["volume"]}
+    return {"timestamp": bucket, "open": bar["open"], "high": max(bar["high"], row["high"]),
+            "low": min(bar["low"], row["low"]), "close": row["close"], "volume": bar["volume"] + row["volume"]}
+
+
+class TimeframeAggregator:
+    """Higher-timeframe OHLCV windows maintained from one base candle or trade feed.
+
+    Each timeframe keeps the aggregate of the inputs already final in its current
+    bar; the forming base candle is layered on top on every update, so revisions of
+    it never double count and each input costs O(1) per timeframe.
+    """
+
+    def __init__(self, base_interval, intervals, size=100):
+        for interval in intervals:
+            timeframe_ratio(base_interval, interval)
+        self.base_interval = base_interval
+        self.size = size
+        self.windows = {interval: CandleWindow(size, interval) for interval in intervals}
+        self._final = dict.fromkeys(intervals)  # per timeframe: finished inputs of its newest bar
+        self._forming = None  # newest base candle, may still change
+
+    def seed(self, columns):
+        """Rebuild every window from historical base candles; the newest one is treated as forming"""
+        n = len(columns["timestamp"])
+        head = {name: np.asarray(columns[name])[:max(n - 1, 0)] for name in COLUMNS}
+        for interval, window in self.windows.items():
+            bars = resample_columns(head, interval)
+            window.reset(bars)
+            self._final[interval] = {name: bars[name][-1] for name in COLUMNS} if len(bars["timestamp"]) else None
+        self._forming = None
+        if n:
+            self.update({name: columns[name][-1] for name in COLUMNS})
+
+    def update(self, row):
+        """Apply one base candle, new or a revision of the forming one"""
+        ts = int(row["timestamp"])
+        if self._forming is not None:
+            if ts < self._forming["timestamp"]:
+                return  # revision of a candle already folded into the bars
+            if ts > self._forming["timestamp"]:
+                self._finalize(self._forming)
+        self._forming = {"timestamp": ts, **{name: float(row[name]) for name in COLUMNS[1:]}}
+        for interval, window in self.windows.items():
+            bucket = candle_open(ts, interval)
+            self._write(window, _combine(self._final[interval], self._forming, bucket))
+
+    def add_trade(self, ts, price, qty):
+        """Apply one trade; trades are final, so feed either trades or candles, not both"""
+        trade = {"open": price, "high": price, "low": price, "close": price, "volume": qty}
+        for interval, window in self.windows.items():
+            bar = self._final[interval] = _combine(self._final[interval], trade, candle_open(int(ts), interval))
+            self._write(window, bar)
+
+    def views(self, interval):
+        return self.windows[interval].views()
+
+    def _finalize(self, row):
+        for interval in self.windows:
+            self._final[interval] = _combine(self._final[interval], row, candle_open(row["timestamp"], interval))
+
+    @staticmethod
+    def _write(window, bar):
+        last = window.last_timestamp
+        if last is not None and bar["timestamp"] > last + window.step:
+            missing = (bar["timestamp"] - last) // window.step - 1
+            if missing >= window.size:
+                window.reset({name: [bar[name]] for name in COLUMNS})
+                return
+            close = window.views()["close"][-1]
+            for i in range(1, missing + 1):
+                window.update({"timestamp": last + i * window.step, "open": close, "high": close,
+                               "low": close, "close": close, "volume": 0.0})
+        window.update(bar)
+
 
 class MarketData:
-    def __init__(self):
-        self.api = BinanceAPI()
-        self.symbol = TRADING_CONFIG["pair"]
-        self.interval = TRADING_CONFIG["timeframe"]
+    def __init__(self, api=None, symbol=None, interval=None, store=None):
+        self.api = api or BinanceAPI()
+        self.store = store or KlineStore(self.api)
+        self.symbol = symbol or TRADING_CONFIG["pair"]
+        self.interval = interval or TRADING_CONFIG["timeframe"]
+
+        # Ring buffer of the newest candles, updated in place by polling or the stream
+        self.window = None
+        self.current_candle = None
+        self.aggregator = None
+        self._stream = None
 
     def fetch_ohlcv(self, limit=100):
         """Fetch OHLCV data and return as a DataFrame"""
-        raw_klines = self.api.get_klines(self.symbol, self.interval, limit=limit)
+        # Closed candles come from the local store; only gaps and the open candle hit the API
+        with get_metrics().span("klines"):
+            columns = self.store.get(self.symbol, self.interval, limit=limit, include_open=True)
 
-        if not raw_klines:
+        if len(columns["timestamp"]) == 0:
+            import pandas as pd
             return pd.DataFrame()  # Return empty DataFrame on error
 
-        df = pd.DataFrame(raw_klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'num_trades',
-            'taker_buy_base', 'taker_buy_quote', 'ignore'
-        ])
+        with get_metrics().span("frame"):
+            return to_frame(columns)
+
+    def fetch_timeframes(self, intervals, limit=100):
+        """DataFrames of the last `limit` candles for every interval, resampled from one base-interval download"""
+        ratio = max(timeframe_ratio(self.interval, interval) for interval in intervals)
+        with get_metrics().span("klines"):
+            columns = self.store.get(self.symbol, self.interval, limit=limit * ratio, include_open=True)
+
+        with get_metrics().span("frame"):
+            return {interval: to_frame({name: values[-limit:] for name, values in resample_columns(columns, interval).items()})
+                    for interval in intervals}
+
+    def aggregate(self, intervals, limit=100):
+        """Start keeping `intervals` windows current from the base candles this instance already receives"""
+        ratio = max(timeframe_ratio(self.interval, interval) for interval in intervals)
+        self.aggregator = TimeframeAggregator(self.interval, intervals, size=limit)
+        with get_metrics().span("klines"):
+            columns = self.store.get(self.symbol, self.interval, limit=limit * ratio, include_open=True)
+        self.aggregator.seed(columns)
+        return self.aggregator
+
+    def latest_candles(self, limit=100):
+        """Zero-copy column views of the last `limit` candles (open one included), kept current in place.
+
+        After the first call only the newest few candles are requested and written
+        into the window; a gap since the previous call triggers a full refresh. If
+        the newest candles cannot be fetched the result is empty, never the stale window.
+        """
+        if self.window is None or self.window.size != limit:
+            self.window = CandleWindow(limit, self.interval)
+        if not len(self.window):
+            self._refresh_window()
+            return self.window.views()
+
+        with get_metrics().span("klines"):
+            newest = self.api.get_kline_columns(self.symbol, self.interval, limit=LIVE_REFRESH_BARS)
+        if not len(newest["timestamp"]):
+            logging.warning(f"No new {self.symbol} {self.interval} candles, not reusing the previous window")
+            return newest
+        for i in range(len(newest["timestamp"])):
+            row = {name: newest[name][i] for name in COLUMNS}
+            if not self.window.update(row):
+                logging.info(f"Gap in {self.symbol} {self.interval} candles, refreshing the whole window")
+                self._refresh_window()
+                break
+            if self.aggregator is not None:
+                self.aggregator.update(row)
+        return self.window.views()
+
+    def _refresh_window(self):
+        with get_metrics().span("klines"):
+            columns = self.store.get(self.symbol, self.interval, limit=self.window.size, include_open=True)
+        self.window.reset(columns)
+        if self.aggregator is not None:
+            self.aggregate(list(self.aggregator.windows), limit=self.aggregator.size)
+
+    async def stream(self, on_close, limit=100, ws_url=None):
+        """Keep closed candles current from the kline WebSocket and call on_close(views) as each one closes"""
+        url = f"{ws_url or BINANCE_CONFIG['ws_url']}/{self.symbol.lower()}@kline_{self.interval}"
+
+        async def on_kline(kline):
+            self.current_candle = kline
+            if kline["closed"]:
+                await self._on_candle_close(kline, on_close)
+            if self.aggregator is not None:
+                self.aggregator.update(kline)  # after any backfill, so missed bars are folded in first
+
+        async def on_connect():
+            if self.window is None:
+                columns = await asyncio.to_thread(self.store.get, self.symbol, self.interval, limit)
+                self.window = CandleWindow(limit, self.interval)
+                self.window.reset(columns)
+                logging.info(f"📡 Streaming {self.symbol} {self.interval} from {len(self.window)} cached candles")
+            else:
+                await self._backfill(on_close)
+
+        self._stream = KlineStream(url, on_kline, on_connect)
+        await self._stream.run()
+
+    async def stop_stream(self):
+        if self._stream is not None:
+            await self._stream.stop()
+
+    def _last_closed_ts(self):
+        return self.window.last_timestamp
+
+    async def _on_candle_close(self, kline, on_close):
+        last = self._last_closed_ts()
+        if last is not None and kline["timestamp"] <= last:
+            return  # already seen, e.g. replayed after a reconnect
+        if last is not None and kline["timestamp"] > last + interval_ms(self.interval):
+            await self._backfill(on_close)
+            if kline["timestamp"] <= self._last_closed_ts():
+                return
+
+        if not self.window.update(kline):
+            logging.warning(f"Could not backfill {self.symbol} up to {kline['timestamp']}, restarting the window")
+            self.window.reset({name: [kline[name]] for name in COLUMNS})
+        await asyncio.to_thread(on_close, self.window.views())
 
-        # Convert types
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        df = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+    async def _backfill(self, on_close):
+        """Fetch bars closed while the stream was away over REST and replay them in order"""
+        since = self._last_closed_ts() + interval_ms(self.interval)
+        klines = await asyncio.to_thread(self.api.get_kline_columns, self.symbol, self.interval, 1000, since)
 
-        return df
+        now_ms = int(time.time() * 1000)
+        closed = (klines["close_time"] < now_ms) & (klines["timestamp"] >= since)
+        if closed.any():
+            logging.info(f"Backfilling {int(closed.sum())} missed {self.interval} candles over REST")
+        for i in np.flatnonzero(closed):
+            row = {name: klines[name][i] for name in COLUMNS}
+            self.window.update(row)
+            if self.aggregator is not None:
+                self.aggregator.update(row)
+            await asyncio.to_thread(on_close, self.window.views())
@@ -0,0 +1,109 @@
+# WebSocket streams (klines, account updates) with automatic reconnect
+import asyncio
+import json
+import logging
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+
+def parse_kline(message):
+    """Turn a Binance kline event (raw or combined-stream) into a candle dict"""
+    payload = message.get("data", message)
+    k = payload["k"]
+    return {
+        "timestamp": int(k["t"]),
+        "open": float(k["o"]),
+        "high": float(k["h"]),
+        "low": float(k["l"]),
+        "close": float(k["c"]),
+        "volume": float(k["v"]),
+        "closed": bool(k["x"]),
+    }
+
+
+class WebSocketStream:
+    """Push every JSON message to `on_message`, reconnecting with backoff.
+
+    `url` may be a callable returning a fresh URL per connection (e.g. one
+    carrying a new listen key), or None to retry later. `on_connect` is awaited after each (re)connect,
+    before any message is handled, so the caller can resync state missed while
+    disconnected. A message that fails to parse or to handle is logged and
+    skipped; any other unexpected error drops the connection and reconnects.
+    """
+
+    name = "WebSocket"
+
+    def __init__(self, url, on_message, on_connect=None, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.url = url
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.reconnects = 0
+        self._stopped = False
+        self._ws = None
+
+    @property
+    def connected(self):
+        return self._ws is not None
+
+    def parse(self, message):
+        return message
+
+    async def run(self):
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                url = await asyncio.to_thread(self.url) if callable(self.url) else self.url
+                if url is None:
+                    raise ConnectionError("no stream URL available")
+                async with connect(url) as ws:
+                    self._ws = ws
+                    delay = self.reconnect_delay
+                    if self.on_connect:
+                        await self.on_connect()
+                    async for message in ws:
+                        await self._handle(message)
+                        if self._stopped:
+                            break
+            except (WebSocketException, OSError) as e:
+                logging.warning(f"{self.name} stream disconnected: {e}")
+            except Exception as e:
+                logging.error(f"{self.name} stream failed, reconnecting: {e}", exc_info=True)
+            finally:
+                self._ws = None
+
+            if self._stopped:
+                break
+            self.reconnects += 1
+            logging.info(f"Reconnecting {self.name.lower()} stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _handle(self, message):
+        try:
+            await self.on_message(self.parse(json.loads(message)))
+        except Exception as e:
+            logging.error(f"Skipping {self.name.lower()} stream message {message[:200]!r}: {e}", exc_info=True)
+
+    async def reconnect(self):
+        """Drop the current connection; run() then reconnects, fetching the URL again"""
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def stop(self):
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+
+
+class KlineStream(WebSocketStream):
+    """Push every kline update to `on_kline` as a candle dict"""
+
+    name = "Kline"
+
+    def __init__(self, url, on_kline, on_connect=None, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        super().__init__(url, on_kline, on_connect, reconnect_delay, max_reconnect_delay)
+
+    def parse(self, message):
+        return parse_kline(message)
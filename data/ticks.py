@@ -0,0 +1,118 @@
+# Columnar aggTrades files read in fixed-size chunks
+import os
+import numpy as np
+
+TICK_COLUMNS = ("timestamp", "price", "qty", "buyer_maker")
+TICK_DTYPES = {"timestamp": np.int64, "price": np.float64, "qty": np.float64, "buyer_maker": np.bool_}
+CHUNK_SIZE = 1_000_000  # trades per chunk: ~25 MB of columns in flight, whatever the file size
+AGG_TRADES_CSV = ("agg_trade_id", "price", "qty", "first_trade_id", "last_trade_id", "timestamp", "buyer_maker",
+                  "best_match")
+
+
+def _create(root, count):
+    """Preallocated memory-mapped .npy files, one per tick column"""
+    os.makedirs(root, exist_ok=True)
+    return {name: np.lib.format.open_memmap(os.path.join(root, f"{name}.npy"), mode="w+",
+                                            dtype=TICK_DTYPES[name], shape=(count,))
+            for name in TICK_COLUMNS}
+
+
+def tick_count(source):
+    """Number of trades in a tick directory or Parquet file, read from metadata only"""
+    if str(source).endswith(".parquet"):
+        return _parquet(source).metadata.num_rows
+    return len(np.load(os.path.join(source, "timestamp.npy"), mmap_mode="r"))
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yield {column: array} chunks of at most `chunk_size` trades in time order.
+
+    `source` is a directory of memory-mapped .npy columns (see write_synthetic /
+    import_agg_trades_csv) or a .parquet file. Only one chunk is ever resident, so
+    memory stays bounded by `chunk_size` however large the file is.
+    """
+    if str(source).endswith(".parquet"):
+        for batch in _parquet(source).iter_batches(batch_size=chunk_size, columns=list(TICK_COLUMNS)):
+            yield {name: batch.column(name).to_numpy(zero_copy_only=False).astype(TICK_DTYPES[name], copy=False)
+                   for name in TICK_COLUMNS}
+        return
+
+    columns = {name: np.load(os.path.join(source, f"{name}.npy"), mmap_mode="r") for name in TICK_COLUMNS}
+    for lo in range(0, len(columns["timestamp"]), chunk_size):
+        yield {name: values[lo:lo + chunk_size] for name, values in columns.items()}
+
+
+def _parquet(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet tick files needs pyarrow: pip install pyarrow") from e
+    return pq.ParquetFile(path)
+
+
+def write_synthetic(root, count, start_ms=1_700_000_000_000, price=0.5, volatility=0.0004, mean_gap_ms=50,
+                    seed=0, chunk_size=CHUNK_SIZE):
+    """Write `count` synthetic aggTrades (a random walk with Poisson arrivals) chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    columns = _create(root, count)
+    log_price = np.log(price)
+    ts = start_ms
+    for lo in range(0, count, chunk_size):
+        n = min(chunk_size, count - lo)
+        walk = log_price + np.cumsum(rng.normal(0, volatility, n))
+        times = ts + np.cumsum(rng.exponential(mean_gap_ms, n)).astype(np.int64)
+        columns["price"][lo:lo + n] = np.round(np.exp(walk), 4)  # exchange tick size
+        columns["qty"][lo:lo + n] = np.round(rng.lognormal(3, 1, n), 1)
+        columns["timestamp"][lo:lo + n] = times
+        columns["buyer_maker"][lo:lo + n] = rng.random(n) < 0.5
+        log_price, ts = walk[-1], int(times[-1])
+    for values in columns.values():
+        values.flush()
+    return root
+
+
+def import_agg_trades_csv(csv_path, root, chunk_size=CHUNK_SIZE):
+    """Convert a data.binance.vision aggTrades CSV dump into tick columns, in bounded memory"""
+    import pandas as pd
+    count, last = 0, b"\n"
+    with open(csv_path, "rb") as f:
+        first = f.read(1)
+        has_header = bool(first) and not first.isdigit()
+        f.seek(0)
+        for buf in iter(lambda: f.read(1 << 20), b""):
+            count += buf.count(b"\n")
+            last = buf[-1:]
+    count += (last != b"\n") - has_header
+
+    columns = _create(root, count)
+    if count == 0:
+        return root  # an empty dump (or a bare header) gives an empty tick store
+    lo = 0
+    reader = pd.read_csv(csv_path, header=None, names=AGG_TRADES_CSV, skiprows=int(has_header),
+                         chunksize=chunk_size, usecols=["price", "qty", "timestamp", "buyer_maker"])
+    for chunk in reader:
+        n = len(chunk)
+        ts = chunk["timestamp"].to_numpy(np.int64)
+        columns["timestamp"][lo:lo + n] = np.where(ts > 10**14, ts // 1000, ts)  # newer dumps are in microseconds
+        columns["price"][lo:lo + n] = chunk["price"].to_numpy(np.float64)
+        columns["qty"][lo:lo + n] = chunk["qty"].to_numpy(np.float64)
+        columns["buyer_maker"][lo:lo + n] = chunk["buyer_maker"].astype(str).str.lower().eq("true").to_numpy()
+        lo += n
+    for values in columns.values():
+        values.flush()
+    if lo < count:
+        # Blank lines were counted but hold no trade; drop the zero rows they left at the end
+        _truncate(root, columns, lo, chunk_size)
+    return root
+
+
+def _truncate(root, columns, count, chunk_size=CHUNK_SIZE):
+    """Rewrite preallocated tick columns keeping only their first `count` rows, chunk by chunk"""
+    for name, values in columns.items():
+        path = os.path.join(root, f"{name}.npy")
+        kept = np.lib.format.open_memmap(path + ".tmp.npy", mode="w+", dtype=values.dtype, shape=(count,))
+        for lo in range(0, count, chunk_size):
+            kept[lo:lo + chunk_size] = values[lo:lo + chunk_size]
+        kept.flush()
+        del kept
+        os.replace(path + ".tmp.npy", path)
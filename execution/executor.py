@@ -1,32 +1,103 @@
 # Executes trades based on signals
+import asyncio
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
 from data.market_data import MarketData
 from strategies.mean_reversion import MeanReversionStrategy
+from brokers.account import AccountCache
 from brokers.binance_api import BinanceAPI
+from brokers.exchange_info import ExchangeInfoCache
 from config.settings import TRADING_CONFIG
 from execution.position_manager import PositionManager
+from execution.scheduler import CandleScheduler
+from logs.metrics import get_metrics
 from notifications.telegram import send_telegram_message
 
+# Independent pre-trade requests (price, balance, clock sync) run side by side here
+_lookups = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pretrade")
+
+
+def fill_price(order):
+    """Average execution price of a filled order response, or None if it does not say"""
+    try:
+        return float(order["cummulativeQuoteQty"]) / float(order["executedQty"])
+    except (KeyError, TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
 class TradeExecutor:
-    def __init__(self):
-        self.market_data = MarketData()
+    def __init__(self, symbol=None, api=None, market_data=None, position_mgr=None, exchange_info=None, notify=None,
+                 account=None):
+        self.api = api or BinanceAPI()
+        self.exchange_info = exchange_info or ExchangeInfoCache(self.api)
+        self.account = account or AccountCache(self.api)
+        self.symbol = symbol or TRADING_CONFIG["pair"]
+        self.market_data = market_data or MarketData(api=self.api, symbol=self.symbol)
         self.strategy = MeanReversionStrategy()
-        self.api = BinanceAPI()
-        self.symbol = TRADING_CONFIG["pair"]
         self.trade_amount_usd = TRADING_CONFIG["trade_amount_usd"]
-        self.position_mgr = PositionManager()
+        self.position_mgr = position_mgr or PositionManager()
+        self.notify = notify or send_telegram_message
+        self.metrics = get_metrics()
+        self._signal_started = None
 
     def run_once(self):
         """Run one trading cycle: fetch data, get signal, execute trade."""
-        df = self.market_data.fetch_ohlcv(limit=100)
-        if df.empty:
-            logging.warning("No market data available.")
-            return
+        with self.metrics.span("cycle"):
+            candles = self.market_data.latest_candles(limit=100)
+            if len(candles["close"]) == 0:
+                logging.warning("No market data available.")
+                return
+
+            self.evaluate(candles)
+
+    def run_closed(self, open_time, woke_at=None, replay=False):
+        """Evaluate the strategy on the window ending at the closed candle that opened at `open_time` (ms).
+
+        A replayed (missed) candle only advances the strategy; it never places an order.
+        """
+        with self.metrics.span("cycle"):
+            candles = self.market_data.latest_candles(limit=100)
+            end = int(np.searchsorted(candles["timestamp"], open_time, side="right"))
+            if not end or candles["timestamp"][end - 1] != open_time:
+                logging.warning(f"[{self.symbol}] Candle {open_time} is not in the window, skipping it.")
+                return
+
+            self.evaluate({name: values[:end] for name, values in candles.items()}, woke_at, trade=not replay)
+
+    def run_scheduled(self, scheduler=None):
+        """Evaluate every candle right after it closes, replaying any that closed while busy or down."""
+        scheduler = scheduler or CandleScheduler(self.market_data.interval, server_offset=self.api.sync_time)
+        scheduler.run(self.run_closed)
+
+    def run_stream(self, after_close=None):
+        """Stream candles over WebSocket and evaluate the strategy the moment each one closes.
 
-        signal = self.strategy.generate_signal(df)
-        logging.info(f"Strategy signal: {signal}")
+        `after_close()`, if given, runs after every evaluated candle (e.g. periodic reporting).
+        """
+        def on_close(candles):
+            self.evaluate(candles)
+            if after_close is not None:
+                after_close()
 
-        if signal == "buy":
+        asyncio.run(self.market_data.stream(on_close, limit=100))
+
+    def evaluate(self, candles, woke_at=None, trade=True):
+        """Get the strategy signal for a candle window (column arrays or DataFrame) and act on it if `trade`."""
+        self._signal_started = time.perf_counter()
+        with self.metrics.span("signal"):
+            signal = self.strategy.generate_signal(candles)
+        if woke_at is not None:
+            wake_to_signal = time.perf_counter() - woke_at
+            self.metrics.observe("wake_to_signal", wake_to_signal)
+            logging.info(f"[{self.symbol}] Strategy signal: {signal} ({wake_to_signal * 1000:.1f}ms after wakeup)")
+        else:
+            logging.info(f"[{self.symbol}] Strategy signal: {signal}")
+
+        if not trade:
+            logging.info(f"[{self.symbol}] Replayed candle, {signal} signal not traded")
+        elif signal == "buy":
             self.execute_buy()
         elif signal == "sell":
             self.execute_sell()
@@ -39,28 +110,41 @@ class TradeExecutor:
             logging.info("Buy skipped — already holding asset.")
             return
 
-        price = self.api.get_symbol_price(self.symbol)
+        price_lookup = _lookups.submit(self._timed, "price", self.api.get_symbol_price, self.symbol)
+        balance_lookup = self._balance_lookup("USDT")
+        _lookups.submit(self.api.sync_time)  # usually a no-op; a stale clock is refreshed before the order
+
+        price = price_lookup.result()
         if price is None:
-            send_telegram_message(f"⚠️ Could not fetch price for {self.symbol}")
+            self.notify(f"⚠️ Could not fetch price for {self.symbol}")
             return
 
-        quantity = round(self.trade_amount_usd / price, 6)
-        usdt_balance = self.api.get_asset_balance("USDT")
+        quantity = self.exchange_info.normalize_quantity(self.symbol, self.trade_amount_usd / price)
+        if not quantity or not self.exchange_info.meets_min_notional(self.symbol, quantity, price):
+            msg = f"🚫 Trade amount too small to BUY {self.symbol} under exchange filters."
+            logging.warning(msg)
+            self.notify(msg)
+            return
 
-        if not usdt_balance or float(usdt_balance["free"]) < self.trade_amount_usd:
+        usdt_balance = balance_lookup.result()
+        if usdt_balance.free < self.trade_amount_usd:
             msg = f"🚫 Insufficient USDT balance to BUY {self.symbol}."
             logging.warning(msg)
-            send_telegram_message(msg)
+            self.notify(msg)
             return
 
-        result = self.api.place_market_order(self.symbol, "buy", quantity)
+        with self.metrics.span("order"):
+            result = self.api.place_market_order(self.symbol, "buy", quantity)
+        latency = self._observe_signal_to_ack()
+        self.account.invalidate()
         if result:
+            price = fill_price(result) or price
             self.position_mgr.add_position(self.symbol, quantity, price)
             msg = f"🟢 *LIVE BUY* {self.symbol} | {quantity} @ {price:.4f}"
-            logging.info(msg)
-            send_telegram_message(msg)
+            logging.info(f"{msg} | signal→ack {latency * 1000:.1f}ms")
+            self.notify(msg)
         else:
-            send_telegram_message(f"❌ *BUY failed* for {self.symbol}")
+            self.notify(f"❌ *BUY failed* for {self.symbol}")
 
     def execute_sell(self):
         """Handle sell logic"""
@@ -69,18 +153,43 @@ class TradeExecutor:
             logging.info("No tracked position to sell.")
             return
 
-        price = self.api.get_symbol_price(self.symbol)
-        if price is None:
-            send_telegram_message(f"⚠️ Could not fetch price for {self.symbol}")
+        quantity = self.exchange_info.normalize_quantity(self.symbol, position["qty"])
+        if not quantity:
+            logging.warning(f"Position in {self.symbol} is below the exchange minimum quantity, not selling.")
             return
 
-        quantity = round(position["qty"], 6)
-        result = self.api.place_market_order(self.symbol, "sell", quantity)
+        # The fill reports the price, so nothing stands between the signal and the order
+        with self.metrics.span("order"):
+            result = self.api.place_market_order(self.symbol, "sell", quantity)
+        latency = self._observe_signal_to_ack()
+        self.account.invalidate()
 
         if result:
             self.position_mgr.close_position(self.symbol)
-            msg = f"🔴 *LIVE SELL* {self.symbol} | {quantity} @ {price:.4f}"
-            logging.info(msg)
-            send_telegram_message(msg)
+            price = fill_price(result)
+            msg = f"🔴 *LIVE SELL* {self.symbol} | {quantity} @ " + (f"{price:.4f}" if price else "market")
+            logging.info(f"{msg} | signal→ack {latency * 1000:.1f}ms")
+            self.notify(msg)
         else:
-            send_telegram_message(f"❌ *SELL failed* for {self.symbol}")
+            self.notify(f"❌ *SELL failed* for {self.symbol}")
+
+    def _balance_lookup(self, asset):
+        """Future Balance: read from memory when the account cache is fresh, else refreshed on the pool"""
+        if not self.account.is_fresh():
+            return _lookups.submit(self._timed, "balance", self.account.balance, asset)
+        lookup = Future()
+        lookup.set_result(self.account.balance(asset))
+        return lookup
+
+    def _timed(self, stage, call, *args):
+        with self.metrics.span(stage):
+            return call(*args)
+
+    def _observe_signal_to_ack(self):
+        """Record and return the time from the strategy call to the exchange acknowledging the order"""
+        if self._signal_started is None:
+            return 0.0
+        latency = time.perf_counter() - self._signal_started
+        self.metrics.observe("signal_to_ack", latency)
+        self._signal_started = None
+        return latency
@@ -0,0 +1,89 @@
+# Runs many trading pairs concurrently in one process
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from brokers.account import AccountCache
+from brokers.binance_api import BinanceAPI
+from brokers.exchange_info import ExchangeInfoCache
+from brokers.transport import get_transport
+from data.kline_store import KlineStore
+from data.market_data import MarketData
+from execution.executor import TradeExecutor
+from execution.position_manager import PositionManager
+from execution.scheduler import CandleScheduler
+from logs.metrics import get_metrics
+from notifications.telegram import log_notifier_stats
+
+
+class MultiSymbolExecutor:
+    """Drive one TradeExecutor per symbol from a single asyncio loop.
+
+    Every symbol shares one BinanceAPI client, one kline store, one
+    exchange-filter cache, one stream-fed account cache and one PositionManager.
+    Cycles run concurrently on a bounded thread pool, so a cycle over many pairs
+    takes roughly as long as the slowest pair, not their sum. Request pacing is left
+    to the process-wide WeightScheduler, which spends the exchange's real weight
+    budget, so a cycle is only slowed once that budget is actually short.
+    """
+
+    def __init__(self, symbols, api=None, position_mgr=None, kline_root="state/klines", max_concurrency=16):
+        self.symbols = [s.upper() for s in symbols]
+        self.api = api or BinanceAPI()
+        self.position_mgr = position_mgr or PositionManager()
+        self.store = KlineStore(self.api, root=kline_root)
+        self.exchange_info = ExchangeInfoCache(self.api)
+        self.account = AccountCache(self.api)
+        self.max_concurrency = max_concurrency
+
+        self.executors = {
+            symbol: TradeExecutor(
+                symbol=symbol,
+                api=self.api,
+                market_data=MarketData(api=self.api, symbol=symbol, store=self.store),
+                position_mgr=self.position_mgr,
+                exchange_info=self.exchange_info,
+                account=self.account,
+            )
+            for symbol in self.symbols
+        }
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="symbol")
+
+    async def run_once(self, open_time=None, woke_at=None, replay=False):
+        """Run one trading cycle for every symbol concurrently; returns the cycle time in seconds.
+
+        With `open_time` every symbol evaluates the window ending at that closed candle;
+        a `replay` of a missed candle places no orders.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        cycles = [
+            loop.run_in_executor(self._pool, executor.run_once) if open_time is None
+            else loop.run_in_executor(self._pool, executor.run_closed, open_time, woke_at, replay)
+            for executor in self.executors.values()
+        ]
+        results = await asyncio.gather(*cycles, return_exceptions=True)
+
+        for symbol, result in zip(self.executors, results):
+            if isinstance(result, Exception):
+                logging.error(f"[{symbol}] Trading cycle failed: {result}")
+
+        elapsed = time.perf_counter() - started
+        logging.info(f"Cycle over {len(self.symbols)} symbols took {elapsed:.2f}s")
+        get_transport().log_metrics()
+        get_metrics().log_summary()
+        log_notifier_stats()
+        return elapsed
+
+    async def run_forever(self, scheduler=None):
+        """Run a cycle for every symbol right after each candle closes."""
+        interval = next(iter(self.executors.values())).market_data.interval
+        scheduler = scheduler or CandleScheduler(interval, server_offset=self.api.sync_time)
+        account_stream = asyncio.create_task(self.account.stream())
+        try:
+            await scheduler.run_async(self.run_once)
+        finally:
+            account_stream.cancel()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
@@ -1,50 +1,149 @@
 import json
+import logging
 import os
+import threading
 import time
 
 class PositionManager:
-    def __init__(self, state_file="state/positions.json"):
+    """Open positions indexed by symbol, persisted as a snapshot plus an append-only journal.
+
+    Every add/close appends one JSON line to the journal and is fsynced before the
+    call returns; concurrent writers share a single fsync (group commit). After
+    `compact_every` journal records the positions are written to a fresh snapshot
+    and the journal is truncated. On start the snapshot is loaded and the journal
+    replayed, ignoring a trailing line left half-written by a crash.
+    """
+
+    def __init__(self, state_file="state/positions.json", compact_every=1000):
         self.state_file = state_file
+        self.journal_file = os.path.splitext(state_file)[0] + ".journal"
+        self.compact_every = compact_every
+        # One manager is shared by every symbol's executor thread
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self.syncs = 0
+
         self.positions = self._load()
+        self._journal_records = self._replay()
+        os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+        self._journal = open(self.journal_file, "a")
 
     def add_position(self, symbol, qty, price):
-        self.positions.append({
-            "symbol": symbol,
-            "qty": qty,
-            "price": price,
-            "timestamp": time.time()
-        })
-        self._save()
+        with self._lock:
+            position = {
+                "symbol": symbol,
+                "qty": qty,
+                "price": price,
+                "timestamp": time.time()
+            }
+            self.positions[symbol] = position
+            seq = self._append({"op": "add", **position})
+        self._sync(seq)
 
     def get_open_position(self, symbol):
-        for pos in self.positions:
-            if pos["symbol"] == symbol:
-                return pos
-        return None
+        with self._lock:
+            return self.positions.get(symbol)
 
     def close_position(self, symbol):
-        for i, pos in enumerate(self.positions):
-            if pos["symbol"] == symbol:
-                removed = self.positions.pop(i)
-                self._save()
-                return removed
-        return None
+        with self._lock:
+            removed = self.positions.pop(symbol, None)
+            if removed is None:
+                return None
+            seq = self._append({"op": "close", "symbol": symbol})
+        self._sync(seq)
+        return removed
 
     def has_position(self, symbol):
-        return any(pos["symbol"] == symbol for pos in self.positions)
+        with self._lock:
+            return symbol in self.positions
 
     def get_all_positions(self):
-        return self.positions
+        with self._lock:
+            return list(self.positions.values())
+
+    def compact(self):
+        """Write all open positions to the snapshot and start an empty journal"""
+        with self._lock:
+            tmp = self.state_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(list(self.positions.values()), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.state_file)
+
+            self._journal.close()
+            self._journal = open(self.journal_file, "w")
+            self._journal_records = 0
+            self._synced = self._written
+
+    def close(self):
+        with self._lock:
+            self.compact()
+            self._journal.close()
+
+    def _append(self, record):
+        """Write a journal record (caller holds the lock); returns its sequence number"""
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        self._written += 1
+        self._journal_records += 1
+        if self._journal_records >= self.compact_every:
+            self.compact()
+        return self._written
 
-    def _save(self):
-        with open(self.state_file, 'w') as f:
-            json.dump(self.positions, f, indent=2)
+    def _sync(self, seq):
+        """Make record `seq` durable; one fsync covers every record written before it started"""
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target = self._written
+                fd = os.dup(self._journal.fileno())  # stays valid if compaction swaps the journal meanwhile
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self.syncs += 1
+            self._synced = max(self._synced, target)
 
     def _load(self):
         if os.path.exists(self.state_file):
             with open(self.state_file, 'r') as f:
                 try:
-                    return json.load(f)
+                    return {pos["symbol"]: pos for pos in json.load(f)}
                 except json.JSONDecodeError:
-                    return []
-        return []
+                    logging.warning(f"Unreadable position snapshot {self.state_file}, starting from the journal only")
+                    return {}
+        return {}
+
+    def _replay(self):
+        """Apply journal records on top of the snapshot; returns how many were replayed"""
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        replayed = 0
+        good_bytes = 0
+        with open(self.journal_file, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Dropping truncated record at the end of {self.journal_file}")
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good_bytes += len(line)
+                replayed += 1
+
+                if record["op"] == "add":
+                    record.pop("op")
+                    self.positions[record["symbol"]] = record
+                elif record["op"] == "close":
+                    self.positions.pop(record["symbol"], None)
+
+        if good_bytes < os.path.getsize(self.journal_file):
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(good_bytes)
+        return replayed
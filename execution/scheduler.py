@@ -0,0 +1,112 @@
+# Wake the trading loop right after each candle closes on the exchange clock
+import asyncio
+import json
+import logging
+import os
+import time
+from data.kline_store import candle_open, interval_ms
+from logs.metrics import get_metrics
+
+PUBLISH_DELAY = 1.5  # seconds after the close before the exchange reliably serves the final candle
+
+
+class CandleScheduler:
+    """Candle-close-aligned wakeups with drift and clock-skew correction.
+
+    Every wait targets an absolute boundary on the server clock (local time plus
+    `server_offset()` ms), recomputed after each cycle, so slow cycles never push
+    later ones back. Closes that passed unhandled — a cycle ran long, or the process
+    was down and `state_file` remembers where it stopped — are returned by due()
+    oldest first, at most `max_catch_up` of them. run() hands them on with
+    replay=True: only the newest close of a wakeup may lead to an order.
+    """
+
+    def __init__(self, interval, publish_delay=PUBLISH_DELAY, server_offset=None, state_file=None,
+                 max_catch_up=100, clock=time.time, sleep=time.sleep):
+        self.interval = interval
+        self.step = interval_ms(interval)
+        self.publish_delay = publish_delay
+        self.server_offset = server_offset or (lambda: 0)
+        self.state_file = state_file
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.last_closed = self._load_state()  # open time of the newest candle already handled
+        self.metrics = get_metrics()
+
+    def server_now(self):
+        """Exchange time in ms"""
+        return int(self.clock() * 1000 + (self.server_offset() or 0))
+
+    def seconds_until_wake(self):
+        """Time to wait for the next close (plus publication delay); 0 if one is already due"""
+        if self.due(peek=True):
+            return 0.0
+        now = self.server_now()
+        next_close = candle_open(now, self.interval) + self.step
+        return max(0.0, (next_close - now) / 1000 + self.publish_delay)
+
+    def due(self, peek=False):
+        """Open times of closed candles not handled yet, oldest first; marks them handled unless peeking"""
+        newest = candle_open(self.server_now() - int(self.publish_delay * 1000), self.interval) - self.step
+        if self.last_closed is None:
+            first = newest
+        else:
+            first = max(self.last_closed + self.step, newest - (self.max_catch_up - 1) * self.step)
+            skipped = (first - self.last_closed) // self.step - 1
+            if skipped > 0 and not peek:
+                logging.warning(f"⏭️ {skipped} {self.interval} candles closed too long ago to replay")
+        bars = list(range(first, newest + 1, self.step))
+        if bars and not peek:
+            self.last_closed = bars[-1]
+            self._save_state()
+        return bars
+
+    def run(self, on_close, cycles=None):
+        """Call on_close(open_time, woke_at, replay) for every closed candle, forever or for `cycles` wakeups"""
+        while cycles is None or cycles > 0:
+            self.sleep(self.seconds_until_wake())
+            for open_time, woke_at, replay in self._wakeups():
+                on_close(open_time, woke_at, replay)
+            cycles = None if cycles is None else cycles - 1
+
+    async def run_async(self, on_close, cycles=None):
+        """run() for an asyncio loop; on_close is awaited"""
+        while cycles is None or cycles > 0:
+            await asyncio.sleep(self.seconds_until_wake())
+            for open_time, woke_at, replay in self._wakeups():
+                await on_close(open_time, woke_at, replay)
+            cycles = None if cycles is None else cycles - 1
+
+    def _wakeups(self):
+        woke_at = time.perf_counter()
+        bars = self.due()
+        if not bars:
+            return []
+        lag = self.server_now() - (bars[-1] + self.step)
+        self.metrics.observe("wake_lag", max(lag, 0) / 1000)
+        if len(bars) > 1:
+            self.metrics.inc("replayed_bars_total", len(bars) - 1, interval=self.interval)
+            logging.info(f"🔁 Replaying {len(bars) - 1} missed {self.interval} candles")
+        logging.info(f"⏰ {self.interval} candle closed {lag}ms ago")
+        # Missed closes only catch the strategy up; signals from stale closes must not trade at today's prices
+        return [(open_time, woke_at, open_time != bars[-1]) for open_time in bars]
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return None
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+            return state["last_closed"] if state.get("interval") == self.interval else None
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable scheduler state {self.state_file}: {e}")
+            return None
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"interval": self.interval, "last_closed": self.last_closed}, f)
+        os.replace(tmp, self.state_file)
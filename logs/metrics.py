@@ -0,0 +1,161 @@
+# Latency histograms and error counters for the trading cycle
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "scalp"
+# Bucket upper bounds in seconds: 1us growing by sqrt(2) up to ~134s
+BUCKETS = tuple(0.000001 * 2 ** (i / 2) for i in range(55))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: O(log buckets) per observation, exact max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Metrics:
+    """Per-stage latency histograms plus labelled counters, safe to share across threads"""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block into the histogram of `stage` (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def summary(self):
+        """{stage: {count, p50_ms, p99_ms, max_ms}} for every stage seen so far"""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p99_ms": h.quantile(0.99) * 1000,
+                    "max_ms": h.max * 1000,
+                }
+                for stage, h in self.stages.items()
+            }
+
+    def log_summary(self):
+        for stage, s in self.summary().items():
+            logging.info(
+                f"⏱️ {stage}: {s['count']} calls, p50 {s['p50_ms']:.1f}ms, "
+                f"p99 {s['p99_ms']:.1f}ms, max {s['max_ms']:.1f}ms"
+            )
+        with self._lock:
+            counters = dict(self.counters)
+        for (name, labels), value in sorted(counters.items()):
+            logging.info(f"🔢 {name}{_labels(labels)}: {value}")
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            if self.stages:
+                lines.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+            for stage, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.counts):
+                    cumulative += n
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h.total}')
+                lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+            if self.stages:
+                lines.append(f"# TYPE {PREFIX}_stage_seconds_max gauge")
+            for stage, h in sorted(self.stages.items()):
+                lines.append(f'{PREFIX}_stage_seconds_max{{stage="{stage}"}} {h.max}')
+
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}_{name} counter")
+                    typed.add(name)
+                lines.append(f"{PREFIX}_{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """Expose render() at http://host:port/metrics from a daemon thread; returns the server"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info(f"📈 Metrics at http://{host}:{server.server_port}/metrics")
+        return server
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Process-wide Metrics registry."""
+    return _metrics
@@ -1,39 +1,80 @@
 # main.py
+import argparse
+import asyncio
+import os
 import time
 import logging
 from execution.executor import TradeExecutor
-from config.settings import ENVIRONMENT, TRADING_CONFIG
-
-# --- Logging setup ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("state/bot.log", mode='a')
-    ]
-)
+from execution.multi_executor import MultiSymbolExecutor
+from execution.scheduler import PUBLISH_DELAY, CandleScheduler
+from brokers.transport import get_transport
+from notifications.telegram import log_notifier_stats
+from logs.metrics import get_metrics
+from config import settings
+from config.settings import TRADING_CONFIG
+
+def setup_logging():
+    # After argument parsing, so `--help` never opens the log file
+    os.makedirs("state", exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s | %(levelname)s | %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler("state/bot.log", mode='a')
+        ]
+    )
 
 def show_banner():
-    if ENVIRONMENT == "testnet":
+    if settings.ENVIRONMENT == "testnet":
         print("\n🧪 TESTNET MODE ACTIVE — SIMULATED TRADING\n")
         logging.info("MODE: TESTNET")
-    elif ENVIRONMENT == "live":
+    elif settings.ENVIRONMENT == "live":
         print("\n🚨 LIVE TRADING MODE ENABLED — REAL FUNDS AT RISK ⚠️\n")
         logging.info("MODE: LIVE")
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", action="store_true", help="Evaluate on WebSocket candle closes instead of polling REST")
+    parser.add_argument("--symbols", type=str, default=None, help="Comma-separated pairs to trade concurrently")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--publish-delay", type=float, default=PUBLISH_DELAY,
+                        help="Seconds to wait after a candle closes before evaluating it")
+    args = parser.parse_args()
+
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    else:
+        symbols = TRADING_CONFIG["pairs"]
+    if not symbols:
+        parser.error("--symbols needs at least one pair")
+    if args.stream and len(symbols) > 1:
+        parser.error("--stream trades a single pair; drop it or pass one symbol")
+
+    setup_logging()
     show_banner()
-    executor = TradeExecutor()
+    if args.metrics_port is not None:
+        get_metrics().serve(args.metrics_port)
+
+    if len(symbols) > 1:
+        logging.info(f"Trading {len(symbols)} pairs concurrently: {', '.join(symbols)}")
+        multi = MultiSymbolExecutor(symbols)
+        scheduler = CandleScheduler(TRADING_CONFIG["timeframe"], args.publish_delay, multi.api.sync_time,
+                                    state_file="state/scheduler.json")
+        asyncio.run(multi.run_forever(scheduler))
+        return
+
+    executor = TradeExecutor(symbol=symbols[0])
+
+    # Balances come from one account snapshot, then the user-data stream keeps them current
+    executor.account.start()
 
     # Show balance info only in LIVE mode
-    if ENVIRONMENT != "testnet":
-        usdt = executor.api.get_asset_balance("USDT")
-        if usdt:
-            print(f"💰 USDT Balance: {usdt}")
-            logging.info(f"USDT Balance: {usdt}")
-    else:
-        logging.info("⏭️ Skipping balance fetch in testnet mode.")
+    if settings.ENVIRONMENT != "testnet":
+        usdt = executor.account.balance("USDT")
+        if usdt.free:
+            print(f"💰 USDT Balance: {usdt.free}")
+            logging.info(f"USDT Balance: {usdt.free}")
 
     open_positions = executor.position_mgr.get_all_positions()
     if open_positions:
@@ -41,9 +82,29 @@ def main():
         logging.info(f"Open positions loaded: {open_positions}")
 
     # --- Start bot loop ---
-    while True:
-        executor.run_once()
-        time.sleep(3600)  # 1-hour interval
+    last_summary = time.time()
+
+    def log_hourly_summary():
+        nonlocal last_summary
+        if time.time() - last_summary >= 3600:
+            get_transport().log_metrics()
+            get_metrics().log_summary()
+            log_notifier_stats()
+            last_summary = time.time()
+
+    if args.stream:
+        executor.run_stream(after_close=log_hourly_summary)
+        return
+
+    # Wake right after every candle close, replaying any missed while busy or stopped
+    scheduler = CandleScheduler(executor.market_data.interval, args.publish_delay, executor.api.sync_time,
+                                state_file="state/scheduler.json")
+
+    def on_close(open_time, woke_at, replay):
+        executor.run_closed(open_time, woke_at, replay)
+        log_hourly_summary()
+
+    scheduler.run(on_close)
 
 if __name__ == "__main__":
     main()
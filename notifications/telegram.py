@@ -1,29 +1,181 @@
-import os
-import requests
-from dotenv import load_dotenv
+import atexit
+import logging
+import queue
+import threading
+import time
+from brokers.transport import get_transport
+from config.settings import TELEGRAM_CONFIG
+from logs.metrics import get_metrics
 
-# Load environment variables
-load_dotenv()
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for one sendMessage text
+REJECTED = -1  # send() result for a message Telegram refused outright; retrying would not help
 
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-def send_telegram_message(message: str):
-    """Send message to configured Telegram chat"""
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        print("Telegram config missing.")
-        return
+class TelegramNotifier:
+    """Background Telegram sender so the trading path never waits on the network.
+
+    notify() only puts the message on a bounded queue (dropping it when full). A
+    worker thread drains the queue, coalesces everything that arrives within
+    `coalesce_window` seconds into one digest, keeps at least `min_interval`
+    between sends (Telegram allows about one message per second per chat) and
+    backs off on 429 retry_after or transport errors. Other 4xx answers are not
+    retried.
+    """
+
+    def __init__(self, send=None, max_queue=100, coalesce_window=1.0, min_interval=1.0, max_retries=3):
+        self.send = send or _post_message
+        self.coalesce_window = coalesce_window
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self._last_send = 0.0
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._worker.start()
+
+    def notify(self, message: str) -> bool:
+        """Queue a message without blocking; returns False if it had to be dropped."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def close(self, timeout=5.0):
+        """Flush what is queued (up to `timeout` seconds) and stop the worker."""
+        self._stopped.set()
+        self._worker.join(timeout)
+
+    def _run(self):
+        while not (self._stopped.is_set() and self.queue.empty()):
+            try:
+                first = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.coalesce_window
+            while not self._stopped.is_set() and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.coalesced += len(batch) - 1
+            for digest in _digests(batch):
+                self._deliver(digest)
+
+    def _deliver(self, text):
+        for attempt in range(self.max_retries):
+            pause = self.min_interval - (time.monotonic() - self._last_send)
+            if pause > 0:
+                time.sleep(pause)
+
+            retry_after = self.send(text)
+            self._last_send = time.monotonic()
+            if retry_after is None:
+                self.sent += 1
+                return
+            if retry_after == REJECTED:
+                break
+            get_metrics().inc("api_retries_total", endpoint="telegram")
+            time.sleep(min(retry_after, 60) if retry_after else 2 ** attempt)
+
+        self.failed += 1
+        get_metrics().inc("api_errors_total", endpoint="telegram")
+        logging.warning(f"Dropping Telegram message after {attempt + 1} attempts")
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+
+def _digests(messages):
+    """Join queued messages into as few texts under Telegram's length limit as possible"""
+    digests = []
+    current = ""
+    for message in messages:
+        message = message[:MAX_MESSAGE_LENGTH]
+        if current and len(current) + 1 + len(message) > MAX_MESSAGE_LENGTH:
+            digests.append(current)
+            current = ""
+        current = f"{current}\n{message}" if current else message
+    if current:
+        digests.append(current)
+    return digests
+
+
+def _post_message(text):
+    """Send one message; returns None on success, REJECTED on a client error, else seconds to wait before retrying (0 = backoff)"""
+    url = f"https://api.telegram.org/bot{TELEGRAM_CONFIG['bot_token']}/sendMessage"
     payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message,
+        "chat_id": TELEGRAM_CONFIG["chat_id"],
+        "text": text,
         "parse_mode": "Markdown"
     }
 
     try:
-        response = requests.post(url, json=payload)
-        if response.status_code != 200:
-            print(f"Telegram send failed: {response.text}")
+        response = get_transport().post(url, json=payload, timeout=10)
+        if response.status_code == 400 and "parse entities" in response.text:
+            # One stray * or _ in any coalesced message fails the whole digest, so send it unformatted
+            del payload["parse_mode"]
+            response = get_transport().post(url, json=payload, timeout=10)
+        if response.status_code == 200:
+            return None
+        if response.status_code == 429:
+            return float(response.json().get("parameters", {}).get("retry_after", 1))
+        print(f"Telegram send failed: {response.text}")
+        if 400 <= response.status_code < 500:
+            return REJECTED
     except Exception as e:
         print(f"Error sending Telegram message: {e}")
+    return 0
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = TelegramNotifier()
+            atexit.register(_notifier.close)
+        return _notifier
+
+
+def log_notifier_stats():
+    """Log queue depth and drop counters of the background notifier, if it was started"""
+    if _notifier is not None:
+        s = _notifier.stats()
+        logging.info(
+            f"📬 Telegram: {s['sent']} sent, {s['coalesced']} coalesced, queue depth {s['queue_depth']}, "
+            f"{s['dropped']} dropped, {s['failed']} failed"
+        )
+
+
+def send_telegram_message(message: str):
+    """Queue a message for the configured Telegram chat (never blocks)"""
+    if not TELEGRAM_CONFIG["bot_token"] or not TELEGRAM_CONFIG["chat_id"]:
+        print("Telegram config missing.")
+        return
+
+    with get_metrics().span("notify"):
+        get_notifier().notify(message)
@@ -1 +1,125 @@
 # Abstract base class for trading strategies
+import copy
+import numpy as np
+
+HOLD, BUY, SELL = 0, 1, -1
+SIGNAL_NAMES = {HOLD: "hold", BUY: "buy", SELL: "sell"}
+
+
+def as_array(values):
+    """Return a contiguous float64 array for a Series, list or ndarray"""
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+def rolling_mean(close, lookback):
+    """Mean of the trailing `lookback` closes for every bar (NaN until the window is full), along the last axis.
+
+    The window is summed afresh every `lookback` bars and moved by adding the new close
+    and dropping the oldest in between, the same arithmetic as MeanReversionStrategy.on_bar
+    replaying from the first bar. Rounding never builds up over more than one window, so
+    this stays within a few ulps of the fresh window sums generate_signal takes.
+    """
+    close = as_array(close)
+    out = np.full(close.shape, np.nan)
+    n = close.shape[-1]
+    laps = n // lookback
+    if laps:
+        # Fresh sums, oldest close first, of the windows ending at bars lookback - 1, 2 * lookback - 1, ...
+        end = laps * lookback
+        total = close[..., 0:end:lookback].copy()
+        for k in range(1, lookback):
+            total += close[..., k:end:lookback]
+        out[..., lookback - 1::lookback] = total
+        # The bars in between, one offset at a time across all laps
+        for j in range(1, lookback):
+            bar = lookback - 1 + j
+            count = len(range(bar, n, lookback))
+            if not count:
+                break
+            dropped = close[..., j - 1::lookback][..., :count]
+            out[..., bar::lookback] = out[..., bar - 1::lookback][..., :count] + (close[..., bar::lookback] - dropped)
+        out /= lookback
+    return out
+
+
+def threshold_signals(close, can_buy, rebound, start=0):
+    """Flat/long rule over many price paths at once (one row per path): a flat row buys
+    where `can_buy` is set, a long row sells once the close is `rebound` above its entry"""
+    size, bars = close.shape
+    signals = np.zeros(close.shape, dtype=np.int8)
+    in_position = np.zeros(size, dtype=bool)
+    entry = np.zeros(size)
+
+    for i in range(start, bars):
+        current = close[:, i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sells = in_position & ((current - entry) / entry >= rebound)
+        buys = ~in_position & can_buy[:, i]
+        entry[buys] = current[buys]
+        in_position = (in_position | buys) & ~sells
+        signals[buys, i] = BUY
+        signals[sells, i] = SELL
+    return signals
+
+
+class StrategyMismatch(AssertionError):
+    pass
+
+
+class BaseStrategy:
+    """One trading rule with a live path and a batch path.
+
+    Subclasses implement:
+      - on_bar(bar): fold one candle (a mapping with at least "close") into small
+        incremental state and return HOLD, BUY or SELL for it. Work per bar does
+        not grow with the history length.
+      - signals(arrays, start=0): the whole HOLD/BUY/SELL array for column arrays
+        in one pass, for backtests. No signal is emitted before `start`. A 2D
+        close array is a batch of price paths and gets one signal row per path.
+      - _prime(closes): rebuild the rolling state (not the position) from closes.
+
+    check_consistency() replays a series through both paths and raises on the
+    first bar where they disagree.
+    """
+
+    def reset(self):
+        """Forget rolling and position state"""
+        raise NotImplementedError
+
+    def on_bar(self, bar):
+        raise NotImplementedError
+
+    def signals(self, arrays, start=0):
+        raise NotImplementedError
+
+    def _prime(self, closes):
+        raise NotImplementedError
+
+    def generate_signal(self, candles):
+        """'buy', 'sell' or 'hold' for the newest candle of a window (DataFrame or column views)"""
+        if "close" not in candles:
+            return "hold"  # e.g. the empty frame MarketData returns when a fetch failed
+        closes = np.asarray(candles["close"])
+        if not len(closes):
+            return "hold"
+        # The window may have moved by several candles, or its last one may still be forming
+        self._prime(closes[:-1])
+        return SIGNAL_NAMES[self.on_bar({"close": closes[-1]})]
+
+    def check_consistency(self, arrays):
+        """Raise StrategyMismatch unless on_bar over every bar reproduces signals(arrays)"""
+        batch = copy.deepcopy(self)
+        batch.reset()
+        expected = batch.signals(arrays)
+
+        live = copy.deepcopy(self)
+        live.reset()
+        closes = as_array(arrays["close"])
+        for i, close in enumerate(closes.tolist()):
+            signal = live.on_bar({"close": close})
+            if signal != expected[i]:
+                raise StrategyMismatch(
+                    f"{type(self).__name__}: on_bar gave {SIGNAL_NAMES[signal]} but signals() "
+                    f"gave {SIGNAL_NAMES[int(expected[i])]} at bar {i} (close {close})"
+                )
+        return len(closes)
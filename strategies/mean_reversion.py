@@ -1,38 +1,101 @@
 # Mean reversion strategy implementation
-import pandas as pd
+import numpy as np
 from config.settings import STRATEGY_CONFIG
+from strategies.base_strategy import BUY, HOLD, SELL, BaseStrategy, as_array, rolling_mean, threshold_signals
 
-class MeanReversionStrategy:
+class MeanReversionStrategy(BaseStrategy):
     def __init__(self):
         self.config = STRATEGY_CONFIG["mean_reversion"]
         self.drop_threshold = self.config["drop_threshold_pct"] / 100.0
         self.rebound_threshold = self.config["rebound_threshold_pct"] / 100.0
         self.lookback = self.config["lookback_period"]
+        self.reset()
+
+    def reset(self):
         self.in_position = False
         self.entry_price = None
+        # Ring of the last `lookback` closes and their running sum, re-summed every lap
+        self._closes = [0.0] * self.lookback
+        self._sum = 0.0
+        self._next = 0
+        self._count = 0
 
-    def generate_signal(self, df: pd.DataFrame):
-        """Return 'buy', 'sell', or 'hold' based on mean reversion logic"""
+    def on_bar(self, bar):
+        """Signal for the next candle; O(1) work per bar on average however long the history is"""
+        if len(self._closes) != self.lookback:
+            self.reset()
+        lookback = self.lookback
+        current_price = float(bar["close"])
+        if self._count == lookback:
+            self._sum += current_price - self._closes[self._next]
+        else:
+            self._sum += current_price
+            self._count += 1
+        self._closes[self._next] = current_price
+        self._next = (self._next + 1) % lookback
+        if self._next == 0 and self._count == lookback:
+            # Re-sum the window once per lap of the ring so rounding cannot build up
+            self._sum = 0.0
+            for close in self._closes:
+                self._sum += close
 
-        if len(df) < self.lookback:
-            return "hold"  # Not enough data
+        if self._count < lookback:
+            return HOLD  # Not enough data
 
-        # Compute rolling average and latest price
-        recent_closes = df["close"].iloc[-self.lookback:]
-        average_price = recent_closes.mean()
-        current_price = df["close"].iloc[-1]
+        average_price = self._sum / lookback
 
         if not self.in_position:
             drop_pct = (average_price - current_price) / average_price
             if drop_pct >= self.drop_threshold:
                 self.in_position = True
                 self.entry_price = current_price
-                return "buy"
+                return BUY
         else:
             gain_pct = (current_price - self.entry_price) / self.entry_price
             if gain_pct >= self.rebound_threshold:
                 self.in_position = False
                 self.entry_price = None
-                return "sell"
+                return SELL
+
+        return HOLD
+
+    def signals(self, arrays, start=0):
+        """Signal array over whole close arrays in one linear pass"""
+        close = as_array(arrays["close"])
+        average = rolling_mean(close, self.lookback)
+        with np.errstate(invalid="ignore"):
+            can_buy = ((average - close) / average) >= self.drop_threshold
+        if close.ndim == 2:
+            return threshold_signals(close, can_buy, self.rebound_threshold, max(start, self.lookback - 1))
+
+        n = len(close)
+        signals = np.zeros(n, dtype=np.int8)
+
+        closes = close.tolist()
+        can_buy = can_buy.tolist()
+        in_position = False
+        entry_price = 0.0
+
+        for i in range(max(start, self.lookback - 1), n):
+            if not in_position:
+                if can_buy[i]:
+                    in_position = True
+                    entry_price = closes[i]
+                    signals[i] = BUY
+            elif (closes[i] - entry_price) / entry_price >= self.rebound_threshold:
+                in_position = False
+                signals[i] = SELL
+
+        return signals
 
-        return "hold"
+    def _prime(self, closes):
+        if len(self._closes) != self.lookback:
+            self.reset()
+        recent = as_array(closes[len(closes) - min(len(closes), self.lookback - 1):]).tolist()
+        n = len(recent)
+        self._closes[:n] = recent
+        self._sum = 0.0
+        for close in recent:
+            self._sum += close
+        self._next = n % self.lookback
+        self._count = n
@@ -1,31 +1,66 @@
+import numpy as np
 from config.settings import STRATEGY_CONFIG
-import pandas as pd
+from strategies.base_strategy import BUY, HOLD, SELL, BaseStrategy, as_array, threshold_signals
 
-class ScalpingStrategy:
+class ScalpingStrategy(BaseStrategy):
     def __init__(self):
         self.config = STRATEGY_CONFIG["scalping"]
         self.grid_size_pct = self.config["grid_size"] / 100.0
+        self.reset()
+
+    def reset(self):
         self.last_buy_price = None
         self.in_position = False
+        self.prev_price = None
 
-    def generate_signal(self, df: pd.DataFrame):
-        if len(df) < 2:
-            return "hold"
-
-        current_price = df["close"].iloc[-1]
-        prev_price = df["close"].iloc[-2]
+    def on_bar(self, bar):
+        current_price = bar["close"]
+        prev_price, self.prev_price = self.prev_price, current_price
+        if prev_price is None:
+            return HOLD
 
         if not self.in_position:
             drop_pct = (prev_price - current_price) / prev_price
             if drop_pct >= self.grid_size_pct:
                 self.last_buy_price = current_price
                 self.in_position = True
-                return "buy"
+                return BUY
         else:
             gain_pct = (current_price - self.last_buy_price) / self.last_buy_price
             if gain_pct >= self.grid_size_pct:
                 self.in_position = False
                 self.last_buy_price = None
-                return "sell"
+                return SELL
+
+        return HOLD
+
+    def signals(self, arrays, start=0):
+        """Signal array over whole close arrays in one linear pass"""
+        close = as_array(arrays["close"])
+        can_buy = np.zeros(close.shape, dtype=bool)
+        can_buy[..., 1:] = ((close[..., :-1] - close[..., 1:]) / close[..., :-1]) >= self.grid_size_pct
+        if close.ndim == 2:
+            return threshold_signals(close, can_buy, self.grid_size_pct, max(start, 1))
+
+        n = len(close)
+        signals = np.zeros(n, dtype=np.int8)
+
+        closes = close.tolist()
+        can_buy = can_buy.tolist()
+        in_position = False
+        last_buy_price = 0.0
+
+        for i in range(max(start, 1), n):
+            if not in_position:
+                if can_buy[i]:
+                    in_position = True
+                    last_buy_price = closes[i]
+                    signals[i] = BUY
+            elif (closes[i] - last_buy_price) / last_buy_price >= self.grid_size_pct:
+                in_position = False
+                signals[i] = SELL
+
+        return signals
 
-        return "hold"
+    def _prime(self, closes):
+        self.prev_price = closes[-1] if len(closes) else None
@@ -0,0 +1,86 @@
+import asyncio
+import json
+from websockets.asyncio.server import serve
+from brokers.account import AccountCache, Balance
+
+
+class AccountAPI:
+    """REST stand-in: account snapshots and listen keys, counted"""
+
+    def __init__(self, usdt=100.0):
+        self.usdt = usdt
+        self.account_calls = 0
+        self.listen_keys = []
+
+    def get_account(self):
+        self.account_calls += 1
+        return {"updateTime": 0, "balances": [{"asset": "USDT", "free": str(self.usdt), "locked": "0.0"}]}
+
+    def create_listen_key(self):
+        self.listen_keys.append(f"key{len(self.listen_keys)}")
+        return self.listen_keys[-1]
+
+    def keepalive_listen_key(self, listen_key):
+        return True
+
+
+def position(event_time, **free):
+    return json.dumps({"e": "outboundAccountPosition", "E": event_time, "u": event_time,
+                       "B": [{"a": asset, "f": str(qty), "l": "0.0"} for asset, qty in free.items()]})
+
+
+def test_rest_snapshot_is_bounded_by_max_age():
+    api = AccountAPI()
+    account = AccountCache(api, max_age=60)
+
+    assert account.balance("USDT") == Balance("USDT", 100.0, 0.0)
+    assert account.balance("BTC") == Balance("BTC", 0.0, 0.0)
+    assert api.account_calls == 1
+
+    api.usdt = 80.0
+    account.synced_at -= 61
+    assert account.balance("USDT").free == 80.0
+    account.invalidate()  # our own order changed the balance and no stream will say so
+    assert account.balance("USDT").free == 80.0
+    assert api.account_calls == 3
+
+
+def test_stream_events_keep_balances_current_without_rest():
+    api = AccountAPI()
+    account = AccountCache(api, max_age=0.01)
+    paths = []
+    reads = []
+
+    async def exchange(ws):
+        paths.append(ws.request.path)
+        if len(paths) == 1:
+            await ws.send(position(1000, USDT=60.0, XRP=39.0))
+            await ws.send(json.dumps({"e": "executionReport", "E": 1000, "s": "XRPUSDT", "S": "BUY", "X": "FILLED",
+                                      "i": 7, "c": "abc", "z": "39.0", "Z": "40.0"}))
+            await ws.send(json.dumps({"e": "balanceUpdate", "E": 999, "a": "USDT", "d": "5.0"}))  # already in 1000
+            await ws.send(json.dumps({"e": "balanceUpdate", "E": 1001, "a": "USDT", "d": "5.0"}))
+            await ws.send(json.dumps({"e": "listenKeyExpired", "E": 1002}))
+            await ws.wait_closed()
+        else:
+            await ws.send(position(2000, USDT=10.0))
+            await ws.wait_closed()
+
+    async def scenario():
+        async with serve(exchange, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            task = asyncio.create_task(account.stream(ws_url=f"ws://127.0.0.1:{port}"))
+            while account.balances.get("USDT", Balance("USDT", 0, 0)).free != 10.0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)  # longer than max_age: still served from memory while live
+            reads.append(account.balance("USDT"))
+            await account._stream.stop()
+            await task
+
+    account.refresh()
+    asyncio.run(scenario())
+
+    assert paths == ["/key0", "/key1"]  # a fresh listen key after expiry
+    assert reads == [Balance("USDT", 10.0, 0.0)]
+    assert account.balances["XRP"] == Balance("XRP", 39.0, 0.0)
+    assert account.orders[7]["status"] == "FILLED" and account.orders[7]["quote_qty"] == 40.0
+    assert api.account_calls == 2  # the seed, plus one resync after reconnecting
@@ -0,0 +1,133 @@
+from conftest import make_candles
+from backtesting import engine
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.scalping import ScalpingStrategy
+
+BARS = 5000
+
+
+class BaselineMeanReversion:
+    """MeanReversionStrategy.generate_signal before the engine, frozen as the reference"""
+
+    def __init__(self, drop_threshold, rebound_threshold, lookback):
+        self.drop_threshold = drop_threshold
+        self.rebound_threshold = rebound_threshold
+        self.lookback = lookback
+        self.in_position = False
+        self.entry_price = None
+
+    def generate_signal(self, df):
+        if len(df) < self.lookback:
+            return "hold"
+
+        recent_closes = df["close"].iloc[-self.lookback:]
+        average_price = recent_closes.mean()
+        current_price = df["close"].iloc[-1]
+
+        if not self.in_position:
+            drop_pct = (average_price - current_price) / average_price
+            if drop_pct >= self.drop_threshold:
+                self.in_position = True
+                self.entry_price = current_price
+                return "buy"
+        else:
+            gain_pct = (current_price - self.entry_price) / self.entry_price
+            if gain_pct >= self.rebound_threshold:
+                self.in_position = False
+                self.entry_price = None
+                return "sell"
+
+        return "hold"
+
+
+class BaselineScalping:
+    """ScalpingStrategy.generate_signal before the engine, frozen as the reference"""
+
+    def __init__(self, grid_size_pct):
+        self.grid_size_pct = grid_size_pct
+        self.last_buy_price = None
+        self.in_position = False
+
+    def generate_signal(self, df):
+        if len(df) < 2:
+            return "hold"
+
+        current_price = df["close"].iloc[-1]
+        prev_price = df["close"].iloc[-2]
+
+        if not self.in_position:
+            drop_pct = (prev_price - current_price) / prev_price
+            if drop_pct >= self.grid_size_pct:
+                self.last_buy_price = current_price
+                self.in_position = True
+                return "buy"
+        else:
+            gain_pct = (current_price - self.last_buy_price) / self.last_buy_price
+            if gain_pct >= self.grid_size_pct:
+                self.in_position = False
+                self.last_buy_price = None
+                return "sell"
+
+        return "hold"
+
+
+def reference_loop(df, strategy, lookback, initial_balance=1000.0):
+    """The original O(n²) Backtester.run loop"""
+    usdt = initial_balance
+    holdings = 0.0
+    entry_price = None
+    trade_log = []
+
+    for i in range(lookback, len(df)):
+        window = df.iloc[:i + 1]
+        signal = strategy.generate_signal(window)
+        current_price = window["close"].iloc[-1]
+
+        if signal == "buy" and usdt > 0:
+            entry_price = current_price
+            holdings = round(usdt / current_price, 6)
+            usdt = 0
+            trade_log.append(("BUY", current_price))
+
+        elif signal == "sell" and holdings > 0:
+            usdt = round(holdings * current_price, 2)
+            trade_log.append(("SELL", current_price))
+            holdings = 0
+            entry_price = None
+
+    return {"usdt": usdt, "holdings": holdings, "entry_price": entry_price, "trade_log": trade_log}
+
+
+def assert_parity(df, baseline, strategy, lookback):
+    expected = reference_loop(df, baseline, lookback)
+
+    close = engine.as_array(df["close"])
+    signals = engine.strategy_signals(strategy, close, start=lookback)
+    result = engine.simulate(close, signals)
+
+    assert result["trade_log"] == expected["trade_log"]
+    assert len(result["trade_log"]) > 20
+    assert engine.final_balance(result) == engine.final_balance(expected)
+
+
+def test_mean_reversion_parity():
+    df = make_candles(BARS, seed=7)
+    for drop, rebound in [(1.0, 3.0), (0.5, 1.0), (2.0, 1.5)]:
+        strategy = MeanReversionStrategy()
+        strategy.drop_threshold = drop / 100
+        strategy.rebound_threshold = rebound / 100
+        strategy.lookback = 20
+        baseline = BaselineMeanReversion(drop / 100, rebound / 100, lookback=20)
+
+        assert_parity(df, baseline, strategy, lookback=20)
+
+
+def test_scalping_parity():
+    strategy = ScalpingStrategy()
+    assert_parity(make_candles(BARS, seed=11), BaselineScalping(strategy.grid_size_pct), strategy, lookback=20)
+
+
+if __name__ == "__main__":
+    test_mean_reversion_parity()
+    test_scalping_parity()
+    print("✅ Engine matches the reference backtest loop")
@@ -0,0 +1,85 @@
+import json
+import time
+import numpy as np
+from data.candle_window import CandleWindow
+from data.kline_store import KlineStore, candle_open, decode_klines, interval_ms
+from data.market_data import MarketData
+
+STEP = 60_000
+
+
+def candle(ts, close):
+    return {"timestamp": ts, "open": close, "high": close, "low": close, "close": close, "volume": 1.0}
+
+
+def test_window_wraps_in_place_and_views_share_memory():
+    window = CandleWindow(5, "1m")
+    for i in range(12):
+        assert window.update(candle(i * STEP, float(i)))
+    assert window.update(candle(11 * STEP, 11.5))  # forming candle updated in place
+    assert window.update(candle(9 * STEP, 9.25))  # late final values of an older candle
+
+    views = window.views()
+    assert list(views["timestamp"]) == [i * STEP for i in range(7, 12)]
+    assert list(views["close"]) == [7.0, 8.0, 9.25, 10.0, 11.5]
+    assert np.shares_memory(views["close"], window._data["close"])
+    assert not views["close"].flags.writeable
+
+    assert not window.update(candle(14 * STEP, 14.0))  # gap: the caller has to reset
+
+
+class CountingKlineAPI:
+    """Flat klines up to the current minute, shifted by `offset` candles to fake a gap"""
+
+    def __init__(self):
+        self.offset = 0
+        self.down = False
+        self.range_calls = 0
+        self.latest_calls = 0
+
+    def get_kline_columns(self, symbol, interval, limit=100, start_time=None, end_time=None):
+        if self.down:
+            return decode_klines(b"[]")  # what BinanceAPI returns when the request fails
+        now_open = candle_open(int(time.time() * 1000), interval) + self.offset * STEP
+        if start_time is None:
+            self.latest_calls += 1
+            first = now_open - (limit - 1) * STEP
+        else:
+            self.range_calls += 1
+            first = start_time
+        last = now_open if end_time is None else min(end_time, now_open)
+        rows = [[ts, "2.0", "2.0", "2.0", "2.0", "1.0", ts + STEP - 1, "0", 1, "0", "0", "0"]
+                for ts in range(first, last + 1, STEP)][:limit]
+        return decode_klines(json.dumps(rows).encode())
+
+
+def test_live_cycles_only_read_newest_bars_until_a_gap(tmp_path):
+    api = CountingKlineAPI()
+    market_data = MarketData(api=api, symbol="XRPUSDT", interval="1m", store=KlineStore(api, root=str(tmp_path)))
+
+    first = market_data.latest_candles(limit=50)
+    assert len(first["close"]) == 50
+    range_calls = api.range_calls
+
+    for _ in range(5):
+        candles = market_data.latest_candles(limit=50)
+    assert api.range_calls == range_calls
+    assert api.latest_calls == 5
+    assert np.all(np.diff(candles["timestamp"]) == interval_ms("1m"))
+
+    api.offset = 10
+    candles = market_data.latest_candles(limit=50)
+    assert api.range_calls > range_calls
+    assert len(candles["close"]) == 50
+
+
+def test_failed_refresh_returns_no_candles_instead_of_the_stale_window(tmp_path):
+    api = CountingKlineAPI()
+    market_data = MarketData(api=api, symbol="XRPUSDT", interval="1m", store=KlineStore(api, root=str(tmp_path)))
+    assert len(market_data.latest_candles(limit=50)["close"]) == 50
+
+    api.down = True
+    assert len(market_data.latest_candles(limit=50)["close"]) == 0
+
+    api.down = False
+    assert len(market_data.latest_candles(limit=50)["close"]) == 50
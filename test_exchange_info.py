@@ -0,0 +1,113 @@
+import threading
+import time
+from brokers.exchange_info import ExchangeInfoCache
+
+EXCHANGE_INFO = {
+    "symbols": [
+        {
+            "symbol": "XRPUSDT", "baseAsset": "XRP", "quoteAsset": "USDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.00010000", "maxPrice": "10000.00000000", "tickSize": "0.00010000"},
+                {"filterType": "LOT_SIZE", "minQty": "1.00000000", "maxQty": "9000000.00000000", "stepSize": "1.00000000"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00000000", "maxNotional": "9000000.00000000"},
+            ],
+        },
+        {
+            "symbol": "BTCUSDT", "baseAsset": "BTC", "quoteAsset": "USDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "1000000.00000000", "tickSize": "0.01000000"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00001000", "maxQty": "9000.00000000", "stepSize": "0.00001000"},
+                {"filterType": "MIN_NOTIONAL", "minNotional": "10.00000000"},
+            ],
+        },
+    ]
+}
+
+
+class FakeExchangeInfoAPI:
+    def __init__(self):
+        self.calls = 0
+
+    def get_exchange_info(self):
+        self.calls += 1
+        return EXCHANGE_INFO
+
+
+def test_normalizes_with_one_exchange_info_request(tmp_path):
+    api = FakeExchangeInfoAPI()
+    cache = ExchangeInfoCache(api, snapshot_file=str(tmp_path / "exchange_info.json"))
+
+    assert cache.normalize_quantity("XRPUSDT", 20 / 0.5123) == 39.0
+    assert cache.normalize_quantity("BTCUSDT", 20 / 67123.45) == 0.00029
+    assert cache.normalize_quantity("XRPUSDT", 0.9) == 0.0
+    assert cache.normalize_price("BTCUSDT", 67123.456789) == 67123.45
+    assert cache.meets_min_notional("XRPUSDT", 10, 0.5)
+    assert not cache.meets_min_notional("BTCUSDT", 0.0001, 67123.45)
+    assert api.calls == 1
+
+
+def test_warm_start_from_snapshot_and_ttl_refresh(tmp_path):
+    snapshot = str(tmp_path / "exchange_info.json")
+    ExchangeInfoCache(FakeExchangeInfoAPI(), snapshot_file=snapshot).refresh()
+
+    api = FakeExchangeInfoAPI()
+    cache = ExchangeInfoCache(api, snapshot_file=snapshot)
+    assert cache.normalize_quantity("XRPUSDT", 12.7) == 12.0
+    assert api.calls == 0
+
+    cache.fetched_at -= cache.ttl + 1
+    cache.normalize_quantity("XRPUSDT", 12.7)
+    assert api.calls == 1
+
+
+def test_keeps_cached_filters_when_refresh_fails(tmp_path):
+    api = FakeExchangeInfoAPI()
+    cache = ExchangeInfoCache(api, ttl=0, snapshot_file=str(tmp_path / "exchange_info.json"))
+    cache.refresh()
+    api.get_exchange_info = lambda: None
+
+    assert cache.normalize_quantity("XRPUSDT", 12.7) == 12.0
+
+
+def test_unknown_symbols_and_failed_refreshes_do_not_refetch_every_call(tmp_path):
+    api = FakeExchangeInfoAPI()
+    cache = ExchangeInfoCache(api, snapshot_file=str(tmp_path / "exchange_info.json"))
+
+    for _ in range(3):
+        assert cache.normalize_quantity("NOPEUSDT", 12.7) == 12.7
+        assert cache.meets_min_notional("NOPEUSDT", 12.7, 1.0)
+    assert api.calls == 1
+
+    def broken():
+        api.calls += 1
+        raise ConnectionError("exchange unreachable")
+
+    api.get_exchange_info = broken
+    cache.fetched_at -= cache.ttl + 1
+    for _ in range(3):
+        assert cache.normalize_quantity("XRPUSDT", 12.7) == 12.0
+    assert api.calls == 2  # backing off, cached filters still used
+    assert cache.retry_at > time.time()
+
+
+def test_concurrent_callers_share_one_refresh(tmp_path):
+    api = FakeExchangeInfoAPI()
+    cache = ExchangeInfoCache(api, snapshot_file=str(tmp_path / "exchange_info.json"))
+    fetch = api.get_exchange_info
+    started = threading.Barrier(8)
+
+    def slow_fetch():
+        time.sleep(0.05)  # every caller queues on the lock while the first one downloads
+        return fetch()
+
+    def lookup():
+        started.wait()
+        cache.filters("XRPUSDT")
+
+    api.get_exchange_info = slow_fetch
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert api.calls == 1
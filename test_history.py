@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pytest
+from brokers.transport import Transport, WeightScheduler
+from data.history import DownloadError, HistoryDownloader
+
+STEP = 60_000
+
+
+class KlineStandIn(BaseHTTPRequestHandler):
+    """Minimal /api/v3/klines that serves synthetic 1m candles"""
+
+    server_version = "StandIn"
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def do_GET(self):
+        state = self.state
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        start, end, limit = int(query["startTime"]), int(query["endTime"]), int(query["limit"])
+
+        with state["lock"]:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            state["requests"].append(start)
+        time.sleep(0.01)
+
+        if start in state["fail"]:
+            body, status = b'{"code": -1000}', 500
+        else:
+            first = -(-start // STEP) * STEP
+            rows = []
+            for ts in range(first, min(end, state["last"]) + 1, STEP):
+                price = f"{100 + (ts // STEP) % 50:.8f}"
+                rows.append([ts, price, price, price, price, "1.0", ts + STEP - 1, "0", 1, "0", "0", "0"])
+                if len(rows) == limit:
+                    break
+            body, status = json.dumps(rows).encode(), 200
+
+        with state["lock"]:
+            state["in_flight"] -= 1
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(2 * len(state["requests"])))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    state = {"lock": threading.Lock(), "in_flight": 0, "max_in_flight": 0,
+             "requests": [], "fail": set(), "last": 10**15}
+    handler = type("Handler", (KlineStandIn,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+
+
+def test_download_stitches_pages_without_gaps(stand_in, tmp_path):
+    url, state = stand_in
+    transport = Transport()
+    scheduler = WeightScheduler()
+    downloader = HistoryDownloader(url, max_in_flight=3, checkpoint_dir=str(tmp_path),
+                                   transport=transport, scheduler=scheduler)
+
+    start = 1_700_000_040_000 // STEP * STEP
+    end = start + 5500 * STEP
+    columns = downloader.download("XRPUSDT", "1m", start, end)
+
+    assert len(columns["timestamp"]) == 5500
+    assert np.all(np.diff(columns["timestamp"]) == STEP)
+    assert columns["timestamp"][0] == start
+    assert len(state["requests"]) == 6
+    assert 1 < state["max_in_flight"] <= 3
+    assert scheduler.used_weight == 2 * 6
+    metrics = transport.metrics()[url.split("//")[1]]
+    assert metrics["requests"] == 6
+    assert metrics["reused"] >= 6 - 3  # at most one new connection per in-flight slot
+
+
+def test_download_resumes_after_interruption(stand_in, tmp_path):
+    url, state = stand_in
+    downloader = HistoryDownloader(url, max_in_flight=2, checkpoint_dir=str(tmp_path), max_retries=1,
+                                   transport=Transport(), scheduler=WeightScheduler())
+
+    start = 1_700_000_040_000 // STEP * STEP
+    end = start + 4000 * STEP
+    pages = downloader.pages("1m", start, end)
+    state["fail"] = {pages[2][0]}
+
+    with pytest.raises(DownloadError):
+        downloader.download("XRPUSDT", "1m", start, end)
+
+    state["fail"] = set()
+    state["requests"].clear()
+    columns = downloader.download("XRPUSDT", "1m", start, end)
+
+    assert state["requests"] == [pages[2][0]]
+    assert len(columns["timestamp"]) == 4000
+    assert np.all(np.diff(columns["timestamp"]) == STEP)
+
+
+def test_resume_with_new_bounds_reuses_checkpoints_and_cleans_up(stand_in, tmp_path):
+    url, state = stand_in
+    downloader = HistoryDownloader(url, max_in_flight=2, checkpoint_dir=str(tmp_path), max_retries=1,
+                                   transport=Transport(), scheduler=WeightScheduler())
+
+    start = 1_700_000_040_000 // STEP * STEP
+    end = start + 4000 * STEP
+    pages = downloader.pages("1m", start, end)
+    assert all(page[0] % (1000 * STEP) == 0 for page in pages)
+    state["fail"] = {pages[2][0]}
+    with pytest.raises(DownloadError):
+        downloader.download("XRPUSDT", "1m", start, end)
+
+    # The retry starts a few candles later and reaches further; the untouched full pages are reused
+    state["fail"] = set()
+    state["requests"].clear()
+    later_start, later_end = start + 5 * STEP, end + 2000 * STEP
+    columns = downloader.download("XRPUSDT", "1m", later_start, later_end)
+
+    new_pages = downloader.pages("1m", later_start, later_end)
+    assert sorted(state["requests"]) == [pages[2][0], pages[-1][0]] + [page[0] for page in new_pages[len(pages):]]
+    assert columns["timestamp"][0] == later_start and columns["timestamp"][-1] == later_end - STEP
+    assert np.all(np.diff(columns["timestamp"]) == STEP)
+    assert os.listdir(tmp_path / "XRPUSDT") == []  # no orphaned checkpoints left behind
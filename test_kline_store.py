@@ -0,0 +1,79 @@
+import json
+import time
+import numpy as np
+from data.kline_store import KlineStore, candle_open, decode_klines, interval_ms, to_frame
+
+
+class FakeKlineAPI:
+    """Serves synthetic 1m klines the way /api/v3/klines does"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_kline_columns(self, symbol, interval, limit=100, start_time=None, end_time=None):
+        self.calls.append((start_time, end_time))
+        step = interval_ms(interval)
+        now_ms = int(time.time() * 1000)
+        first = candle_open(start_time, interval)
+        last = min(end_time, now_ms)
+        rows = []
+        for ts in range(first, last + 1, step):
+            price = f"{1 + (ts // step) % 97 / 100:.8f}"
+            rows.append([ts, price, price, price, price, "10.0", ts + step - 1, "0", 1, "0", "0", "0"])
+            if len(rows) == limit:
+                break
+        return decode_klines(json.dumps(rows).encode())
+
+
+def test_store_fetches_only_missing_ranges(tmp_path):
+    api = FakeKlineAPI()
+    store = KlineStore(api, root=str(tmp_path))
+
+    first = store.get("XRPUSDT", "1m", limit=1500)
+    assert len(first["timestamp"]) == 1500
+    assert np.all(np.diff(first["timestamp"]) == 60_000)
+    assert isinstance(store.load("XRPUSDT", "1m")["close"].base, np.memmap)
+
+    calls = len(api.calls)
+    again = store.get("XRPUSDT", "1m", limit=1500)
+    # At most the candles that closed since the first call are fetched again
+    assert len(api.calls) - calls <= 1
+    assert again["timestamp"][-1] >= first["timestamp"][-1]
+
+    calls = len(api.calls)
+    store.get("XRPUSDT", "1m", limit=2500)
+    # Extending the history only asks for the older part that is not cached yet
+    assert any(end == first["timestamp"][0] - 1 for _, end in api.calls[calls:])
+
+
+def test_offline_reads_cache_without_api(tmp_path):
+    KlineStore(FakeKlineAPI(), root=str(tmp_path)).get("XRPUSDT", "1m", limit=300)
+
+    offline = KlineStore(None, root=str(tmp_path))
+    df = to_frame(offline.get("XRPUSDT", "1m", limit=200, offline=True))
+    assert len(df) == 200
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+
+
+def test_open_candle_is_returned_but_not_persisted(tmp_path):
+    store = KlineStore(FakeKlineAPI(), root=str(tmp_path))
+    columns = store.get("XRPUSDT", "1m", limit=50, include_open=True)
+
+    now_open = candle_open(int(time.time() * 1000), "1m")
+    assert columns["timestamp"][-1] >= now_open - 60_000
+    assert store.load("XRPUSDT", "1m")["timestamp"][-1] < now_open
+
+
+def test_decode_klines_matches_parsed_rows():
+    start = candle_open(int(time.time() * 1000), "1m") - 500 * 60_000
+    rows = [[ts, f"{0.1 + i * 1e-8:.8f}", "67123.45000000", "0.00001000", "1.23456789", "98765.4321", ts + 59_999,
+             "0", 7, "0", "0", "0"] for i, ts in enumerate(range(start, start + 500 * 60_000, 60_000))]
+    body = json.dumps(rows, separators=(",", ":")).encode()
+
+    decoded = decode_klines(body)
+    assert decoded["timestamp"].dtype == np.int64
+    assert np.array_equal(decoded["timestamp"], [row[0] for row in rows])
+    assert np.array_equal(decoded["close_time"], [row[6] for row in rows])
+    for i, name in enumerate(("open", "high", "low", "close", "volume"), start=1):
+        assert np.array_equal(decoded[name], [float(row[i]) for row in rows])
+    assert len(decode_klines(b"[]")["timestamp"]) == 0
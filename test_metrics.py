@@ -0,0 +1,39 @@
+import time
+import urllib.request
+from logs.metrics import Histogram, Metrics
+
+
+def test_histogram_quantiles_track_observations():
+    histogram = Histogram()
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)  # 1ms .. 1s
+
+    assert histogram.count == 1000
+    assert histogram.max == 1.0
+    assert 0.4 < histogram.quantile(0.5) < 0.6
+    assert 0.9 < histogram.quantile(0.99) <= 1.0
+
+
+def test_spans_and_counters_are_exported():
+    metrics = Metrics()
+    for _ in range(3):
+        with metrics.span("signal"):
+            time.sleep(0.002)
+    metrics.inc("api_errors_total", endpoint="klines")
+    metrics.inc("api_errors_total", endpoint="klines")
+
+    summary = metrics.summary()["signal"]
+    assert summary["count"] == 3
+    assert summary["max_ms"] >= 2
+    assert 1 < summary["p50_ms"] <= summary["max_ms"]
+
+    server = metrics.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        text = urllib.request.urlopen(url).read().decode()
+    finally:
+        server.shutdown()
+
+    assert 'scalp_stage_seconds_count{stage="signal"} 3' in text
+    assert 'scalp_stage_seconds_bucket{stage="signal",le="+Inf"} 3' in text
+    assert 'scalp_api_errors_total{endpoint="klines"} 2' in text
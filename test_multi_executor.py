@@ -0,0 +1,54 @@
+import asyncio
+import json
+import threading
+import time
+from data.kline_store import candle_open, decode_klines, interval_ms
+from execution.multi_executor import MultiSymbolExecutor
+from execution.position_manager import PositionManager
+
+
+class SlowFlatAPI:
+    """Flat-price exchange stand-in with fixed per-request latency"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_kline_columns(self, symbol, interval, limit=100, start_time=None, end_time=None):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+        step = interval_ms(interval)
+        now_open = candle_open(int(time.time() * 1000), interval)
+        first = max(start_time, now_open - 200 * step)
+        last = min(end_time, now_open)
+        rows = [[ts, "1.0", "1.0", "1.0", "1.0", "5.0", ts + step - 1, "0", 1, "0", "0", "0"]
+                for ts in range(first, last + 1, step)][:limit]
+        return decode_klines(json.dumps(rows).encode())
+
+
+def test_symbols_are_fetched_concurrently_up_to_the_limit(tmp_path):
+    for count, limit in ((24, 24), (24, 4)):
+        api = SlowFlatAPI()
+        symbols = [f"SYM{i}USDT" for i in range(count)]
+        multi = MultiSymbolExecutor(
+            symbols,
+            api=api,
+            position_mgr=PositionManager(str(tmp_path / f"positions_{limit}.json")),
+            kline_root=str(tmp_path / f"klines_{limit}"),
+            max_concurrency=limit,
+        )
+        asyncio.run(multi.run_once())
+        multi.close()
+
+        # Each pair's fetch waits on the exchange at the same time as the others, never more than the limit
+        assert api.calls >= count
+        assert api.max_in_flight == limit
@@ -0,0 +1,114 @@
+import threading
+import time
+import notifications.telegram as telegram_module
+from notifications.telegram import MAX_MESSAGE_LENGTH, REJECTED, TelegramNotifier
+
+
+class FakeTelegram:
+    def __init__(self, latency=0.0, rate_limited=0, blocked=False):
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.texts = []
+        self.calls = 0
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+
+    def __call__(self, text):
+        self.calls += 1
+        self.release.wait(5)  # a hung API call until the test lets it finish
+        time.sleep(self.latency)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return 0.05  # 429 with retry_after
+        self.texts.append(text)
+        return None
+
+
+def test_notify_never_blocks_on_slow_api():
+    telegram = FakeTelegram(blocked=True)
+    notifier = TelegramNotifier(send=telegram, coalesce_window=0.0, min_interval=0.0)
+
+    # Every call returns while the API is still hung on the first message
+    assert all(notifier.notify(f"fill {i}") for i in range(20))
+    assert not telegram.texts
+
+    telegram.release.set()
+    notifier.close()
+    assert notifier.stats()["sent"] >= 1
+    assert "fill 19" in "\n".join(telegram.texts)
+
+
+def test_bursts_are_coalesced_into_one_digest():
+    telegram = FakeTelegram()
+    notifier = TelegramNotifier(send=telegram, coalesce_window=0.2, min_interval=0.0)
+    for i in range(5):
+        notifier.notify(f"🟢 BUY {i}")
+    notifier.close()
+
+    assert telegram.texts == ["\n".join(f"🟢 BUY {i}" for i in range(5))]
+    assert notifier.stats()["coalesced"] == 4
+
+
+def test_full_queue_drops_and_counts():
+    telegram = FakeTelegram(latency=0.3)
+    notifier = TelegramNotifier(send=telegram, max_queue=3, coalesce_window=0.0, min_interval=0.0)
+    accepted = [notifier.notify("x" * 10) for _ in range(10)]
+    notifier.close()
+
+    assert accepted.count(False) == notifier.stats()["dropped"] > 0
+
+
+def test_rate_limit_is_retried_and_long_digests_split():
+    telegram = FakeTelegram(rate_limited=1)
+    notifier = TelegramNotifier(send=telegram, coalesce_window=0.1, min_interval=0.0)
+    notifier.notify("a" * (MAX_MESSAGE_LENGTH - 10))
+    notifier.notify("b" * 100)
+    notifier.close()
+
+    assert len(telegram.texts) == 2
+    assert telegram.calls == 3
+    assert notifier.stats()["failed"] == 0
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeBotAPI:
+    """Bot API stand-in that refuses Markdown it cannot parse"""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.payloads = []
+
+    def post(self, url, json=None, timeout=None):
+        self.payloads.append(dict(json))
+        if json.get("parse_mode") == "Markdown" and json["text"].count("*") % 2:
+            return FakeResponse(400, "Bad Request: can't parse entities")
+        return FakeResponse(self.status_code)
+
+
+def test_unparsable_markdown_digest_is_sent_as_plain_text(monkeypatch):
+    api = FakeBotAPI()
+    monkeypatch.setattr(telegram_module, "get_transport", lambda: api)
+
+    assert telegram_module._post_message("❌ *BUY failed* for XRPUSDT\n⚠️ 2*3 fills") is None
+    assert [p.get("parse_mode") for p in api.payloads] == ["Markdown", None]
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    api = FakeBotAPI(status_code=403)
+    monkeypatch.setattr(telegram_module, "get_transport", lambda: api)
+    assert telegram_module._post_message("bot was blocked") == REJECTED
+
+    calls = []
+    notifier = TelegramNotifier(send=lambda text: calls.append(text) or REJECTED,
+                                coalesce_window=0.0, min_interval=0.0)
+    notifier.notify("bot was blocked")
+    notifier.close()
+
+    assert len(calls) == 1
+    assert notifier.stats()["failed"] == 1
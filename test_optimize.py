@@ -0,0 +1,42 @@
+import pandas as pd
+from conftest import make_candles
+from backtesting.optimize import Optimizer, frange
+
+
+def make_optimizer(lookback=None):
+    # Offline: no Binance client and no network
+    return Optimizer("SIMUSDT", "1h", offline=True, lookback=lookback)
+
+
+def test_parallel_grid_matches_serial():
+    optimizer = make_optimizer()
+    df = make_candles()
+    grid = [round(x, 2) for x in frange(0.5, 3.0, 0.5)]
+
+    serial = pd.DataFrame(optimizer.grid_search(df, grid, grid, workers=1))
+    parallel = pd.DataFrame(optimizer.grid_search(df, grid, grid, workers=2))
+
+    assert parallel.equals(serial)
+    top_serial = serial.sort_values(by="return_pct", ascending=False).head(10)
+    top_parallel = parallel.sort_values(by="return_pct", ascending=False).head(10)
+    assert top_parallel.to_string(index=False) == top_serial.to_string(index=False)
+
+
+def test_batched_grid_matches_serial():
+    df = make_candles(n=5000, seed=5)
+    grid = [round(x, 2) for x in frange(0.25, 4.0, 0.25)]
+
+    for lookback in (None, 7, 30):
+        optimizer = make_optimizer(lookback)
+        serial = pd.DataFrame(optimizer.grid_search(df, grid, grid))
+        batched = pd.DataFrame(optimizer.grid_search(df, grid, grid, batched=True))
+        assert batched.equals(serial)
+
+    # The lookback reaches both paths: a different one changes the results
+    assert not serial.equals(pd.DataFrame(make_optimizer(7).grid_search(df, grid, grid)))
+
+
+if __name__ == "__main__":
+    test_parallel_grid_matches_serial()
+    test_batched_grid_matches_serial()
+    print("✅ Parallel and batched grid searches match serial mode")
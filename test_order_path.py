@@ -0,0 +1,87 @@
+import time
+import pytest
+from binance.exceptions import BinanceAPIException
+from brokers.binance_api import BinanceAPI
+from brokers.exchange_info import ExchangeInfoCache
+from brokers.simulated_exchange import LatencyProfile, SimulatedBinanceAPI, SimulatedExchange
+from brokers.transport import WeightScheduler
+from data.kline_store import KlineStore
+from data.market_data import MarketData
+from execution.executor import TradeExecutor
+from execution.position_manager import PositionManager
+from logs.metrics import get_metrics
+
+RTT = 0.05
+
+
+def make_executor(tmp_path, latency=RTT):
+    exchange = SimulatedExchange(["SIMUSDT"], bars=10)
+    api = SimulatedBinanceAPI(exchange, LatencyProfile(latency=latency))
+    executor = TradeExecutor(
+        symbol="SIMUSDT",
+        api=api,
+        market_data=MarketData(api=api, symbol="SIMUSDT", interval="1m", store=KlineStore(api, root=str(tmp_path))),
+        position_mgr=PositionManager(str(tmp_path / "positions.json")),
+        exchange_info=ExchangeInfoCache(SimulatedBinanceAPI(exchange), snapshot_file=str(tmp_path / "info.json")),
+        notify=lambda msg: None,
+    )
+    return executor, api
+
+
+def test_pre_trade_lookups_overlap_and_latency_is_recorded(tmp_path):
+    executor, api = make_executor(tmp_path)
+    acks = get_metrics().stages.get("signal_to_ack")
+    before = acks.count if acks else 0
+
+    executor._signal_started = time.perf_counter()
+    executor.execute_buy()
+    # price, balance and the first clock sync in flight together, then the order
+    assert api.calls == 4
+    assert api.network.max_in_flight == 3
+    assert api.time_syncs == 1
+    assert executor.position_mgr.has_position("SIMUSDT")
+
+    executor._signal_started = time.perf_counter()
+    executor.execute_sell()
+    assert api.calls == 5  # the order is the only request
+    assert not executor.position_mgr.has_position("SIMUSDT")
+    assert api.time_syncs == 1
+    assert get_metrics().stages["signal_to_ack"].count == before + 2
+
+
+class FakeClient:
+    def __init__(self, skew_ms):
+        self.skew_ms = skew_ms
+        self.timestamp_offset = 0
+        self.time_calls = 0
+        self.orders = []
+
+    def get_server_time(self):
+        self.time_calls += 1
+        return {"serverTime": int(time.time() * 1000) + self.skew_ms}
+
+    def create_order(self, **order):
+        if abs(self.timestamp_offset - self.skew_ms) > 500:
+            raise BinanceAPIException(type("Response", (), {"status_code": 400, "text": ""})(), 400,
+                                      '{"code": -1021, "msg": "Timestamp for this request is outside of the recvWindow."}')
+        self.orders.append(order)
+        return {"status": "FILLED", **order}
+
+
+def make_api(client):
+    return BinanceAPI(scheduler=WeightScheduler(), client=client)
+
+
+def test_server_time_offset_is_cached_and_resynced_on_rejection():
+    client = FakeClient(skew_ms=2000)
+    api = make_api(client)
+
+    assert api.sync_time() == pytest.approx(2000, abs=50)
+    assert api.place_market_order("XRPUSDT", "buy", 10)["status"] == "FILLED"
+    assert api.place_market_order("XRPUSDT", "sell", 10)["status"] == "FILLED"
+    assert client.time_calls == 1
+
+    client.skew_ms = -3000  # the local clock jumped
+    assert api.place_market_order("XRPUSDT", "buy", 10)["status"] == "FILLED"
+    assert client.time_calls == 2
+    assert len(client.orders) == 3
@@ -0,0 +1,60 @@
+import threading
+import time
+from execution import position_manager
+from execution.position_manager import PositionManager
+
+
+def test_replays_journal_on_restart(tmp_path):
+    state_file = str(tmp_path / "positions.json")
+    mgr = PositionManager(state_file)
+    mgr.add_position("XRPUSDT", 40.0, 0.5)
+    mgr.add_position("BTCUSDT", 0.0003, 67000.0)
+    mgr.close_position("XRPUSDT")
+
+    restarted = PositionManager(state_file)
+    assert not restarted.has_position("XRPUSDT")
+    assert restarted.get_open_position("BTCUSDT")["qty"] == 0.0003
+    assert len(restarted.get_all_positions()) == 1
+
+
+def test_ignores_truncated_trailing_record(tmp_path):
+    state_file = str(tmp_path / "positions.json")
+    mgr = PositionManager(state_file)
+    mgr.add_position("XRPUSDT", 40.0, 0.5)
+    with open(mgr.journal_file, "a") as f:
+        f.write('{"op": "add", "symbol": "ETHU')
+
+    restarted = PositionManager(state_file)
+    assert [p["symbol"] for p in restarted.get_all_positions()] == ["XRPUSDT"]
+    restarted.add_position("ETHUSDT", 0.01, 3000.0)
+    assert PositionManager(state_file).has_position("ETHUSDT")
+
+
+def test_compaction_snapshots_and_truncates_journal(tmp_path):
+    state_file = str(tmp_path / "positions.json")
+    mgr = PositionManager(state_file, compact_every=10)
+    for i in range(25):
+        mgr.add_position(f"SYM{i}USDT", 1.0, 1.0)
+
+    with open(mgr.journal_file) as f:
+        assert len(f.readlines()) == 5
+    assert len(PositionManager(state_file).get_all_positions()) == 25
+
+
+def test_concurrent_writers_share_fsyncs(tmp_path, monkeypatch):
+    real_fsync = position_manager.os.fsync
+
+    def slow_fsync(fd):
+        time.sleep(0.01)
+        real_fsync(fd)
+
+    monkeypatch.setattr(position_manager.os, "fsync", slow_fsync)
+    mgr = PositionManager(str(tmp_path / "positions.json"))
+    threads = [threading.Thread(target=mgr.add_position, args=(f"SYM{i}USDT", 1.0, 1.0)) for i in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert mgr.syncs < 32
+    assert len(PositionManager(str(tmp_path / "positions.json")).get_all_positions()) == 32
@@ -0,0 +1,84 @@
+import numpy as np
+from backtesting import engine
+from backtesting.robustness import block_bootstrap, distribution, run_paths, run_scenarios
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.scalping import ScalpingStrategy
+
+
+def synthetic_paths(count, bars, seed=3):
+    rng = np.random.default_rng(seed)
+    trend = 1 + 0.05 * np.sin(np.arange(bars) / 20)
+    return np.round(0.5 * trend * np.exp(np.cumsum(rng.normal(0, 0.006, (count, bars)), axis=1)), 4)
+
+
+def test_vectorized_paths_match_simulate_row_by_row():
+    paths = synthetic_paths(40, 1500)
+    for strategy in (MeanReversionStrategy(), ScalpingStrategy()):
+        state = engine.simulate_paths(paths, strategy.signals({"close": paths}))
+        for row, close in enumerate(paths):
+            result = engine.simulate(close, engine.strategy_signals(strategy, close))
+            assert state["final_balance"][row] == engine.final_balance(result)
+            assert state["trades"][row] == len(result["trade_log"])
+
+
+def test_costs_only_ever_lower_the_outcome():
+    paths = synthetic_paths(20, 1000)
+    strategy = MeanReversionStrategy()
+    signals = strategy.signals({"close": paths})
+    free = engine.simulate_paths(paths, signals)
+    costly = engine.simulate_paths(paths, signals, fee_rate=0.001, slippage=np.linspace(0, 0.002, 20))
+    assert (costly["final_balance"] <= free["final_balance"]).all()
+    assert (costly["trades"] == free["trades"]).all()  # costs move fills, not signals
+
+
+def test_bootstrap_keeps_the_start_and_resamples_real_returns():
+    close = synthetic_paths(1, 500)[0]
+    paths = block_bootstrap(close, 8, 24, np.random.default_rng(0))
+    assert paths.shape == (8, 500) and (paths[:, 0] == close[0]).all()
+    returns = np.round(np.diff(np.log(paths), axis=1), 9)
+    assert np.isin(returns, np.round(np.diff(np.log(close)), 9)).all()
+
+
+def test_parallel_runs_reproduce_serial_runs():
+    close = synthetic_paths(1, 2000)[0]
+    strategy = MeanReversionStrategy()
+    for mode in ("bootstrap", "jitter", "shuffle"):
+        serial = run_scenarios(close, strategy, mode, scenarios=300, workers=1, seed=7, batch=100)
+        parallel = run_scenarios(close, strategy, mode, scenarios=300, workers=3, seed=7, batch=100)
+        assert len(serial) == 300
+        assert serial.equals(parallel)
+
+    table, losing = distribution(serial)
+    assert list(table.index) == ["p5", "p25", "p50", "p75", "p95", "mean"]
+    assert 0 <= losing <= 100
+
+
+def test_scenario_distributions_are_consistent_with_the_baseline():
+    close = synthetic_paths(1, 3000)[0]
+    strategy = MeanReversionStrategy()
+    start = strategy.lookback
+    free = run_paths(close[None, :], strategy, start)
+    typical = run_paths(close[None, :], strategy, start, fee_rate=0.001, slippage=0.0005)
+
+    # Jittered costs on the real path: same trades, never better than free, spread around the typical cost
+    jitter = run_scenarios(close, strategy, "jitter", scenarios=400, seed=1, batch=200, start=start)
+    assert (jitter["trades"] == free["trades"][0]).all()
+    assert (jitter["return_pct"] <= free["return_pct"][0]).all()
+    assert jitter["return_pct"].min() < typical["return_pct"][0] < jitter["return_pct"].max()
+
+    # Reordering the same round trips at fixed costs keeps the return and only moves the drawdown
+    # (at this fee about half of them lose, so the order matters)
+    shuffle = run_scenarios(close, strategy, "shuffle", scenarios=400, seed=1, batch=200, start=start,
+                            fee_rate=0.016, fee_jitter=0.0, slippage_jitter=0.0)
+    assert np.allclose(shuffle["return_pct"], shuffle["return_pct"][0])
+    assert (shuffle["win_rate_pct"] == shuffle["win_rate_pct"][0]).all()
+    assert shuffle["max_drawdown_pct"].std() > 0
+
+    bootstrap = run_scenarios(close, strategy, "bootstrap", scenarios=400, seed=1, batch=200, start=start)
+    table, losing = distribution(bootstrap)
+    percentiles = table.drop(index="mean")
+    assert (percentiles.diff().iloc[1:] >= 0).all().all()
+    assert bootstrap["return_pct"].std() > 0
+    assert bootstrap["max_drawdown_pct"].between(0, 100).all()
+    assert bootstrap["win_rate_pct"].dropna().between(0, 100).all()
+    assert losing == (bootstrap["return_pct"] < 0).mean() * 100
@@ -0,0 +1,144 @@
+from brokers.exchange_info import ExchangeInfoCache
+from brokers.simulated_exchange import SimulatedBinanceAPI, SimulatedExchange
+from data.kline_store import KlineStore
+from data.market_data import MarketData
+from execution.executor import TradeExecutor
+from execution.position_manager import PositionManager
+from execution.scheduler import CandleScheduler
+from logs.metrics import get_metrics
+
+STEP = 60_000
+
+
+class FakeClock:
+    def __init__(self, ms):
+        self.ms = ms
+
+    def time(self):
+        return self.ms / 1000
+
+    def sleep(self, seconds):
+        self.ms += round(seconds * 1000)
+
+
+def test_wakes_on_the_server_clock_and_remembers_missed_closes(tmp_path):
+    clock = FakeClock(1_000 * STEP + 30_000)  # 30s into a candle
+    state = str(tmp_path / "scheduler.json")
+    scheduler = CandleScheduler("1m", publish_delay=1.5, state_file=state, clock=clock.time, sleep=clock.sleep)
+
+    assert scheduler.due() == [999 * STEP]  # the latest close is handled right away
+    assert scheduler.seconds_until_wake() == 31.5
+
+    skewed = CandleScheduler("1m", publish_delay=1.5, server_offset=lambda: 2_000, clock=clock.time)
+    skewed.due()
+    assert skewed.seconds_until_wake() == 29.5  # the exchange clock runs 2s ahead of ours
+
+    # Down for five minutes: a restart resumes from the state file
+    clock.ms += 5 * STEP
+    restarted = CandleScheduler("1m", publish_delay=1.5, state_file=state, clock=clock.time, max_catch_up=3)
+    assert restarted.due() == [1_002 * STEP, 1_003 * STEP, 1_004 * STEP]
+    assert restarted.due() == []
+
+
+def make_executor(tmp_path, exchange, api):
+    return TradeExecutor(
+        symbol="SIMUSDT",
+        api=api,
+        market_data=MarketData(api=api, symbol="SIMUSDT", interval="1m", store=KlineStore(api, root=str(tmp_path))),
+        position_mgr=PositionManager(str(tmp_path / "positions.json")),
+        exchange_info=ExchangeInfoCache(api, snapshot_file=str(tmp_path / "info.json")),
+        notify=lambda msg: None,
+    )
+
+
+def test_executor_evaluates_every_close_without_drift(tmp_path):
+    exchange = SimulatedExchange(["SIMUSDT"], bars=100)
+    api = SimulatedBinanceAPI(exchange)
+    executor = make_executor(tmp_path, exchange, api)
+
+    clock = FakeClock(exchange.origin + exchange.now * STEP + 2_000)
+
+    def sleep(seconds):
+        clock.sleep(seconds)
+        exchange.now = (clock.ms - exchange.origin) // STEP
+
+    scheduler = CandleScheduler("1m", publish_delay=1.5, clock=clock.time, sleep=sleep)
+    evaluated = []
+    lags = []
+    evaluate = executor.evaluate
+
+    def record(candles, woke_at=None, trade=True):
+        evaluated.append(int(candles["timestamp"][-1]))
+        lags.append(scheduler.server_now() - (evaluated[-1] + STEP))
+        evaluate(candles, woke_at, trade)
+
+    def on_close(open_time, woke_at, replay):
+        executor.run_closed(open_time, woke_at, replay)
+        if len(evaluated) == 3:
+            sleep(150)  # a cycle that overruns two and a half candles
+
+    executor.evaluate = record
+    before = get_metrics().stages.get("wake_to_signal")
+    before = before.count if before else 0
+    scheduler.run(on_close, cycles=6)
+
+    first = evaluated[0]
+    assert evaluated == [first + i * STEP for i in range(len(evaluated))]  # nothing skipped, nothing twice
+    assert len(evaluated) == 7  # six wakeups, one of which replays the two candles the slow cycle overran
+    assert lags[3:5] == [91_500, 31_500]
+    assert lags[0] == 2_000  # started 2s into a candle
+    assert lags[1:3] + lags[5:] == [1_500] * 4  # every other wake lands exactly publish_delay after its close
+    assert get_metrics().stages["wake_to_signal"].count == before + 7
+
+
+class Flipping:
+    """Says sell, then buy, then sell... on every evaluation"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_signal(self, candles):
+        self.calls += 1
+        return "sell" if self.calls % 2 else "buy"
+
+
+def test_catch_up_after_downtime_places_no_orders_for_past_bars(tmp_path):
+    exchange = SimulatedExchange(["SIMUSDT"], bars=100)
+    api = SimulatedBinanceAPI(exchange)
+    executor = make_executor(tmp_path, exchange, api)
+    executor.strategy = Flipping()
+    state = str(tmp_path / "scheduler.json")
+
+    clock = FakeClock(exchange.origin + (exchange.now - 4) * STEP + 2_000)
+    CandleScheduler("1m", state_file=state, clock=clock.time).due()  # last run, then down for four candles
+    clock.ms += 4 * STEP
+
+    scheduler = CandleScheduler("1m", state_file=state, clock=clock.time, sleep=clock.sleep)
+    replays = []
+
+    def on_close(open_time, woke_at, replay):
+        replays.append(replay)
+        executor.run_closed(open_time, woke_at, replay)
+
+    scheduler.run(on_close, cycles=1)
+
+    assert replays == [True, True, True, False]
+    assert executor.strategy.calls == 4  # every missed candle still reached the strategy
+    assert exchange.orders == 1  # but only the newest one could trade
+
+
+def test_stream_mode_reports_after_every_candle(tmp_path):
+    exchange = SimulatedExchange(["SIMUSDT"], bars=300)
+    api = SimulatedBinanceAPI(exchange)
+    executor = make_executor(tmp_path, exchange, api)
+    candles = api.get_kline_columns("SIMUSDT", "1m", limit=100)
+
+    async def stream(on_close, limit=100, ws_url=None):
+        for end in range(98, 101):
+            on_close({name: values[:end] for name, values in candles.items()})
+
+    executor.market_data.stream = stream
+    reports = []
+    executor.run_stream(after_close=lambda: reports.append(executor.metrics.stages["signal"].count))
+    assert len(reports) == 3
+    assert reports[2] == reports[0] + 2  # each report follows the evaluation of its candle
@@ -0,0 +1,44 @@
+import numpy as np
+from conftest import make_closes
+from backtesting.optimize import batch_evaluate
+from backtesting.search import mean_reversion_objective, sample_space, successive_halving
+
+
+def test_sampling_is_distinct_and_covers_small_grids():
+    space = {"a": [1, 2, 3], "b": [10, 20], "c": [0.5]}
+    assert len(sample_space(space, 100, np.random.default_rng(0))) == 6
+
+    big = {name: list(range(20)) for name in "abcdef"}  # 64M points
+    picks = sample_space(big, 500, np.random.default_rng(0))
+    assert len({tuple(p.values()) for p in picks}) == 500
+
+
+def test_halving_finds_the_optimum_of_a_six_dimensional_space_cheaply():
+    space = {name: [round(x * 0.1, 1) for x in range(11)] for name in "abcdef"}
+    target = {name: 0.7 for name in space}
+
+    def objective(close, candidates, initial_balance):
+        # More history gives a less noisy estimate of the true score
+        noise = np.random.default_rng(len(close)).normal(0, 1000 / len(close), len(candidates))
+        return [-sum((p[k] - target[k]) ** 2 for k in p) + e for p, e in zip(candidates, noise)]
+
+    search = successive_halving(np.ones(20_000), space, objective, budget=1500, eta=3, min_bars=500)
+    assert search["grid_size"] == 11 ** 6
+    assert search["cost"] <= 1500 * 1.05
+    assert [rung["candidates"] for rung in search["rungs"]][-1] < search["rungs"][0]["candidates"]
+    assert sum((search["best"][k] - 0.7) ** 2 for k in space) < 0.2
+
+
+def test_mean_reversion_objective_matches_batched_grid_per_lookback():
+    close = make_closes(3000, seed=1, period=15)
+    candidates = [{"drop": d, "rebound": r, "lookback": lb} for d in (0.5, 1.0) for r in (1.0, 2.0) for lb in (10, 30)]
+
+    scores = mean_reversion_objective(close, candidates)
+    for params, score in zip(candidates, scores):
+        expected = batch_evaluate(close, [(params["drop"], params["rebound"])], lookback=params["lookback"])[0]
+        assert score == expected["return_pct"]
+
+    space = {"drop": [0.5, 1.0, 1.5], "rebound": [1.0, 2.0, 3.0], "lookback": [10, 20, 30]}
+    search = successive_halving(close, space, mean_reversion_objective, budget=10, min_bars=300)
+    assert search["evaluations"] <= 27 + 9 + 3
+    assert search["return_pct"] == mean_reversion_objective(close, [search["best"]])[0]
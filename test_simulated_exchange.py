@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from benchmarks.executor_load import run_load
+from brokers.binance_api import KLINES_WEIGHT
+from brokers.simulated_exchange import LatencyProfile, SimulatedBinanceAPI, SimulatedExchange
+
+
+def test_market_orders_walk_the_book_and_pay_fees():
+    exchange = SimulatedExchange(["SIMUSDT"], bars=10, quote_balance=10_000.0, level_notional=1_000.0)
+    api = SimulatedBinanceAPI(exchange)
+    mid = api.get_symbol_price("SIMUSDT")
+
+    qty = 2_500.0 / mid  # spans three levels
+    order = api.place_market_order("SIMUSDT", "buy", qty)
+    fills = order["fills"]
+    assert len(fills) == 3
+    assert float(fills[0]["price"]) < float(fills[-1]["price"])
+    notional = float(order["cummulativeQuoteQty"])
+    assert notional > 2_500.0
+    assert exchange.balances["USDT"] == pytest.approx(10_000.0 - notional * 1.001)
+    assert exchange.balances["SIM"] == pytest.approx(qty)
+
+    assert api.place_market_order("SIMUSDT", "sell", qty * 2) is None  # more than we hold
+    assert api.place_market_order("SIMUSDT", "sell", qty)["status"] == "FILLED"
+    assert exchange.balances["USDT"] < 10_000.0
+
+
+def test_rest_calls_go_through_binance_api_decoding_and_weight():
+    exchange = SimulatedExchange(["SIMUSDT"], bars=10)
+    api = SimulatedBinanceAPI(exchange)
+
+    columns = api.get_kline_columns("SIMUSDT", "1m", limit=5)
+    expected = exchange.klines("SIMUSDT", limit=5)
+    assert (columns["timestamp"] == expected["timestamp"]).all()
+    assert np.allclose(columns["close"], expected["close"], rtol=1e-8)
+    assert len(api.get_klines("SIMUSDT", "1m", limit=5)) == 5
+    assert api.scheduler.used_weight == 2 * KLINES_WEIGHT
+    assert api.calls == 2
+
+
+def test_error_profile_follows_binance_api_conventions():
+    exchange = SimulatedExchange(["SIMUSDT"], bars=10)
+    api = SimulatedBinanceAPI(exchange, LatencyProfile(error_rate=1.0))
+    assert api.get_symbol_price("SIMUSDT") is None
+    assert api.get_asset_balance("USDT") == 0.0
+    assert len(api.get_kline_columns("SIMUSDT", "1m", limit=5)["timestamp"]) == 0
+
+
+def test_harness_runs_unchanged_executor_fast(tmp_path):
+    report = run_load(["SIM0USDT", "SIM1USDT"], cycles=1500, state_dir=str(tmp_path))
+
+    assert report["cycles"] == 3000
+    assert report["orders"] > 0
+    assert report["cycles_per_second"] > 500
+    for position in report["open_positions"]:
+        assert report["balances"][position["symbol"][:-4]] == pytest.approx(position["qty"])
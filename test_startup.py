@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENV = {key: value for key, value in os.environ.items() if key != "ENVIRONMENT"}
+
+
+def run(*args, **env):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env={**ENV, **env}, cwd=ROOT)
+
+
+def test_entry_points_import_without_environment_or_heavy_clients():
+    result = run("-c", "import sys, main, backtesting.tick_backtest; "
+                 "print(sorted(m for m in ('binance', 'pandas', 'aiohttp', 'dotenv') if m in sys.modules))")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("module", ["backtesting.optimize", "backtesting.walk_forward", "backtesting.search",
+                                    "backtesting.robustness"])
+def test_backtesting_tools_import_without_pandas_or_http(module):
+    result = run("-c", f"import sys, {module}; "
+                 "print(sorted(m for m in ('binance', 'pandas', 'requests', 'aiohttp') if m in sys.modules))")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("module", ["main", "backtesting.optimize", "backtesting.walk_forward", "backtesting.search",
+                                    "backtesting.robustness"])
+def test_help_needs_no_settings(module):
+    result = run("-m", module, "--help")
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
+
+
+@pytest.mark.skipif(os.path.exists(os.path.join(ROOT, ".env")), reason="a local .env sets ENVIRONMENT")
+def test_settings_are_validated_on_first_use():
+    result = run("-c", "from config.settings import TRADING_CONFIG\nTRADING_CONFIG['pair']")
+    assert "Missing ENVIRONMENT" in result.stderr
+
+    result = run("-c", "from config import settings; print(settings.ENVIRONMENT, settings.TRADING_CONFIG['testnet'])",
+                 ENVIRONMENT="testnet")
+    assert result.stdout.split() == ["testnet", "True"]
+
+
+def test_symbols_without_a_pair_are_rejected():
+    result = run("-m", "main", "--symbols", " , ", ENVIRONMENT="testnet")
+    assert result.returncode == 2
+    assert "--symbols needs at least one pair" in result.stderr
+
+
+def test_stream_with_several_symbols_is_rejected():
+    result = run("-m", "main", "--stream", "--symbols", "xrpusdt, ethusdt", ENVIRONMENT="testnet")
+    assert result.returncode == 2
+    assert "--stream trades a single pair" in result.stderr
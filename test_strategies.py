@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_closes
+from strategies.base_strategy import BUY, HOLD, SELL, SIGNAL_NAMES, StrategyMismatch, rolling_mean
+from strategies.mean_reversion import MeanReversionStrategy
+from strategies.scalping import ScalpingStrategy
+
+
+def test_live_and_batch_paths_agree():
+    closes = make_closes()
+    for drop, rebound, lookback in [(1.0, 1.0, 20), (0.5, 1.0, 7), (2.0, 1.5, 50)]:
+        strategy = MeanReversionStrategy()
+        strategy.drop_threshold, strategy.rebound_threshold, strategy.lookback = drop / 100, rebound / 100, lookback
+        signals = strategy.signals({"close": closes})
+        assert (signals == BUY).sum() > 5 and (signals == SELL).sum() > 5
+        assert strategy.check_consistency({"close": closes}) == len(closes)
+
+    assert ScalpingStrategy().check_consistency({"close": closes}) == len(closes)
+
+
+def test_window_entry_point_matches_batch_signals():
+    closes = make_closes(800)
+    strategy = MeanReversionStrategy()
+    expected = strategy.signals({"close": closes})
+
+    live = MeanReversionStrategy()
+    for i in range(len(closes)):
+        assert live.generate_signal({"close": closes[max(0, i - 99):i + 1]}) == SIGNAL_NAMES[int(expected[i])]
+
+
+def test_rolling_mean_does_not_drift_over_long_histories():
+    closes = make_closes(1_000_000)
+    fresh = np.lib.stride_tricks.sliding_window_view(closes, 20).sum(axis=1) / 20
+    average = rolling_mean(closes, 20)
+    assert np.isnan(average[:19]).all()
+    assert np.max(np.abs(average[19:] - fresh) / fresh) < 1e-14
+
+    strategy = MeanReversionStrategy()
+    strategy.lookback = 20
+    strategy.reset()
+    for close in closes[:5000].tolist():
+        strategy.on_bar({"close": close})
+    assert strategy._sum / 20 == average[4999]
+
+
+def test_failed_fetch_holds():
+    # MarketData.fetch_ohlcv returns an empty DataFrame when the request fails
+    for strategy in (MeanReversionStrategy(), ScalpingStrategy()):
+        assert strategy.generate_signal(pd.DataFrame()) == "hold"
+        assert strategy.generate_signal(pd.DataFrame({"close": []})) == "hold"
+
+
+def test_mismatch_is_reported():
+    class ForgetfulScalper(ScalpingStrategy):
+        def on_bar(self, bar):
+            signal = super().on_bar(bar)
+            return HOLD if signal == SELL else signal  # live path drifts from the batch rule
+
+    with pytest.raises(StrategyMismatch, match="at bar"):
+        ForgetfulScalper().check_consistency({"close": make_closes(800)})
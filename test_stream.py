@@ -0,0 +1,113 @@
+import asyncio
+import json
+import time
+from websockets.asyncio.server import serve
+from data.kline_store import KlineStore, candle_open, decode_klines
+from data.market_data import MarketData
+from data.stream import KlineStream
+
+STEP = 60_000
+
+
+def kline_row(ts):
+    price = f"{100 + (ts // STEP) % 50:.8f}"
+    return [ts, price, price, price, price, "1.0", ts + STEP - 1, "0", 1, "0", "0", "0"]
+
+
+def kline_event(ts, closed):
+    price = f"{100 + (ts // STEP) % 50:.8f}"
+    return json.dumps({"e": "kline", "s": "XRPUSDT", "k": {
+        "t": ts, "o": price, "h": price, "l": price, "c": price, "v": "1.0", "x": closed
+    }})
+
+
+class ExchangeHistory:
+    """REST stand-in whose history grows while the stream is down"""
+
+    def __init__(self, first, available_until):
+        self.first = first
+        self.available_until = available_until
+
+    def get_kline_columns(self, symbol, interval, limit=100, start_time=None, end_time=None):
+        start = max(start_time, self.first)
+        end = self.available_until if end_time is None else min(end_time + 1, self.available_until)
+        return decode_klines(json.dumps([kline_row(ts) for ts in range(start, end, STEP)][:limit]).encode())
+
+
+def test_stream_fires_on_close_and_backfills_after_reconnect(tmp_path):
+    base = candle_open(int(time.time() * 1000), "1m") - 100 * STEP
+    api = ExchangeHistory(base, available_until=base + 60 * STEP)
+    market_data = MarketData(api=api, symbol="XRPUSDT", interval="1m", store=KlineStore(api, root=str(tmp_path)))
+    closes = []
+    connections = []
+
+    async def exchange(ws):
+        connections.append(ws)
+        if len(connections) == 1:
+            while market_data.window is None:
+                await asyncio.sleep(0.01)
+            await ws.send(kline_event(base + 60 * STEP, closed=True))
+            await ws.send(kline_event(base + 61 * STEP, closed=False))
+            while not closes:
+                await asyncio.sleep(0.01)
+            # Bars 61-63 close while the client is disconnected
+            api.available_until = base + 64 * STEP
+        else:
+            await ws.send(kline_event(base + 63 * STEP, closed=True))
+            await ws.send(kline_event(base + 64 * STEP, closed=True))
+            await ws.wait_closed()
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+
+        def on_close(candles):
+            closes.append(int(candles["timestamp"][-1]))
+            if len(closes) == 5:
+                asyncio.run_coroutine_threadsafe(market_data.stop_stream(), loop)
+
+        async with serve(exchange, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            await asyncio.wait_for(market_data.stream(on_close, ws_url=f"ws://127.0.0.1:{port}"), timeout=10)
+
+    asyncio.run(scenario())
+
+    assert closes == [base + i * STEP for i in range(60, 65)]
+    assert len(connections) == 2
+    assert len(market_data.window) == 65
+    assert market_data.current_candle["timestamp"] == base + 64 * STEP
+
+
+def test_bad_messages_are_skipped_and_unexpected_errors_reconnect():
+    handled = []
+    connects = []
+
+    async def on_connect():
+        connects.append(len(connects))
+        if len(connects) == 1:
+            raise RuntimeError("resync failed")
+
+    async def exchange(ws):
+        await ws.send("not json")
+        await ws.send(json.dumps({"e": "kline"}))  # no "k" payload
+        await ws.send(kline_event(0, closed=False))  # the handler raises on this one
+        await ws.send(kline_event(STEP, closed=True))
+        await ws.wait_closed()
+
+    async def scenario():
+        async def on_kline(candle):
+            if not candle["closed"]:
+                raise ValueError("handler bug")
+            handled.append(candle["timestamp"])
+            await stream.stop()
+
+        async with serve(exchange, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = KlineStream(f"ws://127.0.0.1:{port}", on_kline, on_connect, reconnect_delay=0.01)
+            await asyncio.wait_for(stream.run(), timeout=10)
+        return stream
+
+    stream = asyncio.run(scenario())
+
+    assert connects == [0, 1]
+    assert stream.reconnects == 1
+    assert handled == [STEP]
@@ -0,0 +1,77 @@
+import os
+import tracemalloc
+import numpy as np
+from backtesting import engine
+from backtesting.tick_backtest import ScalpingTickSimulator, run_ticks
+from data.ticks import import_agg_trades_csv, iter_chunks, tick_count, write_synthetic
+from strategies.scalping import ScalpingStrategy
+
+
+def test_one_trade_per_candle_matches_the_close_backtest(tmp_path):
+    # Each 1m candle holds a single trade, so intrabar and close fills must agree
+    root = write_synthetic(str(tmp_path / "ticks"), 20_000, volatility=0.004, mean_gap_ms=1, seed=1)
+    columns = {name: np.load(os.path.join(root, f"{name}.npy")) for name in ("timestamp", "price")}
+    columns["timestamp"] = 1_700_000_000_000 + np.arange(20_000) * 60_000
+
+    strategy = ScalpingStrategy()
+    simulator = ScalpingTickSimulator(strategy, "1m")
+    simulator.feed(columns)
+    bars = engine.simulate(columns["price"], engine.strategy_signals(strategy, columns["price"]))
+
+    assert len(bars["trade_log"]) > 10
+    assert simulator.result() == bars
+    assert (simulator.closes()[1] == columns["price"]).all()
+
+
+def test_results_do_not_depend_on_chunk_size(tmp_path):
+    root = write_synthetic(str(tmp_path / "ticks"), 300_000, seed=2, chunk_size=70_000)
+    assert tick_count(root) == 300_000
+    assert all(len(chunk["price"]) <= 4_096 for chunk in iter_chunks(root, 4_096))
+
+    whole, _ = run_ticks(root, interval="1m", chunk_size=1_000_000)
+    pieces, rate = run_ticks(root, interval="1m", chunk_size=4_096)
+    assert len(whole.trade_log) > 10
+    assert pieces.trade_log == whole.trade_log
+    assert pieces.result() == whole.result()
+    assert (pieces.closes()[1] == whole.closes()[1]).all()
+    assert rate > 0
+
+
+def test_memory_stays_bounded_by_the_chunk(tmp_path):
+    root = write_synthetic(str(tmp_path / "ticks"), 2_000_000, seed=3)  # 50 MB of columns on disk
+    tracemalloc.start()
+    run_ticks(root, interval="1m", chunk_size=100_000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 20 * 1024 * 1024
+
+
+def test_imports_binance_agg_trades_dumps(tmp_path):
+    csv = tmp_path / "XRPUSDT-aggTrades-2024-01-01.csv"
+    csv.write_text("1,0.6200,100.0,1,1,1704067200000,True,True\n"
+                   "2,0.6100,50.5,2,3,1704067260000,False,True")
+    root = import_agg_trades_csv(str(csv), str(tmp_path / "ticks"), chunk_size=1)
+    chunk = next(iter_chunks(root))
+    assert chunk["timestamp"].tolist() == [1704067200000, 1704067260000]
+    assert chunk["price"].tolist() == [0.62, 0.61]
+    assert chunk["buyer_maker"].tolist() == [True, False]
+
+
+def test_empty_agg_trades_csv_gives_an_empty_store(tmp_path):
+    for name, text in (("empty.csv", ""), ("header.csv", ",".join(("agg_trade_id", "price", "qty")) + "\n")):
+        csv = tmp_path / name
+        csv.write_text(text)
+        root = import_agg_trades_csv(str(csv), str(tmp_path / name.replace(".csv", "")))
+        assert tick_count(root) == 0
+        assert list(iter_chunks(root)) == []
+
+
+def test_trailing_blank_lines_leave_no_empty_trades(tmp_path):
+    csv = tmp_path / "XRPUSDT-aggTrades-2024-01-02.csv"
+    csv.write_bytes(b"1,0.6200,100.0,1,1,1704067200000,True,True\r\n"
+                    b"2,0.6100,50.5,2,3,1704067260000,False,True\r\n\r\n")
+    root = import_agg_trades_csv(str(csv), str(tmp_path / "ticks"), chunk_size=1)
+    assert tick_count(root) == 2
+    chunk = next(iter_chunks(root))
+    assert chunk["timestamp"].tolist() == [1704067200000, 1704067260000]
+    assert chunk["price"].tolist() == [0.62, 0.61]
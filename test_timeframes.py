@@ -0,0 +1,101 @@
+import json
+import time
+import numpy as np
+import pytest
+from data.kline_store import COLUMNS, KlineStore, candle_open, decode_klines
+from data.market_data import MarketData, TimeframeAggregator, resample_columns
+
+STEP = 60_000
+
+
+def base_columns(n, start=0, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.2, n))
+    open_ = np.r_[100.0, close[:-1]]
+    spread = rng.uniform(0, 0.3, n)
+    return {
+        "timestamp": start + np.arange(n, dtype=np.int64) * STEP,
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    }
+
+
+def assert_same_bars(actual, expected):
+    assert list(actual["timestamp"]) == list(expected["timestamp"])
+    for name in ("open", "high", "low", "close"):
+        assert list(actual[name]) == list(expected[name])
+    np.testing.assert_allclose(actual["volume"], expected["volume"])
+
+
+def test_incremental_bars_match_vectorized_resample_despite_forming_revisions():
+    columns = base_columns(500)
+    aggregator = TimeframeAggregator("1m", ["5m", "15m", "1h"], size=50)
+    for i in range(500):
+        row = {name: columns[name][i] for name in COLUMNS}
+        # The forming candle is seen twice: once half-built, then with its final values
+        aggregator.update({**row, "high": row["open"], "low": row["open"], "close": row["open"], "volume": 0.5})
+        aggregator.update(row)
+
+    for interval in ("5m", "15m", "1h"):
+        expected = resample_columns(columns, interval)
+        assert_same_bars(aggregator.views(interval), {name: values[-50:] for name, values in expected.items()})
+
+    seeded = TimeframeAggregator("1m", ["5m", "15m", "1h"], size=50)
+    seeded.seed(columns)
+    for interval in ("5m", "15m", "1h"):
+        assert_same_bars(seeded.views(interval), aggregator.views(interval))
+
+
+def test_trades_and_empty_bars():
+    aggregator = TimeframeAggregator("1m", ["5m"], size=10)
+    aggregator.add_trade(10_000, 1.0, 2.0)
+    aggregator.add_trade(20_000, 1.5, 1.0)
+    aggregator.add_trade(16 * STEP, 0.8, 4.0)  # nothing traded in the 5m and 10m bars
+
+    bars = aggregator.views("5m")
+    assert list(bars["timestamp"]) == [0, 5 * STEP, 10 * STEP, 15 * STEP]
+    assert list(bars["close"]) == [1.5, 1.5, 1.5, 0.8]
+    assert list(bars["high"]) == [1.5, 1.5, 1.5, 0.8]
+    assert list(bars["volume"]) == [3.0, 0.0, 0.0, 4.0]
+
+    trades = {"timestamp": [10_000, 20_000, 16 * STEP], "open": [1.0, 1.5, 0.8], "high": [1.0, 1.5, 0.8],
+              "low": [1.0, 1.5, 0.8], "close": [1.0, 1.5, 0.8], "volume": [2.0, 1.0, 4.0]}
+    assert_same_bars(resample_columns(trades, "5m"), bars)
+
+    with pytest.raises(ValueError):
+        TimeframeAggregator("15m", ["1h", "20m"])
+
+
+class CountingHistory:
+    def __init__(self, first, end):
+        self.first, self.end = first, end
+        self.calls = 0
+
+    def get_kline_columns(self, symbol, interval, limit=100, start_time=None, end_time=None):
+        self.calls += 1
+        start = max(start_time, self.first)
+        stop = self.end if end_time is None else min(end_time + 1, self.end)
+        columns = base_columns((self.end - self.first) // STEP, start=self.first)
+        rows = [[int(columns["timestamp"][i])] + [str(columns[name][i]) for name in COLUMNS[1:]]
+                + [int(columns["timestamp"][i]) + STEP - 1, "0", 1, "0", "0", "0"]
+                for i in range(len(columns["timestamp"])) if start <= columns["timestamp"][i] < stop]
+        return decode_klines(json.dumps(rows[:limit]).encode())
+
+
+def test_every_timeframe_comes_from_one_base_download(tmp_path):
+    now = candle_open(int(time.time() * 1000), "1m")
+    api = CountingHistory(now - 3000 * STEP, now + STEP)
+    market_data = MarketData(api=api, symbol="XRPUSDT", interval="1m", store=KlineStore(api, root=str(tmp_path)))
+
+    frames = market_data.fetch_timeframes(["1m", "5m", "1h"], limit=20)
+    assert api.calls == 2  # 1200 base candles: one full page plus the rest
+    assert [len(frame) for frame in frames.values()] == [20, 20, 20]
+    hourly = frames["1h"]
+    assert (hourly.index.minute == 0).all()
+    assert hourly["close"].iloc[-1] == frames["1m"]["close"].iloc[-1]
+
+    aggregator = market_data.aggregate(["5m", "1h"], limit=20)
+    assert list(aggregator.views("1h")["close"]) == list(hourly["close"])
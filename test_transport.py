@@ -0,0 +1,29 @@
+from brokers.transport import WeightScheduler
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_scheduler_smooths_bursts():
+    scheduler = WeightScheduler(limit=6000, burst=10)
+    waits = [scheduler.acquire(2) for _ in range(10)]
+    # 5 requests fit in the burst, the rest wait for the bucket to refill at 90/s
+    assert waits[:5] == [0.0] * 5
+    assert all(wait > 0 for wait in waits[5:])
+    assert scheduler.throttled >= 5
+    assert scheduler.used_weight == 20
+
+
+def test_scheduler_tracks_server_weight_and_retry_after():
+    scheduler = WeightScheduler()
+    scheduler.update(FakeResponse(headers={"X-MBX-USED-WEIGHT-1M": "1234"}))
+    assert scheduler.used_weight == 1234
+
+    scheduler.update(FakeResponse(status_code=429, headers={"Retry-After": "0.3"}))
+    throttled = scheduler.throttled
+    waited = scheduler.acquire(1)
+    assert waited >= 0.25  # the pauses it was told to take, not a wall-clock measurement
+    assert scheduler.throttled > throttled
@@ -0,0 +1,51 @@
+import numpy as np
+from conftest import make_candles
+from backtesting.optimize import frange
+from backtesting.walk_forward import fold_bounds, walk_forward
+
+
+def test_folds_stay_put_when_history_grows():
+    short, long = make_candles(3000), make_candles(4000)
+    ts_short = short.index.values.astype("datetime64[ms]").astype(np.int64)
+    ts_long = long.index.values.astype("datetime64[ms]").astype(np.int64)
+
+    first = fold_bounds(ts_short, "1h", train=1000, test=250)
+    extended = fold_bounds(ts_long, "1h", train=1000, test=250)
+    assert extended[:len(first)] == first
+    assert len(extended) == len(first) + 4
+    for train_start, test_start, test_end in extended:
+        assert test_start - train_start == 1000 and test_end - test_start == 250
+
+
+def test_walk_forward_caches_folds_and_runs_them_in_parallel(tmp_path):
+    grid = [round(x, 2) for x in frange(0.5, 2.0, 0.5)]
+    cache = str(tmp_path / "folds")
+
+    serial, summary = walk_forward(make_candles(3000), "1h", grid, grid, 1000, 250, cache_dir=cache)
+    assert summary["computed"] == summary["folds"] == len(serial) > 3
+    assert serial["test_trades"].sum() > 0
+    assert serial["oos_equity"].iloc[-1] == summary["oos_equity"]
+
+    parallel, _ = walk_forward(make_candles(3000), "1h", grid, grid, 1000, 250, workers=2,
+                               cache_dir=str(tmp_path / "fresh"))
+    assert parallel.equals(serial)
+
+    extended, summary = walk_forward(make_candles(4000), "1h", grid, grid, 1000, 250, workers=2, cache_dir=cache)
+    assert summary["computed"] == len(extended) - len(serial)
+    assert extended.iloc[:len(serial)].equals(serial)
+
+
+def test_growing_the_grid_only_evaluates_the_new_parameters(tmp_path):
+    grid = [round(x, 2) for x in frange(0.5, 2.0, 0.5)]
+    cache = str(tmp_path / "folds")
+    candles = make_candles(3000)
+
+    _, summary = walk_forward(candles, "1h", grid, grid, 1000, 250, cache_dir=cache)
+    assert summary["evaluated"] == summary["folds"] * len(grid) ** 2
+
+    wider = grid + [2.5]
+    folds, summary = walk_forward(candles, "1h", wider, grid, 1000, 250, cache_dir=cache)
+    assert summary["evaluated"] == summary["folds"] * len(grid)  # only drop=2.5 is new
+
+    fresh, _ = walk_forward(candles, "1h", wider, grid, 1000, 250, cache_dir=str(tmp_path / "fresh"))
+    assert folds.equals(fresh)